@@ -18,11 +18,11 @@ Version : 1.1.0
 Performance : ~1.3s génération moyenne (ratio 3.5x temps réel)
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, List, Dict, Any
 import uvicorn
 import os
 import uuid
@@ -31,8 +31,27 @@ import asyncio
 from pathlib import Path
 import logging
 import soundfile as sf
+import numpy as np
 import io
-from contextlib import asynccontextmanager
+import struct
+import hashlib
+import json
+import threading
+import unicodedata
+import gc
+import re
+import sqlite3
+import multiprocessing
+import heapq
+import hmac
+import math
+import mmap
+import bisect
+import shutil
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager
 
 # ===============================
 # CONFIGURATION LOGGING
@@ -62,6 +81,175 @@ kokoro_pipeline = None
 # Utilisé pour le monitoring et les statistiques
 model_load_time = None
 
+# Fréquence d'échantillonnage native de Kokoro (mono, 24 kHz)
+SAMPLE_RATE = 24000
+
+# Voix validées lors des tests utilisateur
+VALID_VOICES = ["af_heart", "af_bella", "af_sarah"]
+
+# Formats de sortie : paramètres libsndfile et type MIME servi
+# (niveaux de compression choisis pour la parole à 24 kHz : ~32 kbps en Opus et MP3)
+AUDIO_FORMATS = {
+    "wav": {"format": "WAV", "subtype": "PCM_16", "media_type": "audio/wav"},
+    "flac": {"format": "FLAC", "subtype": "PCM_16", "media_type": "audio/flac", "compression_level": 0.8},
+    "mp3": {"format": "MP3", "subtype": "MPEG_LAYER_III", "media_type": "audio/mpeg", "compression_level": 0.7},
+    "opus": {"format": "OGG", "subtype": "OPUS", "media_type": "audio/ogg", "compression_level": 0.9}
+}
+
+# Threads de l'étage d'encodage (en parallèle de l'inférence)
+ENCODER_WORKERS = int(os.getenv("KOKORO_ENCODER_WORKERS", "2"))
+
+# Instance unique de l'encodeur audio (initialisée au démarrage)
+audio_encoder = None
+
+# Stockage des fichiers audio générés : "memory" (débordement sur disque) ou "disk"
+AUDIO_STORE_BACKEND = os.getenv("KOKORO_AUDIO_STORE", "memory")
+AUDIO_STORE_DIR = os.getenv("KOKORO_AUDIO_DIR", "temp_audio")
+AUDIO_STORE_MEMORY_MB = int(os.getenv("KOKORO_AUDIO_MEMORY_MB", "256"))
+
+# Instance unique du stockage audio (initialisée au démarrage)
+audio_store = None
+
+# Expiration des fichiers audio générés et plafond du dossier au démarrage
+AUDIO_TTL_SECONDS = int(os.getenv("KOKORO_AUDIO_TTL", "3600"))
+AUDIO_DISK_MAX_MB = int(os.getenv("KOKORO_AUDIO_DISK_MAX_MB", "1024"))
+JANITOR_INTERVAL_SECONDS = 60  # Réveil maximal (et sauvegarde de l'échéancier)
+AUDIO_RECONCILE_SECONDS = int(os.getenv("KOKORO_AUDIO_RECONCILE_SECONDS", "600"))
+
+# Nombre maximal de plages par requête Range (au-delà : fichier complet)
+MAX_BYTE_RANGES = 16
+
+# Instance unique du nettoyeur (initialisée au démarrage)
+audio_janitor = None
+
+# Limites de /tts/phonemes : nombre de segments et longueur d'un segment (contexte du modèle)
+MAX_PHONEME_SEGMENTS = 50
+MAX_PHONEMES_PER_SEGMENT = 510
+
+# Version du modèle intégrée aux clés de cache (changer de modèle invalide le cache)
+MODEL_VERSION = os.getenv("KOKORO_MODEL_VERSION", "Kokoro-82M")
+
+# Quantification du modèle au chargement : "none" (fp32) ou "int8" (dynamique, CPU),
+# refusée si la distance spectrale moyenne au fp32 sur le corpus de contrôle dépasse le seuil (dB)
+MODEL_QUANTIZATION = os.getenv("KOKORO_QUANTIZATION", "none")
+QUANTIZATION_MAX_DISTANCE_DB = float(os.getenv("KOKORO_QUANTIZATION_MAX_DISTANCE_DB", "3.0"))
+
+# Moteur d'inférence choisi au démarrage : "torch" (KModel, PyTorch eager) ou "onnx"
+# (ONNX Runtime, CPU ; modèle exporté une fois dans KOKORO_ONNX_DIR puis réutilisé)
+INFERENCE_ENGINE = os.getenv("KOKORO_ENGINE", "torch")
+ONNX_MODEL_DIR = os.getenv("KOKORO_ONNX_DIR", "models")
+
+# Chemin compilé du moteur torch : étage phonèmes tracé (TorchScript) une fois par
+# palier de longueur en tokens, au démarrage ; les séquences sont paddées au palier supérieur
+MODEL_COMPILE = os.getenv("KOKORO_COMPILE", "0") == "1"
+COMPILE_BUCKETS = tuple(sorted(int(n) for n in os.getenv("KOKORO_COMPILE_BUCKETS", "16,32,64,128,256,512").split(",")))
+
+# Moteur d'inférence actif (initialisé au démarrage, hérité par les workers)
+inference_engine = None
+
+# Quantification effectivement appliquée (None = fp32) et rapport du contrôle qualité
+model_quantization = None
+quantization_report = None
+
+# Cache de synthèse : budget mémoire (LRU) et taille maximale du stockage disque
+CACHE_DIR = os.getenv("KOKORO_CACHE_DIR", "cache_audio")
+CACHE_MEMORY_MB = int(os.getenv("KOKORO_CACHE_MEMORY_MB", "64"))
+CACHE_DISK_MB = int(os.getenv("KOKORO_CACHE_DISK_MB", "512"))
+
+# Instance unique du cache de synthèse (initialisée au démarrage)
+synthesis_cache = None
+
+# Registre des synthèses en cours, partagées entre requêtes identiques (initialisé au démarrage)
+single_flight = None
+
+# Cache de fragments (audio par phrase, réutilisé entre requêtes) ; 0 = désactivé.
+# Optionnel : les textes sont alors découpés par phrase et non plus par paragraphe
+# comme KPipeline, l'audio et le nombre de segments diffèrent donc de la synthèse standard
+FRAGMENT_CACHE_MB = int(os.getenv("KOKORO_FRAGMENT_CACHE_MB", "0"))
+
+# Découpage en phrases utilisé par le cache de fragments (paragraphes + fins de phrase)
+SENTENCE_SPLIT_PATTERN = r'\n+|(?<=[.!?])\s+'
+
+# Instance unique du cache de fragments (initialisée au démarrage si activé)
+fragment_cache = None
+
+# Lexique G2P : mémo LRU en mémoire (par processus) devant un lexique SQLite persistant
+G2P_LEXICON_PATH = os.getenv("KOKORO_G2P_LEXICON", "g2p_lexicon.sqlite3")
+G2P_MEMO_MB = int(os.getenv("KOKORO_G2P_MEMO_MB", "16"))
+
+# Lexique SQLite : taille plafonnée (entrées les moins récemment utilisées évincées)
+# et durée de conservation depuis le dernier usage (le lexique contient le texte des requêtes)
+G2P_LEXICON_MAX_MB = int(os.getenv("KOKORO_G2P_LEXICON_MAX_MB", "64"))
+G2P_LEXICON_TTL_SECONDS = int(os.getenv("KOKORO_G2P_LEXICON_TTL", "604800"))
+
+# Instance unique du lexique G2P (initialisée au démarrage, avant le fork des workers)
+g2p_lexicon = None
+
+# Nombre maximal de travaux d'inférence en attente ou en cours
+INFERENCE_QUEUE_SIZE = int(os.getenv("KOKORO_INFERENCE_QUEUE_SIZE", "32"))
+
+# Nombre de processus d'inférence (1 = thread dédié dans le processus de l'API)
+INFERENCE_WORKERS = int(os.getenv("KOKORO_INFERENCE_WORKERS", "1"))
+
+# Topologie CPU des workers : threads intra-op PyTorch par worker (0 = nombre de
+# cœurs qui lui sont attribués), threads inter-op (fixés une fois pour tout le
+# processus, avant le chargement du modèle) et épinglage sur des cœurs disjoints
+INFERENCE_INTRA_OP_THREADS = int(os.getenv("KOKORO_INTRA_OP_THREADS", "0"))
+INFERENCE_INTER_OP_THREADS = int(os.getenv("KOKORO_INTER_OP_THREADS", "1"))
+INFERENCE_PIN_CPUS = os.getenv("KOKORO_PIN_CPUS", "1") != "0"
+
+# Threads intra-op du processus de l'API en mode pool (le streaming y infère) :
+# 0 = cœurs non attribués aux workers, au moins 1
+INFERENCE_API_THREADS = int(os.getenv("KOKORO_API_THREADS", "0"))
+
+# Exécuteur dédié propriétaire du pipeline (initialisé au démarrage)
+inference_executor = None
+
+# Ordonnancement par priorité : classes (ordre de priorité), jeton du backend
+# autorisant l'en-tête X-Kokoro-Tier (vide = toutes les requêtes en "free"),
+# vieillissement (secondes de coût estimé effacées par seconde d'attente) et
+# attente au-delà de laquelle un travail passe dans la classe supérieure
+PRIORITY_TIERS = ("premium", "free")
+PRIORITY_TOKEN = os.getenv("KOKORO_PRIORITY_TOKEN", "")
+PRIORITY_AGING = float(os.getenv("KOKORO_PRIORITY_AGING", "1.0"))
+PRIORITY_PROMOTE_SECONDS = float(os.getenv("KOKORO_PRIORITY_PROMOTE_SECONDS", "10"))
+
+# Micro-batching : fenêtre de regroupement (0 = désactivé), taille maximale
+# d'un lot et longueur maximale des textes éligibles (requêtes courtes)
+BATCH_WINDOW_MS = float(os.getenv("KOKORO_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SIZE = int(os.getenv("KOKORO_BATCH_MAX_SIZE", "16"))
+BATCH_MAX_CHARS = int(os.getenv("KOKORO_BATCH_MAX_CHARS", "300"))
+
+# Ordonnanceur de micro-batching (initialisé au démarrage si activé)
+micro_batcher = None
+
+# Contrôle d'admission : attente maximale estimée (SLO de latence, 0 = désactivé),
+# valeurs initiales du débit de parole et du facteur temps réel (recalibrés en continu)
+ADMISSION_SLO_SECONDS = float(os.getenv("KOKORO_ADMISSION_SLO_SECONDS", "10"))
+ADMISSION_CHARS_PER_SECOND = float(os.getenv("KOKORO_ADMISSION_CHARS_PER_SECOND", "15"))
+ADMISSION_INITIAL_RTF = float(os.getenv("KOKORO_ADMISSION_RTF", "0.3"))
+
+# Contrôleur d'admission (initialisé au démarrage si activé)
+admission = None
+
+# Synthèse par lots (/tts/batch) : nombre maximal d'éléments par requête et
+# d'éléments en cours de synthèse simultanément (un lot complet par worker)
+TTS_BATCH_MAX_ITEMS = int(os.getenv("KOKORO_TTS_BATCH_MAX_ITEMS", "500"))
+TTS_BATCH_CONCURRENCY = int(os.getenv(
+    "KOKORO_TTS_BATCH_CONCURRENCY", str(BATCH_MAX_SIZE * max(INFERENCE_WORKERS, 1))
+))
+
+# Synthèse longue asynchrone (jobs) : taille maximale du texte (limite premium),
+# taille cible d'un morceau, morceaux synthétisés en parallèle (tous jobs confondus)
+LONGFORM_MAX_CHARS = int(os.getenv("KOKORO_LONGFORM_MAX_CHARS", "100000"))
+LONGFORM_CHUNK_CHARS = int(os.getenv("KOKORO_LONGFORM_CHUNK_CHARS", "800"))
+LONGFORM_PARALLEL = int(os.getenv("KOKORO_LONGFORM_PARALLEL", str(max(INFERENCE_WORKERS, 1))))
+LONGFORM_DIR = os.getenv("KOKORO_JOBS_DIR", "jobs")
+LONGFORM_TTL_SECONDS = int(os.getenv("KOKORO_JOBS_TTL", "86400"))
+
+# Gestionnaire des jobs de synthèse longue (initialisé au démarrage)
+longform_jobs = None
+
 # ===============================
 # MODÈLES PYDANTIC (VALIDATION)
 # ===============================
@@ -74,62 +262,3164 @@ class TTSRequest(BaseModel):
     - Texte : 1-2000 caractères (limité pour éviter les timeouts)
     - Voix : Parmi les 3 voix validées lors des tests
     - Vitesse : 0.5x à 2.0x (plage optimale testée)
-    - Format : WAV uniquement (qualité maximale)
+    - Format : WAV (qualité maximale), Opus/MP3 (~10x plus légers) ou FLAC (sans perte)
     """
     text: str = Field(..., min_length=1, max_length=2000, description="Texte à synthétiser (max 2000 caractères)")
     voice: Optional[str] = Field("af_heart", description="Voix à utiliser: af_heart, af_bella, af_sarah")
     speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Vitesse de lecture (0.5 à 2.0)")
-    format: Optional[str] = Field("wav", description="Format audio (wav uniquement pour l'instant)")
+    format: Optional[str] = Field("wav", description="Format audio: wav, opus, mp3, flac")
+    return_phonemes: bool = Field(False, description="Inclure les phonèmes de chaque segment dans la réponse")
+    return_timings: bool = Field(False, description="Inclure le détail des temps par étape dans la réponse")
+
+class TTSBatchRequest(BaseModel):
+    """
+    Modèle de requête de synthèse par lots
+    
+    Chaque élément a le format de TTSRequest et est validé séparément :
+    un élément invalide produit une erreur pour lui seul (statut 422),
+    sans faire échouer le reste du lot.
+    """
+    items: List[Dict[str, Any]] = Field(
+        ..., min_length=1, max_length=TTS_BATCH_MAX_ITEMS,
+        description="Requêtes au format TTSRequest (500 max)"
+    )
+
+class PhonemeTTSRequest(BaseModel):
+    """
+    Modèle de requête pour la synthèse à partir de phonèmes
+    
+    Pour les clients qui produisent déjà leurs phonèmes (ou réutilisent
+    ceux renvoyés par /tts avec return_phonemes) : le G2P est sauté.
+    - Phonèmes : 1-50 segments d'au plus 510 phonèmes (limite du modèle)
+    - Voix, vitesse : mêmes règles que TTSRequest
+    """
+    phonemes: List[str] = Field(..., description="Segments de phonèmes (alphabet Kokoro/misaki), 510 max chacun")
+    voice: Optional[str] = Field("af_heart", description="Voix à utiliser: af_heart, af_bella, af_sarah")
+    speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Vitesse de lecture (0.5 à 2.0)")
+
+class LongFormRequest(BaseModel):
+    """
+    Modèle de requête de synthèse longue (job asynchrone)
+    
+    Pour les documents au-delà de la limite de /tts (offre premium) :
+    - Texte : 1-100000 caractères, découpé en morceaux aux fins de phrase
+    - Voix, vitesse, format : mêmes règles que TTSRequest
+    """
+    text: str = Field(..., min_length=1, max_length=LONGFORM_MAX_CHARS, description="Document à synthétiser")
+    voice: Optional[str] = Field("af_heart", description="Voix à utiliser: af_heart, af_bella, af_sarah")
+    speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Vitesse de lecture (0.5 à 2.0)")
+    format: Optional[str] = Field("wav", description="Format audio: wav, opus, mp3, flac")
+
+class JobStatus(BaseModel):
+    """
+    État d'un job de synthèse longue
+    
+    status : queued, running, completed ou failed.
+    audio_url n'est renseignée qu'une fois le job terminé.
+    """
+    job_id: str
+    status: str
+    chunks_total: int
+    chunks_done: int
+    progress: float
+    audio_format: str
+    audio_url: Optional[str] = None
+    audio_duration: Optional[float] = None
+    error: Optional[str] = None
+    created_at: float
 
 class TTSResponse(BaseModel):
     """
     Modèle de réponse de synthèse vocale
     
-    Contient toutes les métadonnées nécessaires au frontend :
-    - URL de téléchargement sécurisée
-    - Métriques de performance
-    - Informations de débogage
-    """
-    success: bool
-    message: str
-    audio_url: Optional[str] = None
-    audio_duration: Optional[float] = None
-    generation_time: Optional[float] = None
-    text_length: int
-    voice_used: str
-    segments_count: int
+    Contient toutes les métadonnées nécessaires au frontend :
+    - URL de téléchargement sécurisée
+    - Métriques de performance
+    - Informations de débogage
+    """
+    success: bool
+    message: str
+    audio_url: Optional[str] = None
+    audio_duration: Optional[float] = None
+    generation_time: Optional[float] = None
+    text_length: int
+    voice_used: str
+    segments_count: int
+    audio_format: str = "wav"
+    cached: bool = False
+    coalesced: bool = False
+    fragment_hit_ratio: Optional[float] = None
+    phonemes: Optional[List[str]] = None
+    timings: Optional[Dict[str, Any]] = None
+
+class VoiceInfo(BaseModel):
+    """
+    Informations détaillées sur une voix
+    
+    Métadonnées enrichies basées sur les tests utilisateur :
+    - Description subjective de la qualité
+    - Recommandation basée sur les résultats de test
+    - Informations techniques (langue, genre)
+    """
+    id: str
+    name: str
+    description: str
+    language: str
+    gender: str
+    recommended: bool = False
+
+class HealthResponse(BaseModel):
+    """
+    Réponse du contrôle de santé de l'API
+    
+    Fournit l'état détaillé du système pour le monitoring :
+    - État du modèle Kokoro
+    - Métriques de performance
+    - Temps de fonctionnement
+    """
+    status: str
+    model_loaded: bool
+    model_load_time: Optional[float]
+    available_voices: int
+    uptime: float
+    
+# ===============================
+# CACHE DE SYNTHÈSE
+# ===============================
+
+class ByteBudgetLRU:
+    """
+    Dictionnaire LRU limité par un budget en octets
+    
+    Les entrées les moins récemment lues sont évincées dès que la taille
+    cumulée dépasse le budget. Non thread-safe : l'appelant synchronise.
+    """
+    
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.size_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # clé -> (valeur, taille)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key):
+        """Valeur associée à la clé (None si absente), marquée comme récente"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+    
+    def put(self, key, value, size: int):
+        """Ajout d'une entrée (ignorée si elle dépasse à elle seule le budget)"""
+        if size > self.budget_bytes:
+            return
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        
+        self._entries[key] = (value, size)
+        self.size_bytes += size
+        
+        while self.size_bytes > self.budget_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted_size
+            self.evictions += 1
+
+class SynthesisCache:
+    """
+    Cache adressé par contenu des synthèses déjà produites
+    
+    Deux niveaux, du plus rapide au plus volumineux :
+    - Mémoire : LRU limitée par un budget en octets (fichiers audio complets)
+    - Disque : dossier plafonné en taille, évincé du moins récemment utilisé
+    
+    La clé est un hash SHA-256 du texte normalisé, de la voix, de la vitesse
+    et de la version du modèle : deux requêtes identiques produisent la même clé.
+    Chaque format produit (wav, opus...) est une entrée distincte "clé.format".
+    get/put s'appellent depuis la boucle asyncio : le niveau mémoire est servi
+    directement, les lectures, écritures et évictions disque passent par
+    asyncio.to_thread (un WAV de plusieurs MB ne bloque pas /health ni /audio).
+    L'index est protégé par un verrou (threads d'E/S concurrents).
+    """
+    
+    def __init__(self, cache_dir: Path, memory_budget_bytes: int, disk_budget_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        
+        # entrée -> (audio_bytes, métadonnées)
+        self._memory = ByteBudgetLRU(memory_budget_bytes)
+        # entrée -> taille sur disque ; ordre = récence d'utilisation
+        self._disk_index = OrderedDict()
+        self._disk_bytes = 0
+        self._writing = set()  # entrées en cours d'écriture sur disque
+        self._lock = threading.Lock()
+        
+        self.counters = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "evictions_disk": 0
+        }
+        
+        self.cache_dir.mkdir(exist_ok=True)
+        self._load_disk_index()
+    
+    @staticmethod
+    def make_key(text: str, voice: str, speed: float) -> str:
+        """
+        Calcul de la clé de cache d'une requête de synthèse
+        
+        Le texte est normalisé (Unicode NFC, espaces fusionnés) pour que
+        les variations sans effet sur l'audio partagent la même entrée.
+        Les retours à la ligne sont conservés : KPipeline découpe les
+        paragraphes sur \\n+, ils changent donc les segments produits.
+        """
+        lines = (" ".join(line.split()) for line in unicodedata.normalize("NFC", text).split("\n"))
+        normalized = "\n".join(line for line in lines if line)
+        payload = "\x1f".join([model_variant(), voice, f"{speed:.3f}", normalized])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _load_disk_index(self):
+        """Reconstruction de l'index disque au démarrage (du plus ancien au plus récent)"""
+        entries = []
+        for audio_path in self.cache_dir.iterdir():
+            if audio_path.suffix.lstrip(".") not in AUDIO_FORMATS:
+                continue
+            try:
+                st = audio_path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, audio_path.name, st.st_size))
+        
+        for _, entry, size in sorted(entries):
+            self._disk_index[entry] = size
+            self._disk_bytes += size
+        
+        self._enforce_disk_budget()
+        logger.info(f"🗄️  Cache disque: {len(self._disk_index)} entrée(s), {self._disk_bytes / (1024 * 1024):.1f} MB")
+    
+    async def get(self, key: str, audio_format: str = "wav"):
+        """
+        Recherche d'une synthèse en cache dans un format donné
+        
+        Returns:
+            tuple | None: (audio_bytes, métadonnées) ou None si absente
+        """
+        entry = f"{key}.{audio_format}"
+        with self._lock:
+            cached = self._memory.get(entry)
+            if cached is not None:
+                self.counters["hits_memory"] += 1
+                return cached
+            on_disk = entry in self._disk_index
+        
+        if on_disk:
+            cached = await asyncio.to_thread(self._read_disk_entry, entry)
+            if cached is not None:
+                return cached
+        
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+    
+    async def put(self, key: str, audio_bytes: bytes, metadata: dict, audio_format: str = "wav"):
+        """
+        Ajout d'une synthèse dans les deux niveaux de cache
+        
+        Args:
+            key (str): Clé calculée par make_key
+            audio_bytes (bytes): Fichier audio complet
+            metadata (dict): Durée audio, nombre de segments et phonèmes
+            audio_format (str): Format de audio_bytes (clé de AUDIO_FORMATS)
+        """
+        entry = f"{key}.{audio_format}"
+        with self._lock:
+            self._memory.put(entry, (audio_bytes, metadata), len(audio_bytes))
+            if (entry in self._disk_index or entry in self._writing
+                    or len(audio_bytes) > self.disk_budget_bytes):
+                return
+            self._writing.add(entry)
+        
+        await asyncio.to_thread(self._write_disk_entry, entry, audio_bytes, metadata)
+    
+    def _read_disk_entry(self, entry: str):
+        """Lecture d'une entrée disque (thread d'E/S), promue en mémoire"""
+        audio_path = self.cache_dir / entry
+        try:
+            audio_bytes = audio_path.read_bytes()
+            metadata = json.loads((self.cache_dir / f"{entry}.json").read_text())
+            os.utime(audio_path)  # Récence conservée entre redémarrages
+        except (OSError, ValueError):
+            with self._lock:
+                self._drop_disk_entry(entry)
+            return None
+        
+        with self._lock:
+            if entry in self._disk_index:
+                self._disk_index.move_to_end(entry)
+            self._memory.put(entry, (audio_bytes, metadata), len(audio_bytes))
+            self.counters["hits_disk"] += 1
+        return audio_bytes, metadata
+    
+    def _write_disk_entry(self, entry: str, audio_bytes: bytes, metadata: dict):
+        """Écriture d'une entrée disque (thread d'E/S), puis éviction au-delà du budget"""
+        try:
+            (self.cache_dir / f"{entry}.json").write_text(json.dumps(metadata))
+            (self.cache_dir / entry).write_bytes(audio_bytes)
+        except OSError as e:
+            logger.warning(f"⚠️  Écriture du cache disque impossible: {e}")
+            with self._lock:
+                self._writing.discard(entry)
+            return
+        
+        with self._lock:
+            self._writing.discard(entry)
+            self._disk_index[entry] = len(audio_bytes)
+            self._disk_bytes += len(audio_bytes)
+            self._enforce_disk_budget()
+    
+    def _enforce_disk_budget(self):
+        while self._disk_bytes > self.disk_budget_bytes and self._disk_index:
+            oldest = next(iter(self._disk_index))
+            self._drop_disk_entry(oldest)
+            self.counters["evictions_disk"] += 1
+    
+    def _drop_disk_entry(self, entry: str):
+        self._disk_bytes -= self._disk_index.pop(entry, 0)
+        for name in (entry, f"{entry}.json"):
+            try:
+                (self.cache_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+    
+    def stats(self) -> dict:
+        """Compteurs et occupation des deux niveaux pour /stats"""
+        with self._lock:
+            hits = self.counters["hits_memory"] + self.counters["hits_disk"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "evictions_memory": self._memory.evictions,
+                "hit_ratio": round(hits / lookups, 3) if lookups else None,
+                "memory_entries": len(self._memory),
+                "memory_size_mb": round(self._memory.size_bytes / (1024 * 1024), 2),
+                "disk_entries": len(self._disk_index),
+                "disk_size_mb": round(self._disk_bytes / (1024 * 1024), 2)
+            }
+
+class FragmentCache:
+    """
+    Cache de l'audio de chaque phrase, partagé entre requêtes différentes
+    
+    Les textes générés à partir de modèles ("Your order #123 has shipped.
+    Thank you for shopping with us.") partagent la plupart de leurs phrases :
+    seules les phrases absentes sont synthétisées, puis l'audio est assemblé.
+    Clé : phonèmes du segment + voix + vitesse + version du modèle.
+    Valeurs : trames PCM 16 bits, directement concaténables en WAV.
+    Utilisé uniquement depuis la boucle asyncio.
+    """
+    
+    def __init__(self, budget_bytes: int):
+        self._lru = ByteBudgetLRU(budget_bytes)
+        self.counters = {"hits": 0, "misses": 0}
+    
+    @staticmethod
+    def make_key(phonemes: str, voice: str, speed: float) -> str:
+        """Clé d'un segment (les phonèmes déterminent l'audio produit)"""
+        payload = "\x1f".join([model_variant(), voice, f"{speed:.3f}", phonemes])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Trames PCM du segment, ou None si absent"""
+        pcm = self._lru.get(key)
+        self.counters["hits" if pcm is not None else "misses"] += 1
+        return pcm
+    
+    def put(self, key: str, pcm: bytes):
+        self._lru.put(key, pcm, len(pcm))
+    
+    def stats(self) -> dict:
+        """Compteurs et occupation pour /stats"""
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "evictions": self._lru.evictions,
+            "hit_ratio": round(self.counters["hits"] / lookups, 3) if lookups else None,
+            "entries": len(self._lru),
+            "size_mb": round(self._lru.size_bytes / (1024 * 1024), 2)
+        }
+
+async def synthesize_with_fragments(text: str, voice: str, speed: float, timer=None, priority=None):
+    """
+    Synthèse phrase par phrase en réutilisant les fragments déjà produits
+    
+    1. Découpage + G2P dans l'exécuteur (mêmes segments que KPipeline
+       avec le découpage en phrases)
+    2. Recherche de chaque segment dans le cache de fragments
+    3. Synthèse des seuls segments manquants, directement depuis leurs phonèmes
+    4. Assemblage des trames PCM en WAV (aucun ré-encodage)
+    
+    Returns:
+        tuple: (wav_bytes, durée audio, infos par segment, taux de fragments en cache)
+    """
+    start = time.perf_counter()
+    segments, g2p_seconds = await inference_executor.run(
+        timed_job, phonemize_segments, text, SENTENCE_SPLIT_PATTERN, priority=priority
+    )
+    if timer is not None:
+        timer.add_job(time.perf_counter() - start, {"g2p": g2p_seconds})
+    if not segments:
+        raise ValueError("Aucun phonème produit pour ce texte")
+    
+    return await synthesize_segments(segments, voice, speed, admitted=True, timer=timer, priority=priority)
+
+async def synthesize_segments(segments: list, voice: str, speed: float, admitted: bool = False, timer=None,
+                              priority=None):
+    """
+    Synthèse de segments déjà phonémisés, via le cache de fragments s'il est actif
+    
+    Args:
+        segments (list): Segments (graphèmes, phonèmes)
+        admitted (bool): Requête déjà acceptée par l'exécuteur (cf. InferenceExecutor.run)
+        timer (StageTimer | None): Reçoit les durées d'attente, d'inférence et d'assemblage
+        priority (JobPriority | None): Priorité du travail d'inférence
+        
+    Returns:
+        tuple: (wav_bytes, durée audio, infos par segment, taux de fragments en cache)
+    """
+    if fragment_cache is not None:
+        keys = [FragmentCache.make_key(phonemes, voice, speed) for _, phonemes in segments]
+        pcm_segments = [fragment_cache.get(key) for key in keys]
+    else:
+        keys = None
+        pcm_segments = [None] * len(segments)
+    missing = [i for i, pcm in enumerate(pcm_segments) if pcm is None]
+    
+    # Segments repris du cache de fragments : aucune inférence
+    inference_seconds = [0.0] * len(segments)
+    if missing:
+        start = time.perf_counter()
+        synthesized, seconds = await inference_executor.run(
+            synthesize_phonemes, [segments[i][1] for i in missing], voice, speed,
+            admitted=admitted, priority=priority
+        )
+        if timer is not None:
+            timer.add_job(time.perf_counter() - start, {"inference": sum(seconds)})
+        for i, pcm, segment_seconds in zip(missing, synthesized, seconds):
+            pcm_segments[i] = pcm
+            inference_seconds[i] = segment_seconds
+            if keys is not None:
+                fragment_cache.put(keys[i], pcm)
+    
+    segments_info = [
+        {
+            "index": i, "graphemes": graphemes, "phonemes": phonemes, "samples": len(pcm) // 2,
+            "timings": {"g2p": 0.0, "inference": inference_seconds[i]}
+        }
+        for i, ((graphemes, phonemes), pcm) in enumerate(zip(segments, pcm_segments))
+    ]
+    total_samples = sum(info["samples"] for info in segments_info)
+    hit_ratio = round(1 - len(missing) / len(segments), 3) if keys is not None else None
+    
+    start = time.perf_counter()
+    wav_bytes = pcm_to_wav(pcm_segments)
+    if timer is not None:
+        timer.add("wav", time.perf_counter() - start)
+    
+    return wav_bytes, total_samples / SAMPLE_RATE, segments_info, hit_ratio
+
+class SingleFlight:
+    """
+    Coalescence des synthèses identiques en cours (single-flight)
+    
+    Quand un texte populaire arrive de nombreux clients à la fois (lien
+    partagé en lecture automatique), le cache ne sert qu'une fois la
+    première synthèse terminée : entre-temps chaque requête relançait la
+    même inférence. Ici la première requête d'une clé (texte, voix,
+    vitesse) lance la synthèse dans une tâche, les suivantes l'attendent.
+    - La tâche est protégée (asyncio.shield) : le départ d'un client,
+      même le premier, n'annule pas le travail des autres
+    - Une erreur est propagée à chaque requête en attente
+    - La clé est libérée dès la fin de la tâche (le cache prend le relais)
+    Utilisé uniquement depuis la boucle asyncio (pas de verrou nécessaire).
+    """
+    
+    def __init__(self):
+        self._flights = {}
+        self.started = 0
+        self.coalesced = 0
+    
+    def join(self, key: str) -> Optional[asyncio.Task]:
+        """Synthèse en cours pour cette clé, ou None"""
+        task = self._flights.get(key)
+        if task is not None:
+            self.coalesced += 1
+            coalesced_requests_total.inc()
+        return task
+    
+    def start(self, key: str, coroutine) -> asyncio.Task:
+        """Lancement de la synthèse d'une clé, partagée jusqu'à sa fin"""
+        task = asyncio.create_task(coroutine)
+        self._flights[key] = task
+        self.started += 1
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+    
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # Erreur déjà transmise aux requêtes (ou plus personne n'attend)
+    
+    async def wait(self, task: asyncio.Task):
+        """Résultat de la synthèse partagée (l'annulation de l'appelant ne l'interrompt pas)"""
+        return await asyncio.shield(task)
+    
+    def stats(self) -> dict:
+        """Synthèses en cours et requêtes coalescées pour /stats"""
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
+
+# ===============================
+# ENCODAGE AUDIO
+# ===============================
+
+def encode_audio(wav_bytes: bytes, audio_format: str) -> bytes:
+    """
+    Transcodage d'un WAV PCM 16 bits vers un format compressé
+    
+    Args:
+        wav_bytes (bytes): Fichier WAV produit par la synthèse
+        audio_format (str): Clé de AUDIO_FORMATS (opus, mp3, flac)
+        
+    Returns:
+        bytes: Fichier encodé
+    """
+    settings = AUDIO_FORMATS[audio_format]
+    audio, sample_rate = sf.read(io.BytesIO(wav_bytes), dtype="float32")
+    
+    buffer = io.BytesIO()
+    sf.write(
+        buffer, audio, samplerate=sample_rate,
+        format=settings["format"], subtype=settings["subtype"],
+        compression_level=settings.get("compression_level")
+    )
+    return buffer.getvalue()
+
+class AudioEncoder:
+    """
+    Étage d'encodage séparé de l'inférence
+    
+    Les encodeurs libsndfile (Opus, MP3, FLAC) libèrent le GIL : dans
+    leurs propres threads, l'encodage d'une requête se fait pendant
+    l'inférence de la suivante au lieu de l'allonger.
+    Tient aussi le compte des octets produits par seconde d'audio.
+    """
+    
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kokoro-encoder")
+        self.metrics = {
+            name: {"encoded": 0, "bytes": 0, "audio_seconds": 0.0}
+            for name in AUDIO_FORMATS if name != "wav"
+        }
+    
+    async def encode(self, wav_bytes: bytes, audio_format: str, audio_duration: float) -> bytes:
+        """Encodage dans l'étage dédié sans bloquer la boucle asyncio"""
+        loop = asyncio.get_running_loop()
+        encoded = await loop.run_in_executor(self._executor, encode_audio, wav_bytes, audio_format)
+        
+        metrics = self.metrics[audio_format]
+        metrics["encoded"] += 1
+        metrics["bytes"] += len(encoded)
+        metrics["audio_seconds"] += audio_duration
+        return encoded
+    
+    def stats(self) -> dict:
+        """Débit moyen par format (kbps) et gain par rapport au WAV 16 bits"""
+        wav_kbps = SAMPLE_RATE * 16 / 1000
+        stats = {}
+        for name, metrics in self.metrics.items():
+            kbps = (metrics["bytes"] * 8 / 1000 / metrics["audio_seconds"]) if metrics["audio_seconds"] else None
+            stats[name] = {
+                "encoded": metrics["encoded"],
+                "avg_kbps": round(kbps, 1) if kbps else None,
+                "ratio_vs_wav": round(wav_kbps / kbps, 1) if kbps else None
+            }
+        return stats
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+# ===============================
+# STOCKAGE AUDIO
+# ===============================
+
+def content_etag(data) -> str:
+    """ETag fort dérivé du contenu (identique pour deux fichiers identiques)"""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+class DiskAudioStore:
+    """
+    Stockage des fichiers audio générés dans un dossier
+    
+    Backend historique (un fichier par synthèse), utilisé seul ou comme
+    débordement du stockage mémoire. get() retourne le chemin du fichier :
+    l'envoi est laissé à FileResponse, sans charger le fichier en mémoire.
+    
+    Nombre de fichiers et taille totale sont tenus à jour à chaque écriture
+    et suppression (stats() en O(1)) ; reconcile() recompte le dossier pour
+    corriger une éventuelle dérive (suppression externe, arrêt brutal).
+    """
+    
+    backend = "disk"
+    
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._etags = {}  # nom -> ETag, calculé à l'écriture ou au premier accès
+        self._files_count, self._size_bytes = self._scan()
+    
+    def _path(self, name: str) -> Optional[Path]:
+        # Refus des noms contenant un chemin (../, sous-dossiers)
+        if not name or Path(name).name != name:
+            return None
+        return self.directory / name
+    
+    def _scan(self):
+        files_count = size_bytes = 0
+        for path in self.directory.glob("kokoro_*"):
+            if path.suffix.lstrip(".") not in AUDIO_FORMATS:
+                continue
+            try:
+                size_bytes += path.stat().st_size
+            except OSError:
+                continue
+            files_count += 1
+        return files_count, size_bytes
+    
+    def put(self, name: str, data: bytes, etag: Optional[str] = None):
+        path = self._path(name)
+        try:
+            previous_size = path.stat().st_size
+        except FileNotFoundError:
+            previous_size = None
+        path.write_bytes(data)
+        
+        with self._lock:
+            self._etags[name] = etag or content_etag(data)
+            if previous_size is None:
+                self._files_count += 1
+            else:
+                self._size_bytes -= previous_size
+            self._size_bytes += len(data)
+    
+    def get(self, name: str):
+        """Chemin du fichier, ou None s'il n'existe pas (ou plus)"""
+        path = self._path(name)
+        return path if path is not None and path.is_file() else None
+    
+    def etag(self, name: str) -> Optional[str]:
+        """ETag du fichier ; hachage via mmap pour un fichier écrit avant le redémarrage"""
+        with self._lock:
+            etag = self._etags.get(name)
+        if etag is not None:
+            return etag
+        
+        path = self.get(name)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                etag = content_etag(b"")
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    etag = content_etag(mapped)
+        with self._lock:
+            self._etags[name] = etag
+        return etag
+    
+    def delete(self, name: str) -> bool:
+        path = self._path(name)
+        if path is None:
+            return False
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        
+        with self._lock:
+            self._etags.pop(name, None)
+            self._files_count -= 1
+            self._size_bytes -= size
+        return True
+    
+    def reconcile(self) -> bool:
+        """
+        Recomptage complet du dossier (tâche de fond périodique)
+        
+        Returns:
+            bool: True si les compteurs avaient dérivé et ont été corrigés
+        """
+        files_count, size_bytes = self._scan()
+        with self._lock:
+            drifted = (files_count, size_bytes) != (self._files_count, self._size_bytes)
+            if drifted:
+                logger.info(
+                    f"🔁 Compteurs audio corrigés: {self._files_count} → {files_count} fichier(s), "
+                    f"{self._size_bytes} → {size_bytes} octets"
+                )
+                self._files_count, self._size_bytes = files_count, size_bytes
+        return drifted
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files_count": self._files_count,
+                "size_bytes": self._size_bytes
+            }
+
+class MemoryAudioStore:
+    """
+    Stockage des fichiers audio générés en mémoire
+    
+    Les fichiers sont gardés tels quels (objets bytes immuables) et servis
+    directement depuis ce tampon, sans copie ni accès disque. Au-delà du
+    budget, les plus anciens sont déplacés vers le stockage de débordement
+    (disque) s'il existe, sinon supprimés.
+    Thread-safe (put est appelé hors de la boucle asyncio).
+    """
+    
+    backend = "memory"
+    
+    def __init__(self, budget_bytes: int, spill: Optional[DiskAudioStore] = None):
+        self.budget_bytes = budget_bytes
+        self.spill = spill
+        self._files = OrderedDict()  # nom -> (bytes, ETag), du plus ancien au plus récent
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.spilled = 0
+        self.dropped = 0
+    
+    def put(self, name: str, data: bytes):
+        etag = content_etag(data)
+        with self._lock:
+            self._size_bytes -= len(self._files.pop(name, (b"", None))[0])
+            self._files[name] = (data, etag)
+            self._size_bytes += len(data)
+            
+            evicted = []
+            while self._size_bytes > self.budget_bytes and len(self._files) > 1:
+                old_name, (old_data, old_etag) = self._files.popitem(last=False)
+                self._size_bytes -= len(old_data)
+                evicted.append((old_name, old_data, old_etag))
+        
+        # Écritures disque hors du verrou
+        for old_name, old_data, old_etag in evicted:
+            if self.spill is not None:
+                self.spill.put(old_name, old_data, old_etag)
+                self.spilled += 1
+            else:
+                self.dropped += 1
+    
+    def get(self, name: str):
+        """Contenu (bytes) en mémoire, chemin si débordé sur disque, sinon None"""
+        with self._lock:
+            entry = self._files.get(name)
+        if entry is not None:
+            return entry[0]
+        return self.spill.get(name) if self.spill is not None else None
+    
+    def etag(self, name: str) -> Optional[str]:
+        with self._lock:
+            entry = self._files.get(name)
+        if entry is not None:
+            return entry[1]
+        return self.spill.etag(name) if self.spill is not None else None
+    
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            entry = self._files.pop(name, None)
+            if entry is not None:
+                self._size_bytes -= len(entry[0])
+                return True
+        return self.spill.delete(name) if self.spill is not None else False
+    
+    def reconcile(self) -> bool:
+        # Les compteurs mémoire sont exacts par construction
+        return self.spill.reconcile() if self.spill is not None else False
+    
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "files_count": len(self._files),
+                "size_bytes": self._size_bytes,
+                "memory_files": len(self._files),
+                "memory_size_bytes": self._size_bytes,
+                "spilled": self.spilled,
+                "dropped": self.dropped
+            }
+        if self.spill is not None:
+            spill_stats = self.spill.stats()
+            stats["files_count"] += spill_stats["files_count"]
+            stats["size_bytes"] += spill_stats["size_bytes"]
+        return stats
+
+class AudioJanitor:
+    """
+    Nettoyeur unique des fichiers audio générés
+    
+    Remplace une tâche endormie par fichier : les échéances sont gardées
+    dans un tas (expiration, nom) et une seule tâche asyncio supprime les
+    fichiers arrivés à expiration. L'échéancier est sauvegardé dans le
+    dossier audio (.expiry.json) pour survivre aux redémarrages.
+    
+    Au démarrage, sweep() parcourt une fois le dossier : fichiers expirés
+    supprimés, puis les plus proches de l'expiration jusqu'à respecter le
+    plafond en octets, le reste replanifié. La même tâche recompte
+    périodiquement le stockage pour corriger ses compteurs.
+    """
+    
+    def __init__(self, store, ttl_seconds: int, state_path: Path):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.state_path = state_path
+        self._heap = []  # (expire_at, nom)
+        self._lock = threading.Lock()  # run_expired et save tournent hors de la boucle
+        self._dirty = False
+        self._task = None
+        self.expired = 0
+    
+    def schedule(self, name: str, expire_at: Optional[float] = None):
+        """Planification de la suppression d'un fichier (défaut : maintenant + TTL)"""
+        if expire_at is None:
+            expire_at = time.time() + self.ttl_seconds
+        with self._lock:
+            heapq.heappush(self._heap, (expire_at, name))
+            self._dirty = True
+    
+    def sweep(self, directory: Path, max_bytes: int):
+        """
+        Nettoyage initial du dossier audio
+        
+        Les échéances sauvegardées sont reprises ; un fichier inconnu de
+        l'échéancier (arrêt brutal) expire TTL secondes après sa dernière
+        modification.
+        
+        Returns:
+            tuple: (fichiers supprimés, fichiers conservés)
+        """
+        saved = {}
+        try:
+            saved = json.loads(self.state_path.read_text())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Échéancier audio illisible, reconstruit depuis le dossier: {e}")
+        
+        now = time.time()
+        files = []
+        removed = 0
+        for path in directory.glob("kokoro_*"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            expire_at = saved.get(path.name, st.st_mtime + self.ttl_seconds)
+            if expire_at <= now:
+                removed += self.store.delete(path.name)
+            else:
+                files.append((expire_at, path.name, st.st_size))
+        
+        # Plafond en octets : les plus proches de l'expiration partent d'abord
+        files.sort()
+        total_bytes = sum(size for _, _, size in files)
+        while files and total_bytes > max_bytes:
+            _, name, size = files.pop(0)
+            removed += self.store.delete(name)
+            total_bytes -= size
+        
+        with self._lock:
+            self._heap = [(expire_at, name) for expire_at, name, _ in files]
+            heapq.heapify(self._heap)
+            self._dirty = True
+        self.save()
+        return removed, len(files)
+    
+    def run_expired(self) -> int:
+        """Suppression des fichiers arrivés à échéance, retourne leur nombre"""
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+            if due:
+                self._dirty = True
+        
+        removed = 0
+        for name in due:
+            try:
+                if self.store.delete(name):
+                    removed += 1
+            except Exception as e:
+                logger.warning(f"⚠️  Impossible de supprimer {name}: {e}")
+        if removed:
+            self.expired += removed
+            logger.info(f"🗑️  Auto-suppression: {removed} fichier(s) expiré(s)")
+        return removed
+    
+    def save(self):
+        """Écriture atomique de l'échéancier (fichier temporaire puis renommage)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            state = {name: expire_at for expire_at, name in self._heap}
+            self._dirty = False
+        tmp_path = self.state_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(state))
+            tmp_path.replace(self.state_path)
+        except OSError as e:
+            self._dirty = True
+            logger.warning(f"⚠️  Sauvegarde de l'échéancier audio impossible: {e}")
+    
+    async def _run(self):
+        last_save = last_reconcile = time.time()
+        while True:
+            delay = JANITOR_INTERVAL_SECONDS
+            if self._heap:
+                delay = min(delay, max(self._heap[0][0] - time.time(), 0))
+            await asyncio.sleep(delay)
+            await asyncio.to_thread(self.run_expired)
+            
+            # Sauvegarde au plus une fois par intervalle (l'échéancier peut être gros)
+            if time.time() - last_save >= JANITOR_INTERVAL_SECONDS:
+                await asyncio.to_thread(self.save)
+                last_save = time.time()
+            
+            # Recomptage périodique du stockage (dérive des compteurs)
+            if time.time() - last_reconcile >= AUDIO_RECONCILE_SECONDS:
+                await asyncio.to_thread(self.store.reconcile)
+                last_reconcile = time.time()
+    
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.save()
+    
+    def stats(self) -> dict:
+        return {
+            "scheduled": len(self._heap),
+            "expired": self.expired,
+            "next_expiry_seconds": (
+                round(max(self._heap[0][0] - time.time(), 0), 1) if self._heap else None
+            )
+        }
+
+def create_audio_store(backend: str):
+    """Construction du stockage audio configuré (KOKORO_AUDIO_STORE)"""
+    disk_store = DiskAudioStore(Path(AUDIO_STORE_DIR))
+    if backend == "disk":
+        return disk_store
+    if backend == "memory":
+        return MemoryAudioStore(AUDIO_STORE_MEMORY_MB * 1024 * 1024, spill=disk_store)
+    raise ValueError(f"Stockage audio inconnu: {backend} (attendu: memory, disk)")
+
+# ===============================
+# ORDONNANCEMENT PAR PRIORITÉ
+# ===============================
+
+class JobPriority:
+    """Classe de service et coût estimé (secondes de calcul) d'un travail d'inférence"""
+    
+    __slots__ = ("tier", "cost")
+    
+    def __init__(self, tier: str = "free", cost: float = 0.0):
+        self.tier = tier
+        self.cost = cost
+    
+    @classmethod
+    def combine(cls, priorities: list) -> "JobPriority":
+        """Priorité d'un lot : meilleure classe de ses membres, coûts additionnés"""
+        priorities = [p for p in priorities if p is not None] or [cls()]
+        tier = min((p.tier for p in priorities), key=PRIORITY_TIERS.index)
+        return cls(tier, sum(p.cost for p in priorities))
+
+class SynthesisScheduler:
+    """
+    Attribution des workers d'inférence par priorité
+    
+    Les exécuteurs servaient les travaux dans l'ordre d'arrivée : un texte
+    de 2000 caractères d'un utilisateur gratuit retardait la phrase d'un
+    utilisateur premium. Ici au plus `slots` travaux (un par worker) sont
+    confiés à l'exécuteur, les autres attendent et le prochain servi est :
+    - la classe la plus prioritaire (premium avant free) ;
+    - dans une classe, le plus court coût estimé (shortest job first),
+      diminué de PRIORITY_AGING × attente pour éviter la famine ;
+    - un travail qui attend depuis PRIORITY_PROMOTE_SECONDS passe dans
+      la classe supérieure.
+    La file est bornée par la limite de l'exécuteur : recherche linéaire.
+    Utilisé uniquement depuis la boucle asyncio (pas de verrou nécessaire).
+    """
+    
+    def __init__(self, slots: int, aging: float, promote_after: float):
+        self.slots = slots
+        self.aging = aging
+        self.promote_after = promote_after
+        self.busy = 0
+        self._waiting = []  # [(priorité, horodatage d'entrée, future)]
+        self.dispatched = {tier: 0 for tier in PRIORITY_TIERS}
+        self.promoted = 0
+    
+    def _rank(self, entry, now: float) -> tuple:
+        priority, enqueued_at, _ = entry
+        waited = now - enqueued_at
+        tier = PRIORITY_TIERS.index(priority.tier)
+        if waited >= self.promote_after:
+            tier = max(tier - 1, 0)
+        return tier, priority.cost - self.aging * waited, enqueued_at
+    
+    @asynccontextmanager
+    async def slot(self, priority: Optional[JobPriority] = None):
+        """Attente d'un worker libre selon la priorité du travail"""
+        priority = priority or JobPriority()
+        if self.busy < self.slots and not self._waiting:
+            self.busy += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            entry = (priority, time.perf_counter(), future)
+            self._waiting.append(entry)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()  # Worker attribué juste avant l'annulation
+                else:
+                    self._waiting.remove(entry)
+                raise
+        self.dispatched[priority.tier] += 1
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def _release(self):
+        self.busy -= 1
+        while self._waiting and self.busy < self.slots:
+            now = time.perf_counter()
+            entry = min(self._waiting, key=lambda e: self._rank(e, now))
+            self._waiting.remove(entry)
+            if PRIORITY_TIERS.index(entry[0].tier) != self._rank(entry, now)[0]:
+                self.promoted += 1
+            self.busy += 1
+            entry[2].set_result(None)
+    
+    def stats(self) -> dict:
+        """Occupation et répartition par classe pour /stats"""
+        waiting = {tier: 0 for tier in PRIORITY_TIERS}
+        for priority, _, _ in self._waiting:
+            waiting[priority.tier] += 1
+        return {
+            "slots": self.slots,
+            "busy": self.busy,
+            "waiting": waiting,
+            "dispatched": dict(self.dispatched),
+            "promoted": self.promoted
+        }
+
+class LatencyWindow:
+    """Latences récentes d'une classe de service (percentiles exacts sur une fenêtre glissante)"""
+    
+    def __init__(self, size: int = 1000):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+    
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentile par rang le plus proche (None sans mesure)"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+    
+    def stats(self) -> dict:
+        p50, p99 = self.percentile(50), self.percentile(99)
+        return {
+            "count": self.count,
+            "p50_seconds": round(p50, 4) if p50 is not None else None,
+            "p99_seconds": round(p99, 4) if p99 is not None else None
+        }
+
+def request_tier(http_request: Request) -> str:
+    """
+    Classe de service d'une requête HTTP
+    
+    L'API n'a pas accès aux comptes : le backend, qui connaît is_premium,
+    transmet la classe dans X-Kokoro-Tier. L'en-tête n'est pris en compte
+    qu'accompagné du jeton partagé X-Kokoro-Token (KOKORO_PRIORITY_TOKEN),
+    sinon n'importe quel client pourrait se déclarer premium. La comparaison
+    porte sur les octets bruts de l'en-tête (Starlette les décode en latin-1) :
+    compare_digest refuse les chaînes non ASCII.
+    """
+    tier = http_request.headers.get("x-kokoro-tier", "free").lower()
+    token = http_request.headers.get("x-kokoro-token", "").encode("latin-1")
+    if tier not in PRIORITY_TIERS or not PRIORITY_TOKEN or not hmac.compare_digest(token, PRIORITY_TOKEN.encode()):
+        return "free"
+    return tier
+
+def estimate_compute_seconds(text_length: int, speed: float) -> float:
+    """Coût estimé d'une synthèse (secondes de calcul), pour le shortest job first"""
+    if admission is not None:
+        return admission.estimate(text_length, speed) * admission.rtf
+    return text_length / (ADMISSION_CHARS_PER_SECOND * (speed or 1.0)) * ADMISSION_INITIAL_RTF
+
+# ===============================
+# TOPOLOGIE CPU
+# ===============================
+
+def parse_cpulist(cpulist: str) -> list:
+    """Liste de CPU au format du noyau Linux ("0-3,8-11") en liste d'entiers"""
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+def available_cpus() -> list:
+    """CPU utilisables par le processus (masque d'affinité courant, cgroups compris)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def numa_nodes(cpus: list) -> list:
+    """CPU utilisables regroupés par nœud NUMA (un seul groupe, nœud None, si la topologie est inconnue)"""
+    nodes = []
+    for node_dir in sorted(Path("/sys/devices/system/node").glob("node[0-9]*"), key=lambda d: int(d.name[4:])):
+        try:
+            node_cpus = [cpu for cpu in parse_cpulist((node_dir / "cpulist").read_text()) if cpu in cpus]
+        except (OSError, ValueError):
+            continue
+        if node_cpus:
+            nodes.append((int(node_dir.name[4:]), node_cpus))
+    if sum(len(node_cpus) for _, node_cpus in nodes) != len(cpus):
+        return [(None, list(cpus))]
+    return nodes
+
+def plan_cpu_topology(workers: int, intra_op: int = 0, inter_op: int = 1, pin: bool = True,
+                      cpus: Optional[list] = None) -> list:
+    """
+    Répartition des cœurs entre les workers d'inférence
+    
+    Sans consigne, PyTorch lance autant de threads intra-op que de cœurs
+    dans chaque processus : N workers sur-souscrivent la machine N fois.
+    Ici les workers sont répartis entre les nœuds NUMA au prorata de leurs
+    cœurs, puis chaque nœud est découpé en tranches contiguës disjointes :
+    un worker ne chevauche jamais deux nœuds (ses allocations, faites sur
+    le nœud où il tourne, restent locales). Plus de workers que de cœurs :
+    pas d'épinglage possible, les threads sont seulement bornés.
+    
+    Args:
+        workers (int): Nombre de workers d'inférence
+        intra_op (int): Threads intra-op par worker (0 = taille de sa tranche)
+        inter_op (int): Threads inter-op (identique pour tous, cf. INFERENCE_INTER_OP_THREADS)
+        pin (bool): Épinglage des workers sur leur tranche
+        cpus (list | None): CPU à répartir (défaut : ceux du processus)
+        
+    Returns:
+        list: Pour chaque worker, {"worker", "cpus", "numa_node", "pinned",
+        "intra_op_threads", "inter_op_threads"}
+    """
+    cpus = cpus or available_cpus()
+    nodes = numa_nodes(cpus)
+    
+    if workers > len(cpus):
+        threads = intra_op or 1
+        return [
+            {"worker": i, "cpus": cpus, "numa_node": None, "pinned": False,
+             "intra_op_threads": threads, "inter_op_threads": inter_op}
+            for i in range(workers)
+        ]
+    
+    # Workers par nœud au prorata des cœurs (plus forts restes), au moins un cœur chacun
+    shares = [workers * len(node_cpus) / len(cpus) for _, node_cpus in nodes]
+    counts = [min(int(share), len(node_cpus)) for share, (_, node_cpus) in zip(shares, nodes)]
+    for index in sorted(range(len(nodes)), key=lambda i: shares[i] - counts[i], reverse=True):
+        if sum(counts) >= workers:
+            break
+        if counts[index] < len(nodes[index][1]):
+            counts[index] += 1
+    
+    layout = []
+    for (node, node_cpus), count in zip(nodes, counts):
+        for k in range(count):
+            start = k * len(node_cpus) // count
+            end = (k + 1) * len(node_cpus) // count
+            slice_cpus = node_cpus[start:end]
+            layout.append({
+                "worker": len(layout),
+                "cpus": slice_cpus,
+                "numa_node": node,
+                "pinned": pin,
+                "intra_op_threads": intra_op or len(slice_cpus),
+                "inter_op_threads": inter_op
+            })
+    return layout
+
+def format_cpulist(cpus: list) -> str:
+    """Liste d'entiers en format compact du noyau ("0-3,8")"""
+    ranges = []
+    for cpu in cpus:
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(f"{a}-{b}" if a != b else str(a) for a, b in ranges)
+
+def api_process_threads(layout: list, threads: int = 0) -> int:
+    """
+    Threads intra-op du processus de l'API à côté d'un pool de workers
+    
+    Le streaming infère dans le processus de l'API (générateurs non
+    sérialisables) : laissé au défaut de PyTorch, chaque flux lancerait un
+    thread par cœur en plus des workers épinglés. Par défaut il reçoit les
+    cœurs qu'aucun worker n'occupe, au moins un.
+    """
+    if threads > 0:
+        return threads
+    used = {cpu for worker in layout if worker["pinned"] for cpu in worker["cpus"]}
+    return max(1, len(set(available_cpus()) - used))
+
+def log_cpu_topology(layout: list, api_threads: Optional[int] = None):
+    """Rapport de démarrage : cœurs, nœud NUMA et threads de chaque worker (et du processus de l'API)"""
+    total_threads = sum(worker["intra_op_threads"] for worker in layout) + (api_threads or 0)
+    logger.info(
+        f"🧩 Topologie CPU: {len(layout)} worker(s) sur {len(available_cpus())} CPU, "
+        f"{total_threads} thread(s) intra-op au total"
+    )
+    for worker in layout:
+        node = f"NUMA {worker['numa_node']}" if worker["numa_node"] is not None else "NUMA -"
+        logger.info(
+            f"   Worker {worker['worker']}: CPU {format_cpulist(worker['cpus'])} ({node}), "
+            f"{'épinglé' if worker['pinned'] else 'non épinglé'}, "
+            f"{worker['intra_op_threads']} intra-op / {worker['inter_op_threads']} inter-op"
+        )
+    if api_threads is not None:
+        logger.info(f"   Processus API (streaming): non épinglé, {api_threads} intra-op")
+    if total_threads > len(available_cpus()):
+        logger.warning("⚠️  Plus de threads intra-op que de CPU : sur-souscription")
+
+def apply_cpu_topology(worker: dict):
+    """Affinité et threads intra-op du processus courant selon sa place dans la topologie"""
+    import torch
+    if worker["pinned"] and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, worker["cpus"])
+    torch.set_num_threads(worker["intra_op_threads"])
+
+# ===============================
+# QUANTIFICATION INT8
+# ===============================
+
+# Corpus fixe des contrôles qualité : quantification int8, parité des moteurs
+# (phrases courtes et longues, chiffres, questions)
+QUALITY_CORPUS = [
+    "Hello, API is ready!",
+    "Your order has shipped and will arrive tomorrow morning.",
+    "The quick brown fox jumps over the lazy dog.",
+    "Please call us back at 555 0123 before 5 pm, or simply reply to this message.",
+    "Did you know? Octopuses have three hearts, blue blood, and nine brains.",
+]
+
+def model_variant() -> str:
+    """Identifiant du modèle servi, intégré aux clés de cache (moteur et quantification changent l'audio)"""
+    variant = MODEL_VERSION
+    if inference_engine is not None and inference_engine.name != "torch":
+        variant += f"+{inference_engine.name}"
+    if model_quantization:
+        variant += f"+{model_quantization}"
+    return variant
+
+def _no_flatten_parameters():
+    pass
+
+def quantize_model_int8(model):
+    """
+    Quantification dynamique int8 du modèle, en place (CPU uniquement)
+    
+    Les poids des couches Linear et LSTM (PL-BERT, encodeur de texte,
+    prédicteurs de durée et de prosodie) sont stockés en int8 et les
+    activations quantifiées à la volée : produits matriciels int8 et poids
+    4 fois plus légers pour ces couches. Les convolutions du décodeur
+    restent en fp32. En place : le weight_norm du décodeur empêche toute
+    copie profonde du modèle.
+    """
+    import torch
+    torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8, inplace=True
+    )
+    # Kokoro appelle flatten_parameters() (réservé à cuDNN), absent des LSTM quantifiés
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.LSTM):
+            module.flatten_parameters = _no_flatten_parameters
+    return model
+
+def log_spectrogram(audio, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    """Spectre d'amplitude en dB, une ligne par trame (fenêtre de Hann)"""
+    audio = np.asarray(audio, dtype=np.float32)
+    if len(audio) < n_fft:
+        audio = np.pad(audio, (0, n_fft - len(audio)))
+    frames = np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop] * np.hanning(n_fft)
+    return 20 * np.log10(np.maximum(np.abs(np.fft.rfft(frames, axis=1)), 1e-10))
+
+def spectral_distance(reference, candidate) -> float:
+    """
+    Distance log-spectrale (dB) entre deux synthèses du même texte
+    
+    Écart RMS des spectres en dB entre trames appariées, moyenné le long
+    d'un alignement DTW : une durée de phonème arrondie différemment
+    (fp32 vs int8) décale la suite du signal sans en changer le contenu.
+    Dynamique limitée à 60 dB sous le pic commun (silences, bruit de fond).
+    """
+    ref = log_spectrogram(reference)
+    cand = log_spectrogram(candidate)
+    floor = max(ref.max(), cand.max()) - 60
+    ref, cand = np.maximum(ref, floor), np.maximum(cand, floor)
+    squared = (ref ** 2).sum(axis=1)[:, None] + (cand ** 2).sum(axis=1)[None, :] - 2 * ref @ cand.T
+    cost = np.sqrt(np.maximum(squared, 0) / ref.shape[1]).tolist()
+    
+    # DTW : coût cumulé minimal et longueur du chemin correspondant
+    n, m = len(cost), len(cost[0])
+    total = [[math.inf] * (m + 1) for _ in range(n + 1)]
+    steps = [[0] * (m + 1) for _ in range(n + 1)]
+    total[0][0] = 0.0
+    for i in range(1, n + 1):
+        row, above, current = cost[i - 1], total[i - 1], total[i]
+        steps_above, steps_current = steps[i - 1], steps[i]
+        for j in range(1, m + 1):
+            best, best_steps = above[j - 1], steps_above[j - 1]
+            if above[j] < best:
+                best, best_steps = above[j], steps_above[j]
+            if current[j - 1] < best:
+                best, best_steps = current[j - 1], steps_current[j - 1]
+            current[j] = best + row[j - 1]
+            steps_current[j] = best_steps + 1
+    return total[n][m] / steps[n][m]
+
+def synthesize_corpus(pipeline, corpus: list, voice: str = "af_heart", seed: int = 0):
+    """
+    Synthèse de chaque texte du corpus, retourne (audios, durée de calcul)
+    
+    Le décodeur tire une excitation aléatoire : chaque texte part de la même
+    graine, deux passes (fp32 puis int8) ne diffèrent alors que par le modèle.
+    L'état du générateur global est restauré ensuite.
+    """
+    import torch
+    start = time.perf_counter()
+    outputs = []
+    with torch.random.fork_rng(devices=[]):
+        for text in corpus:
+            torch.manual_seed(seed)
+            outputs.append(np.concatenate([
+                np.asarray(audio, dtype=np.float32) for _, _, audio in pipeline(text, voice=voice)
+            ]))
+    return outputs, time.perf_counter() - start
+
+def quantize_pipeline(pipeline, max_distance_db: float, corpus: Optional[list] = None,
+                      voice: str = "af_heart") -> dict:
+    """
+    Quantification int8 du modèle du pipeline, validée face au fp32
+    
+    Le corpus est synthétisé en fp32 puis en int8 (voix, texte et graine
+    identiques : décision reproductible d'un démarrage à l'autre) ; au-delà de max_distance_db de distance spectrale moyenne,
+    le modèle fp32 est rechargé (la quantification en place n'est pas
+    réversible).
+    
+    Returns:
+        dict: Rapport (appliquée ou non, distances par texte et moyenne,
+        temps de synthèse du corpus fp32 / int8)
+    """
+    corpus = corpus or QUALITY_CORPUS
+    reference, fp32_seconds = synthesize_corpus(pipeline, corpus, voice)
+    quantize_model_int8(pipeline.model)
+    candidate, int8_seconds = synthesize_corpus(pipeline, corpus, voice)
+    
+    distances = [spectral_distance(ref, cand) for ref, cand in zip(reference, candidate)]
+    mean_distance = sum(distances) / len(distances)
+    applied = mean_distance <= max_distance_db
+    if not applied:
+        from kokoro import KModel
+        pipeline.model = KModel(repo_id=pipeline.repo_id).eval()
+    
+    return {
+        "mode": "int8",
+        "applied": applied,
+        "distance_db": round(mean_distance, 3),
+        "max_distance_db": max_distance_db,
+        "distances_db": [round(distance, 3) for distance in distances],
+        "corpus_fp32_seconds": round(fp32_seconds, 3),
+        "corpus_int8_seconds": round(int8_seconds, 3)
+    }
+
+# ===============================
+# MOTEURS D'INFÉRENCE
+# ===============================
+
+class TorchEngine:
+    """
+    Moteur PyTorch eager : KModel porté par le KPipeline
+    
+    Un moteur ne fait que phonèmes + voix -> audio : le front-end texte
+    (G2P, découpage en segments, lexique) et les voix restent ceux du
+    KPipeline, communs à tous les moteurs. Seul moteur compatible avec
+    le micro-batching (batched_forward) et la quantification int8.
+    """
+    
+    name = "torch"
+    supports_batching = True
+    
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+    
+    def synthesize(self, phonemes: str, voice: str, speed: float):
+        """Audio (float32) d'un segment d'au plus 510 phonèmes"""
+        for _, _, audio in self.pipeline.generate_from_tokens(phonemes, voice=voice, speed=speed):
+            return audio
+    
+    def prepare(self):
+        """Préparation dans le processus qui va inférer (rien à faire : poids hérités du fork)"""
+    
+    def release(self):
+        """Libération des ressources du processus courant (rien à libérer : poids partagés au fork)"""
+    
+    def stats(self) -> dict:
+        return {"engine": self.name}
+
+def export_onnx_model(repo_id: str, path: Path):
+    """
+    Export du modèle acoustique Kokoro en ONNX
+    
+    Décodeur sans nombres complexes (disable_complex : STFT de kokoro prévu
+    pour l'export) et longueur de phonèmes dynamique. Écriture dans un
+    fichier temporaire puis renommage : un export interrompu n'est jamais
+    pris pour un modèle valide.
+    """
+    import torch
+    from kokoro.model import KModel, KModelForONNX
+    
+    model = KModel(repo_id=repo_id, disable_complex=True).eval()
+    input_ids = torch.tensor([[0, *range(1, 31), 0]], dtype=torch.long)
+    style = torch.zeros((1, 256), dtype=torch.float32)
+    speed = torch.ones(1, dtype=torch.float32)
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    torch.onnx.export(
+        KModelForONNX(model).eval(),
+        (input_ids, style, speed),
+        str(temp_path),
+        input_names=["input_ids", "style", "speed"],
+        output_names=["waveform", "duration"],
+        dynamic_axes={"input_ids": {1: "tokens"}, "waveform": {0: "samples"}, "duration": {0: "tokens"}},
+        opset_version=20,
+        dynamo=False
+    )
+    os.replace(temp_path, path)
+
+class OnnxEngine:
+    """
+    Moteur ONNX Runtime (fournisseur CPU)
+    
+    Le modèle est exporté au premier démarrage (export_onnx_model) puis
+    rechargé tel quel. Le KPipeline n'a alors plus besoin de KModel
+    (model=False) : il ne sert qu'au G2P et aux voix. Une session par
+    processus, créée au premier usage : les pools de threads d'ORT ne
+    survivent pas au fork, et chaque worker dimensionne la sienne sur les
+    threads que lui attribue la topologie CPU.
+    """
+    
+    name = "onnx"
+    supports_batching = False
+    
+    def __init__(self, pipeline, model_path: Path, vocab: dict):
+        import onnxruntime
+        self.pipeline = pipeline
+        self.model_path = model_path
+        self.vocab = vocab
+        self._onnxruntime = onnxruntime
+        self._session = None
+        self._session_pid = None
+    
+    @classmethod
+    def load(cls, pipeline, model_dir: Path, model_version: str) -> "OnnxEngine":
+        """Moteur prêt à servir, avec export préalable du modèle s'il est absent"""
+        from huggingface_hub import hf_hub_download
+        
+        model_path = model_dir / f"{model_version}.onnx"
+        if not model_path.exists():
+            logger.info(f"📤 Export ONNX du modèle vers {model_path} (une seule fois)...")
+            start = time.time()
+            export_onnx_model(pipeline.repo_id, model_path)
+            logger.info(f"✅ Modèle exporté en {time.time() - start:.1f}s")
+        with open(hf_hub_download(repo_id=pipeline.repo_id, filename="config.json"), encoding="utf-8") as f:
+            vocab = json.load(f)["vocab"]
+        return cls(pipeline, model_path, vocab)
+    
+    @property
+    def session(self):
+        if self._session_pid != os.getpid():
+            import torch
+            options = self._onnxruntime.SessionOptions()
+            options.intra_op_num_threads = torch.get_num_threads()
+            options.inter_op_num_threads = INFERENCE_INTER_OP_THREADS
+            options.graph_optimization_level = self._onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = self._onnxruntime.InferenceSession(
+                str(self.model_path), options, providers=["CPUExecutionProvider"]
+            )
+            self._session_pid = os.getpid()
+        return self._session
+    
+    def synthesize(self, phonemes: str, voice: str, speed: float):
+        """Audio (float32) d'un segment d'au plus 510 phonèmes"""
+        if len(phonemes) > 510:
+            raise ValueError(f"Séquence de phonèmes trop longue: {len(phonemes)} > 510")
+        input_ids = [0, *(self.vocab[p] for p in phonemes if p in self.vocab), 0]
+        style = self.pipeline.load_voice(voice)[len(phonemes) - 1]
+        audio, _ = self.session.run(None, {
+            "input_ids": np.array([input_ids], dtype=np.int64),
+            "style": np.asarray(style, dtype=np.float32),
+            "speed": np.array([speed], dtype=np.float32)
+        })
+        return audio
+    
+    def prepare(self):
+        """Création de la session dans le processus courant (worker : avant sa première requête)"""
+        self.session
+    
+    def release(self):
+        """Fermeture de la session du processus courant (parent d'un pool : seuls les workers infèrent)"""
+        self._session = None
+        self._session_pid = None
+    
+    def stats(self) -> dict:
+        return {
+            "engine": self.name,
+            "model_path": str(self.model_path),
+            "onnxruntime_version": self._onnxruntime.__version__
+        }
+
+class CompiledTorchEngine(TorchEngine):
+    """
+    Moteur PyTorch avec étage phonèmes tracé (TorchScript) par palier de longueur
+    
+    En eager, chaque segment paie le dispatch Python de chaque opérateur.
+    Ici l'étage phonèmes (token_stage : ALBERT, durées, encodeur de texte)
+    est tracé une fois par palier : la séquence est paddée au palier
+    supérieur et les masques rendent le padding exact, un même graphe sert
+    donc toutes les longueurs du palier. L'étage trames (F0/énergie,
+    décodeur) reste en eager : son nombre de trames dépend des durées
+    prédites et ses normalisations d'instance portent sur l'axe temporel,
+    il ne se padde pas (torch.compile y recompilerait à chaque longueur).
+    Traçage au démarrage (warm_up), avant le fork : graphes hérités par les
+    workers, poids partagés avec le modèle (pas de gel des constantes).
+    """
+    
+    def __init__(self, pipeline, buckets: tuple):
+        super().__init__(pipeline)
+        self.buckets = buckets
+        self.warmup_seconds = {}
+        self._graphs = {}
+    
+    def warm_up(self) -> dict:
+        """Traçage et premières exécutions de chaque palier, retourne les durées par palier"""
+        import torch
+        import warnings
+        
+        model = self.pipeline.model
+        
+        # Module porteur : les poids restent des paramètres partagés avec le modèle
+        class TokenStage(torch.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.model = model
+            
+            def forward(self, *inputs):
+                return token_stage(self.model, *inputs)
+        
+        module = TokenStage().eval()
+        for bucket in self.buckets:
+            start = time.perf_counter()
+            try:
+                length = bucket // 2 + 1
+                input_ids = torch.zeros((1, bucket), dtype=torch.long, device=model.device)
+                input_ids[0, 1:length - 1] = 1
+                lengths = torch.tensor([length], device=model.device)
+                text_mask = torch.arange(bucket, device=model.device).unsqueeze(0) >= lengths.unsqueeze(1)
+                example = (input_ids, lengths, text_mask,
+                           torch.zeros((1, 128), device=model.device), torch.ones((1, 1), device=model.device))
+                with torch.no_grad(), warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    graph = torch.jit.trace(module, example, check_trace=False)
+                    # L'exécuteur TorchScript optimise le graphe lors des premiers appels
+                    for _ in range(2):
+                        graph(*example)
+            except Exception as e:
+                logger.warning(f"⚠️  Palier {bucket} non compilé ({e}), repli eager")
+                continue
+            self._graphs[bucket] = graph
+            self.warmup_seconds[bucket] = time.perf_counter() - start
+        return self.warmup_seconds
+    
+    def synthesize(self, phonemes: str, voice: str, speed: float):
+        """Audio (float32) d'un segment d'au plus 510 phonèmes (eager hors paliers compilés)"""
+        model = self.pipeline.model
+        tokens = 2 + sum(1 for p in phonemes if p in model.vocab)
+        bucket = next((b for b in self.buckets if b >= tokens), None)
+        if bucket not in self._graphs:
+            return super().synthesize(phonemes, voice, speed)
+        ref_s = self.pipeline.load_voice(voice).to(model.device)[len(phonemes) - 1]
+        return batched_forward(model, [(phonemes, ref_s, speed)], pad_to=bucket, stage=self._graphs[bucket])[0]
+    
+    def stats(self) -> dict:
+        return {
+            "engine": self.name,
+            "compiled_buckets": sorted(self._graphs),
+            "warmup_seconds": {bucket: round(seconds, 2) for bucket, seconds in self.warmup_seconds.items()}
+        }
+
+def create_inference_engine(engine: str, pipeline):
+    """Construction du moteur d'inférence configuré (KOKORO_ENGINE, KOKORO_COMPILE)"""
+    if engine == "torch" and MODEL_COMPILE:
+        return CompiledTorchEngine(pipeline, COMPILE_BUCKETS)
+    if engine == "torch":
+        return TorchEngine(pipeline)
+    if engine == "onnx":
+        return OnnxEngine.load(pipeline, Path(ONNX_MODEL_DIR), MODEL_VERSION)
+    raise ValueError(f"Moteur d'inférence inconnu: {engine} (attendu: torch, onnx)")
+
+# ===============================
+# EXÉCUTEUR D'INFÉRENCE
+# ===============================
+
+class InferenceQueueFull(Exception):
+    """File d'inférence saturée : la requête doit être rejetée"""
+
+class InferenceExecutor:
+    """
+    Exécuteur dédié à l'inférence Kokoro
+    
+    Le pipeline est synchrone (générateur PyTorch) : l'itérer dans un
+    endpoint async bloquerait la boucle asyncio, et donc /health, /voices
+    et /audio pour tous les clients. L'exécuteur :
+    - Possède le pipeline et l'exécute dans un thread dédié
+    - Borne le nombre de travaux en attente (rejet au-delà)
+    - Sert les travaux en attente par priorité (SynthesisScheduler)
+    - Rend la main à la boucle asyncio pendant toute la synthèse
+    """
+    
+    def __init__(self, pipeline, max_queue: int):
+        self.pipeline = pipeline
+        self.max_queue = max_queue
+        self.pending = 0  # Travaux en attente + en cours
+        self.scheduler = SynthesisScheduler(1, PRIORITY_AGING, PRIORITY_PROMOTE_SECONDS)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kokoro-inference")
+    
+    async def run(self, job, *args, admitted: bool = False, priority: Optional[JobPriority] = None):
+        """
+        Exécution d'un travail d'inférence sans bloquer la boucle asyncio
+        
+        Args:
+            job: Fonction appelée comme job(pipeline, *args) dans le thread dédié
+            admitted (bool): Travail d'une requête déjà acceptée (segments
+                suivants d'un streaming) : la limite de file ne s'applique pas
+            priority (JobPriority | None): Classe et coût estimé (défaut : free, coût nul)
+            
+        Returns:
+            Le résultat de job
+            
+        Raises:
+            InferenceQueueFull: Si max_queue travaux sont déjà en attente
+        """
+        if not admitted and self.pending >= self.max_queue:
+            raise InferenceQueueFull(f"{self.pending} travaux d'inférence en attente")
+        
+        self.pending += 1
+        try:
+            async with self.scheduler.slot(priority):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, job, self.pipeline, *args)
+        finally:
+            self.pending -= 1
+    
+    @property
+    def local(self):
+        """Exécuteur du processus courant (travaux non sérialisables, ex. streaming)"""
+        return self
+    
+    def stats(self) -> dict:
+        """Occupation de la file pour /stats"""
+        return {
+            "mode": "thread",
+            "workers": 1,
+            "pending": self.pending,
+            "max_queue": self.max_queue,
+            "scheduler": self.scheduler.stats()
+        }
+    
+    def shutdown(self):
+        """Arrêt de l'exécuteur (les travaux en cours se terminent)"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+def _init_inference_worker(worker: dict):
+    """Initialisation d'un processus d'inférence : cœurs, threads intra-op, moteur"""
+    apply_cpu_topology(worker)
+    if inference_engine is not None:
+        inference_engine.prepare()
+
+def _run_in_worker(job, *args):
+    """Exécution d'un travail avec le pipeline hérité du processus parent (fork)"""
+    return job(kokoro_pipeline, *args)
+
+def _worker_ready():
+    """Travail vide forçant le fork du processus au démarrage"""
+    return os.getpid()
+
+class InferenceProcessPool:
+    """
+    Pool de N processus d'inférence partageant les poids du modèle
+    
+    Le GIL et les threads intra-op d'un seul processus plafonnent le débit
+    du singleton. Ici, chaque worker est un processus forké APRÈS le
+    chargement du modèle : les tenseurs sont partagés en copy-on-write et
+    la mémoire ne croît pas N fois (gc.freeze() évite que le ramasse-miettes
+    ne touche les pages héritées).
+    
+    - Un ProcessPoolExecutor mono-processus par worker
+    - Envoi au worker le moins chargé (travaux en cours)
+    - Chaque worker épinglé sur ses cœurs, threads PyTorch bornés à sa
+      tranche (plan_cpu_topology : pas de sur-souscription)
+    - Les travaux non sérialisables (générateurs du streaming) restent
+      dans un exécuteur local au processus de l'API
+    """
+    
+    def __init__(self, pipeline, workers: int, max_queue: int, layout: Optional[list] = None):
+        self.pipeline = pipeline
+        self.max_queue = max_queue
+        self.pending = 0
+        self.layout = layout or plan_cpu_topology(workers, INFERENCE_INTRA_OP_THREADS,
+                                                  INFERENCE_INTER_OP_THREADS, INFERENCE_PIN_CPUS)
+        self.api_threads = api_process_threads(self.layout, INFERENCE_API_THREADS)
+        self._context = multiprocessing.get_context("fork")
+        self._inflight = [0] * workers
+        self.scheduler = SynthesisScheduler(workers, PRIORITY_AGING, PRIORITY_PROMOTE_SECONDS)
+        self._local = InferenceExecutor(pipeline, max_queue=max_queue)
+        
+        # Objets existants exclus du GC : pas d'écriture dans les pages partagées
+        gc.freeze()
+        self._workers = [self._create_worker(i) for i in range(workers)]
+        # Fork immédiat de chaque worker (avant que l'API ne démarre ses threads)
+        self.worker_pids = [w.submit(_worker_ready).result() for w in self._workers]
+    
+    def _create_worker(self, index: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=self._context,
+            initializer=_init_inference_worker,
+            initargs=(self.layout[index],)
+        )
+    
+    async def run(self, job, *args, admitted: bool = False, priority: Optional[JobPriority] = None):
+        """
+        Exécution d'un travail dans le worker le moins chargé
+        
+        Args:
+            job: Fonction de niveau module appelée comme job(pipeline, *args)
+            admitted (bool): Travail d'une requête déjà acceptée
+            priority (JobPriority | None): Classe et coût estimé (défaut : free, coût nul)
+            
+        Raises:
+            InferenceQueueFull: Si max_queue travaux sont déjà en attente
+        """
+        if not admitted and self.pending >= self.max_queue:
+            raise InferenceQueueFull(f"{self.pending} travaux d'inférence en attente")
+        
+        self.pending += 1
+        try:
+            # Un travail par worker : l'ordre de service est décidé ici, pas
+            # par la file FIFO de chaque ProcessPoolExecutor
+            async with self.scheduler.slot(priority):
+                index = min(range(len(self._workers)), key=self._inflight.__getitem__)
+                self._inflight[index] += 1
+                try:
+                    future = self._workers[index].submit(_run_in_worker, job, *args)
+                    return await asyncio.wrap_future(future)
+                except BrokenProcessPool:
+                    # Worker mort (OOM, signal) : remplacé pour les requêtes suivantes
+                    logger.error(f"💥 Worker d'inférence {index} perdu, redémarrage")
+                    self._workers[index].shutdown(wait=False, cancel_futures=True)
+                    self._workers[index] = self._create_worker(index)
+                    raise
+                finally:
+                    self._inflight[index] -= 1
+        finally:
+            self.pending -= 1
+    
+    @property
+    def local(self):
+        """Exécuteur du processus de l'API (travaux non sérialisables, ex. streaming)"""
+        return self._local
+    
+    def stats(self) -> dict:
+        """Occupation de la file et charge par worker pour /stats"""
+        return {
+            "mode": "process",
+            "workers": len(self._workers),
+            "topology": [
+                {**worker, "cpus": format_cpulist(worker["cpus"])} for worker in self.layout
+            ],
+            "api_intra_op_threads": self.api_threads,
+            "pending": self.pending,
+            "max_queue": self.max_queue,
+            "inflight_per_worker": list(self._inflight),
+            "scheduler": self.scheduler.stats()
+        }
+    
+    def shutdown(self):
+        """Arrêt des workers et de l'exécuteur local"""
+        for worker in self._workers:
+            worker.shutdown(wait=True, cancel_futures=True)
+        self._local.shutdown()
+
+def synthesize_wav(pipeline, text: str, voice: str, speed: float):
+    """
+    Travail d'inférence complet : synthèse, concaténation et encodage WAV
+    
+    Exécuté dans le thread d'inférence. L'encodage WAV est fait ici
+    pour que la boucle asyncio ne manipule que des octets prêts à servir.
+    Chaque segment est écrit dans le WAV dès sa sortie du modèle puis
+    libéré (pas de liste de segments ni de concaténation finale).
+    
+    Returns:
+        tuple: (wav_bytes, durée audio en secondes, infos par segment,
+        durées par étape du travail : g2p, inference, wav)
+    """
+    timings = []
+    generator = iter_synthesis(pipeline, text, voice, speed, timings)
+    
+    wav = WavBuilder()
+    segments_info = []
+    wav_seconds = 0.0
+    
+    for i, (graphemes, phonemes, audio) in enumerate(generator):
+        start = time.perf_counter()
+        samples = wav.append(audio)
+        wav_seconds += time.perf_counter() - start
+        
+        segments_info.append({
+            "index": i,
+            "graphemes": graphemes,
+            "phonemes": phonemes,
+            "samples": samples,
+            "timings": timings[i]
+        })
+        logger.debug(f"   Segment {i}: {samples} samples")
+    
+    start = time.perf_counter()
+    wav_bytes = wav.finish()
+    stages = {
+        "g2p": sum(t["g2p"] for t in timings),
+        "inference": sum(t["inference"] for t in timings),
+        "wav": wav_seconds + time.perf_counter() - start
+    }
+    return wav_bytes, wav.duration, segments_info, stages
+
+def synthesize_phonemes(pipeline, phoneme_segments: list, voice: str, speed: float) -> list:
+    """
+    Travail d'inférence à partir de phonèmes déjà calculés (sans G2P)
+    
+    Returns:
+        tuple: (trames PCM 16 bits de chaque segment dans l'ordre,
+        durée d'inférence de chaque segment en secondes)
+    """
+    pcm_segments = []
+    inference_seconds = []
+    for phonemes in phoneme_segments:
+        start = time.perf_counter()
+        audio = inference_engine.synthesize(phonemes, voice, speed)
+        inference_seconds.append(time.perf_counter() - start)
+        pcm_segments.append(audio_to_pcm16(audio))
+    return pcm_segments, inference_seconds
+
+def timed_job(pipeline, job, *args):
+    """Exécution d'un travail en mesurant sa durée propre (hors attente dans la file)"""
+    start = time.perf_counter()
+    result = job(pipeline, *args)
+    return result, time.perf_counter() - start
+
+def next_segment(pipeline, generator):
+    """Travail d'inférence élémentaire : segment suivant d'un générateur (None à la fin)"""
+    return next(generator, None)
+
+# ===============================
+# CONTRÔLE D'ADMISSION
+# ===============================
+
+class AdmissionRejected(Exception):
+    """Travail en attente au-delà du SLO : la requête doit être rejetée (429)"""
+    
+    def __init__(self, retry_after: int, expected_wait: float):
+        super().__init__(f"attente estimée {expected_wait:.1f}s")
+        self.retry_after = retry_after
+        self.expected_wait = expected_wait
+
+class AdmissionController:
+    """
+    Admission des synthèses selon le travail déjà accepté, en secondes d'audio
+    
+    La limite de file de l'exécuteur compte des travaux, pas leur coût :
+    vingt textes de 2000 caractères passent alors qu'ils représentent des
+    minutes de calcul. Ici chaque requête est estimée en secondes d'audio
+    (longueur du texte / débit de parole) ; l'attente prévue est
+    audio en cours × facteur temps réel / nombre de workers. Au-delà du SLO
+    la requête est rejetée avec un Retry-After égal au temps nécessaire
+    pour que la file redescende sous le SLO.
+    
+    Débit de parole et facteur temps réel sont recalibrés (moyennes
+    mobiles exponentielles) sur les synthèses réellement effectuées.
+    Utilisé uniquement depuis la boucle asyncio (pas de verrou nécessaire).
+    """
+    
+    # Poids d'une nouvelle mesure dans les moyennes mobiles
+    SMOOTHING = 0.1
+    
+    def __init__(self, slo_seconds: float, workers: int, chars_per_second: float, rtf: float):
+        self.slo_seconds = slo_seconds
+        self.workers = max(workers, 1)
+        self.chars_per_second = chars_per_second
+        self.rtf = rtf
+        self.queued_audio_seconds = 0.0
+        self.queued_requests = 0
+        self.admitted = 0
+        self.rejected = 0
+    
+    def estimate(self, text_length: int, speed: float) -> float:
+        """Durée d'audio attendue pour un texte, en secondes"""
+        return text_length / (self.chars_per_second * (speed or 1.0))
+    
+    def expected_wait(self, audio_seconds: float = 0.0) -> float:
+        """Délai prévu pour écouler le travail accepté (plus audio_seconds)"""
+        return (self.queued_audio_seconds + audio_seconds) * self.rtf / self.workers
+    
+    def check(self, audio_seconds: float = 0.0):
+        """
+        Vérification du SLO pour audio_seconds de travail supplémentaire
+        
+        Une file vide admet toujours (un texte long seul reste servi).
+        
+        Raises:
+            AdmissionRejected: Si l'attente prévue dépasse le SLO
+        """
+        expected_wait = self.expected_wait(audio_seconds)
+        if self.queued_requests and expected_wait > self.slo_seconds:
+            self.rejected += 1
+            raise AdmissionRejected(max(1, math.ceil(expected_wait - self.slo_seconds)), expected_wait)
+    
+    def admit(self, text_length: int, speed: float, check: bool = True) -> float:
+        """
+        Admission d'une requête
+        
+        Args:
+            check (bool): False pour une requête déjà acceptée par ailleurs
+                (éléments d'un lot) : le travail est compté sans refus possible
+        
+        Returns:
+            float: Ticket (secondes d'audio réservées) à passer à release()
+            
+        Raises:
+            AdmissionRejected: Si l'attente prévue dépasse le SLO
+        """
+        audio_seconds = self.estimate(text_length, speed)
+        if check:
+            self.check(audio_seconds)
+        
+        self.admitted += 1
+        self.queued_requests += 1
+        self.queued_audio_seconds += audio_seconds
+        return audio_seconds
+    
+    def release(self, ticket: float):
+        """Fin (succès ou échec) d'une requête admise"""
+        self.queued_requests -= 1
+        self.queued_audio_seconds = max(self.queued_audio_seconds - ticket, 0.0) if self.queued_requests else 0.0
+    
+    def observe(self, text_length: int, speed: float, audio_duration: float, segments_info: list):
+        """
+        Recalibrage sur une synthèse terminée
+        
+        Le facteur temps réel n'utilise que les segments réellement inférés
+        (ni fragments en cache, ni lots partagés dont le coût n'est pas
+        attribuable à une requête).
+        """
+        if audio_duration <= 0:
+            return
+        self.chars_per_second += self.SMOOTHING * (
+            text_length / (audio_duration * (speed or 1.0)) - self.chars_per_second
+        )
+        
+        inferred = [info for info in segments_info if info.get("timings", {}).get("inference")]
+        if len(inferred) == len(segments_info):
+            compute = sum(info["timings"]["g2p"] + info["timings"]["inference"] for info in inferred)
+            samples = sum(info["samples"] for info in inferred)
+            if samples:
+                self.rtf += self.SMOOTHING * (compute / (samples / SAMPLE_RATE) - self.rtf)
+    
+    def stats(self) -> dict:
+        """File estimée et rejets pour /stats"""
+        return {
+            "slo_seconds": self.slo_seconds,
+            "queued_requests": self.queued_requests,
+            "queued_audio_seconds": round(self.queued_audio_seconds, 2),
+            "expected_wait_seconds": round(self.expected_wait(), 2),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "chars_per_audio_second": round(self.chars_per_second, 2),
+            "real_time_factor": round(self.rtf, 4)
+        }
+
+def admission_rejected(e: AdmissionRejected) -> HTTPException:
+    """Réponse 429 d'une requête refusée par le contrôle d'admission"""
+    logger.warning(f"🚦 Synthèse refusée: {e}")
+    admission_rejected_total.inc()
+    return HTTPException(
+        status_code=429,
+        detail=f"Serveur saturé (attente estimée {e.expected_wait:.0f}s), réessayez dans {e.retry_after}s",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse qui appelle on_close à la fin de l'envoi, quelle qu'en soit l'issue
+    
+    Le finally du générateur de contenu ne s'exécute que s'il a démarré :
+    un client parti avant la lecture du corps (déconnexion détectée par
+    Starlette, envoi des en-têtes en échec) ne le lance jamais. on_close
+    libère alors le ticket d'admission ; il doit supporter un double appel.
+    """
+    
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+# ===============================
+# FRONT-END TEXTE (G2P)
+# ===============================
+
+class G2PLexicon:
+    """
+    Mémoïsation du G2P : fragment de texte -> segments de phonèmes
+    
+    Sur les textes courts, la phonémisation (misaki + spaCy) pèse autant
+    que le modèle. Chaque paragraphe déjà vu est servi :
+    - Depuis un LRU en mémoire (propre à chaque processus d'inférence)
+    - Sinon depuis un lexique SQLite sur disque, conservé entre redémarrages
+      et partagé entre les workers (mode WAL : lectures concurrentes)
+    
+    La clé reste le paragraphe entier : le G2P de misaki dépend du contexte
+    (étiquetage spaCy, homographes, accentuation), mémoïser mot par mot
+    changerait la prononciation. Le lexique contient donc le texte des
+    requêtes : il est plafonné en octets (éviction du moins récemment
+    utilisé), une entrée inutilisée depuis ttl_seconds est supprimée, et
+    secure_delete écrase le contenu des lignes supprimées. L'usage n'est
+    daté sur disque qu'aux lectures disque (un accès au LRU ne coûte
+    aucune écriture SQLite).
+    
+    Les compteurs sont en mémoire partagée : créés avant le fork du pool,
+    ils agrègent les accès de tous les workers pour /stats.
+    """
+    
+    # Nombre d'écritures (par processus) entre deux purges du lexique
+    PRUNE_EVERY = 256
+    
+    def __init__(self, db_path: Path, memo_budget_bytes: int, max_bytes: int, ttl_seconds: int = 0):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memo = ByteBudgetLRU(memo_budget_bytes)
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+        self._stores = 0
+        self._counters = {
+            name: multiprocessing.Value("q", 0)
+            for name in ("hits_memory", "hits_disk", "misses", "evictions")
+        }
+        
+        # Le lexique dépend de la version du G2P : une mise à jour de misaki l'invalide
+        try:
+            from importlib.metadata import version
+            self.g2p_version = f"misaki-{version('misaki')}"
+        except Exception:
+            self.g2p_version = "misaki"
+        
+        db = self._db()
+        # Lexique d'une version précédente (sans date d'usage) : reconstruit
+        columns = {row[1] for row in db.execute("PRAGMA table_info(lexicon)")}
+        if columns and "last_used" not in columns:
+            db.execute("DROP TABLE lexicon")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS lexicon (chunk TEXT PRIMARY KEY, segments TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS lexicon_last_used ON lexicon (last_used)")
+        self.prune()
+    
+    def _db(self) -> sqlite3.Connection:
+        """Connexion SQLite du processus courant (une connexion ne survit pas à un fork)"""
+        if self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(
+                str(self.db_path), timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA secure_delete=ON")
+            self._connection_pid = os.getpid()
+        return self._connection
+    
+    def _count(self, name: str, amount: int = 1):
+        counter = self._counters[name]
+        with counter.get_lock():
+            counter.value += amount
+    
+    def lookup(self, chunk: str) -> Optional[list]:
+        """Segments (graphèmes, phonèmes) déjà calculés pour ce fragment, ou None"""
+        key = f"{self.g2p_version}\x1f{chunk}"
+        with self._lock:
+            segments = self._memo.get(key)
+            if segments is not None:
+                self._count("hits_memory")
+                return segments
+            
+            now = time.time()
+            expired_before = now - self.ttl_seconds if self.ttl_seconds > 0 else 0
+            try:
+                db = self._db()
+                row = db.execute(
+                    "SELECT segments FROM lexicon WHERE chunk = ? AND last_used >= ?", (key, expired_before)
+                ).fetchone()
+                if row is not None:
+                    db.execute("UPDATE lexicon SET last_used = ? WHERE chunk = ?", (now, key))
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Lecture du lexique G2P impossible: {e}")
+                row = None
+            
+            if row is None:
+                self._count("misses")
+                return None
+            
+            segments = [tuple(segment) for segment in json.loads(row[0])]
+            self._memo.put(key, segments, len(row[0]))
+            self._count("hits_disk")
+            return segments
+    
+    def store(self, chunk: str, segments: list):
+        """Enregistrement des segments d'un fragment (mémoire + disque)"""
+        key = f"{self.g2p_version}\x1f{chunk}"
+        encoded = json.dumps(segments, ensure_ascii=False)
+        size = len(key.encode("utf-8")) + len(encoded.encode("utf-8"))
+        with self._lock:
+            self._memo.put(key, segments, len(encoded))
+            try:
+                self._db().execute(
+                    "INSERT INTO lexicon (chunk, segments, size, last_used) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(chunk) DO UPDATE SET segments = excluded.segments, "
+                    "size = excluded.size, last_used = excluded.last_used",
+                    (key, encoded, size, time.time())
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Écriture du lexique G2P impossible: {e}")
+                return
+            self._stores += 1
+            if self._stores % self.PRUNE_EVERY == 0:
+                self.prune()
+    
+    def prune(self) -> int:
+        """
+        Purge du lexique : entrées expirées, puis les moins récemment utilisées
+        au-delà de max_bytes (appelée sous verrou, ou avant tout accès concurrent)
+        
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        removed = 0
+        db = None
+        try:
+            db = self._db()
+            if self.ttl_seconds > 0:
+                removed += db.execute(
+                    "DELETE FROM lexicon WHERE last_used < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+            
+            excess = db.execute("SELECT COALESCE(SUM(size), 0) FROM lexicon").fetchone()[0] - self.max_bytes
+            if excess > 0:
+                victims = []
+                for rowid, size in db.execute("SELECT rowid, size FROM lexicon ORDER BY last_used").fetchall():
+                    if excess <= 0:
+                        break
+                    victims.append((rowid,))
+                    excess -= size
+                db.execute("BEGIN")
+                db.executemany("DELETE FROM lexicon WHERE rowid = ?", victims)
+                db.execute("COMMIT")
+                removed += len(victims)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Purge du lexique G2P impossible: {e}")
+            if db is not None and db.in_transaction:
+                db.execute("ROLLBACK")
+        
+        if removed:
+            self._count("evictions", removed)
+        return removed
+    
+    def stats(self) -> dict:
+        """Compteurs agrégés (tous processus) pour /stats"""
+        counters = {name: counter.value for name, counter in self._counters.items()}
+        hits = counters["hits_memory"] + counters["hits_disk"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": round(hits / lookups, 3) if lookups else None,
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "ttl_seconds": self.ttl_seconds,
+            "g2p_version": self.g2p_version
+        }
+
+def iter_phoneme_segments(pipeline, text: str, split_pattern: str = r'\n+'):
+    """
+    Découpage et phonémisation paresseux d'un texte, sans passer par le modèle
+    
+    Reproduit le front-end de KPipeline.__call__ pour l'anglais :
+    découpage par paragraphes, G2P (misaki) puis regroupement en segments
+    d'au plus 510 phonèmes. Les segments obtenus sont exactement ceux
+    que le pipeline aurait synthétisés un par un. Chaque paragraphe passe
+    par le lexique G2P s'il est initialisé.
+    
+    Args:
+        pipeline: Instance KPipeline (lang_code 'a' ou 'b')
+        text (str): Texte à phonémiser
+        split_pattern (str): Séparateur de paragraphes (celui de KPipeline par défaut)
+        
+    Yields:
+        tuple: Segment (graphèmes, phonèmes)
+    """
+    for paragraph in re.split(split_pattern, text.strip()):
+        if not paragraph.strip():
+            continue
+        
+        segments = g2p_lexicon.lookup(paragraph) if g2p_lexicon is not None else None
+        if segments is None:
+            _, tokens = pipeline.g2p(paragraph)
+            segments = [
+                (graphemes, phonemes[:510])
+                for graphemes, phonemes, _ in pipeline.en_tokenize(tokens)
+                if phonemes
+            ]
+            if g2p_lexicon is not None:
+                g2p_lexicon.store(paragraph, segments)
+        
+        yield from segments
+
+def phonemize_segments(pipeline, text: str, split_pattern: str = r'\n+') -> list:
+    """
+    Découpage et phonémisation complets d'un texte (voir iter_phoneme_segments)
+    
+    Returns:
+        list: Segments (graphèmes, phonèmes)
+    """
+    return list(iter_phoneme_segments(pipeline, text, split_pattern))
+
+def iter_synthesis(pipeline, text: str, voice: str, speed: float, timings: Optional[list] = None):
+    """
+    Équivalent de KPipeline.__call__ avec le front-end mémoïsé, sur le
+    moteur d'inférence actif
+    
+    Args:
+        timings (list | None): Reçoit pour chaque segment les durées (s) de
+            G2P et d'inférence, ajoutées avant que le segment soit produit
+    
+    Yields:
+        tuple: (graphèmes, phonèmes, audio) pour chaque segment
+    """
+    phoneme_segments = iter_phoneme_segments(pipeline, text)
+    while True:
+        start = time.perf_counter()
+        segment = next(phoneme_segments, None)
+        if segment is None:
+            return
+        graphemes, phonemes = segment
+        g2p_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        audio = inference_engine.synthesize(phonemes, voice, speed)
+        if timings is not None:
+            timings.append({"g2p": g2p_seconds, "inference": time.perf_counter() - start})
+        yield graphemes, phonemes, audio
+
+# ===============================
+# MICRO-BATCHING
+# ===============================
+
+# Granularité des groupes de longueur (en phonèmes) : un lot ne mélange que
+# des segments de longueur proche pour limiter le padding
+BATCH_LENGTH_BUCKET = 32
+
+def token_stage(model, input_ids, lengths, text_mask, s, speeds):
+    """
+    Étage phonèmes de KModel sur des séquences paddées + masques
+    
+    ALBERT, prédicteur de durées et encodeur de texte : le padding n'entre
+    ni dans l'attention ni dans les LSTM (séquences empaquetées), la sortie
+    aux positions réelles ne dépend donc pas de la longueur paddée.
+    
+    Returns:
+        tuple: (d, durées continues avant arrondi, t_en)
+    """
+    import torch
+    from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+    
+    bert_dur = model.bert(input_ids, attention_mask=(~text_mask).int())
+    d_en = model.bert_encoder(bert_dur).transpose(-1, -2)
+    d = model.predictor.text_encoder(d_en, s, lengths, text_mask)
+    
+    # LSTM bidirectionnel : le padding ne doit pas entrer dans le sens retour
+    packed = pack_padded_sequence(d, lengths.cpu(), batch_first=True, enforce_sorted=False)
+    x, _ = model.predictor.lstm(packed)
+    x, _ = pad_packed_sequence(x, batch_first=True, total_length=input_ids.shape[1])
+    
+    duration = torch.sigmoid(model.predictor.duration_proj(x)).sum(axis=-1) / speeds
+    t_en = model.text_encoder(input_ids, lengths, text_mask)
+    return d, duration, t_en
+
+def batched_forward(model, batch: list, pad_to: Optional[int] = None, stage=None) -> list:
+    """
+    Passe avant de KModel sur plusieurs segments à la fois
+    
+    Réécriture batchée de KModel.forward_with_tokens (limité à un segment) :
+    - Encodeurs (ALBERT, prosodie, texte) et durées sur des séquences
+      de phonèmes paddées + masques : une seule passe pour tout le lot
+    - Alignement calculé par segment (durées différentes)
+    - F0/énergie et décodeur par groupe de segments de même nombre de
+      trames : leurs normalisations d'instance (AdaIN) portent sur l'axe
+      temporel, des trames de padding fausseraient l'audio
+    
+    Args:
+        model: Instance KModel (pipeline.model)
+        batch (list): Segments (phonèmes, style de référence, vitesse)
+        pad_to (int | None): Longueur paddée en tokens (défaut : plus long segment)
+        stage (callable | None): Étage phonèmes à utiliser à la place de
+            token_stage (graphe tracé du palier pad_to, cf. CompiledTorchEngine)
+        
+    Returns:
+        list: Audio (tenseur float32) de chaque segment, dans l'ordre
+    """
+    import torch
+    
+    device = model.device
+    token_ids = [
+        [0, *(model.vocab[p] for p in phonemes if p in model.vocab), 0]
+        for phonemes, _, _ in batch
+    ]
+    lengths = torch.tensor([len(ids) for ids in token_ids], device=device)
+    max_len = pad_to or int(lengths.max())
+    
+    input_ids = torch.zeros((len(batch), max_len), dtype=torch.long, device=device)
+    for i, ids in enumerate(token_ids):
+        input_ids[i, :len(ids)] = torch.tensor(ids, device=device)
+    text_mask = torch.arange(max_len, device=device).unsqueeze(0) >= lengths.unsqueeze(1)
+    ref_s = torch.cat([ref for _, ref, _ in batch]).to(device)
+    speeds = torch.tensor([speed for _, _, speed in batch], device=device).unsqueeze(1)
+    
+    with torch.no_grad():
+        s = ref_s[:, 128:]
+        if stage is None:
+            d, duration, t_en = token_stage(model, input_ids, lengths, text_mask, s, speeds)
+        else:
+            d, duration, t_en = stage(input_ids, lengths, text_mask, s, speeds)
+        pred_dur = torch.round(duration).clamp(min=1).long().masked_fill(text_mask, 0)
+        
+        # Décodage groupé par nombre exact de trames
+        frames = pred_dur.sum(dim=1).tolist()
+        by_frames = {}
+        for i, n_frames in enumerate(frames):
+            by_frames.setdefault(n_frames, []).append(i)
+        
+        outputs = [None] * len(batch)
+        for n_frames, indices in by_frames.items():
+            alignment = torch.zeros((len(indices), max_len, n_frames), device=device)
+            for row, i in enumerate(indices):
+                positions = torch.repeat_interleave(torch.arange(max_len, device=device), pred_dur[i])
+                alignment[row, positions, torch.arange(n_frames, device=device)] = 1
+            
+            group_s = s[indices]
+            en = d[indices].transpose(-1, -2) @ alignment
+            F0_pred, N_pred = model.predictor.F0Ntrain(en, group_s)
+            asr = t_en[indices] @ alignment
+            audio = model.decoder(asr, F0_pred, N_pred, ref_s[indices, :128])
+            for row, i in enumerate(indices):
+                outputs[i] = audio[row].reshape(-1).cpu()
+    
+    return outputs
+
+def synthesize_batch(pipeline, requests: list) -> list:
+    """
+    Travail d'inférence batché : plusieurs requêtes courtes en un minimum de passes
+    
+    Les segments de toutes les requêtes sont regroupés par voix et par
+    longueur de phonèmes paddée, chaque groupe passe dans batched_forward
+    (lots de BATCH_MAX_SIZE segments au plus), puis l'audio est redistribué
+    et encodé requête par requête.
+    En cas d'échec du chemin batché, repli sur la synthèse unitaire.
+    
+    Args:
+        pipeline: Instance KPipeline
+        requests (list): Requêtes (texte, voix, vitesse)
+        
+    Returns:
+        list: Pour chaque requête, le tuple de synthesize_wav ou l'exception levée
+        (l'inférence d'un lot partagé est comptée en entier pour chaque requête)
+    """
+    if not inference_engine.supports_batching:
+        return [_synthesize_or_error(pipeline, *request) for request in requests]
+    
+    model = pipeline.model
+    results = [None] * len(requests)
+    g2p_seconds = [0.0] * len(requests)
+    segments = {}  # (index requête, index segment) -> (graphèmes, phonèmes)
+    groups = {}    # (voix, groupe de longueur) -> [(clé segment, phonèmes, style, vitesse)]
+    packs = {}
+    
+    for req_index, (text, voice, speed) in enumerate(requests):
+        start = time.perf_counter()
+        try:
+            if voice not in packs:
+                packs[voice] = pipeline.load_voice(voice).to(model.device)
+            for seg_index, (graphemes, phonemes) in enumerate(phonemize_segments(pipeline, text)):
+                segments[(req_index, seg_index)] = (graphemes, phonemes)
+                bucket = (len(phonemes) - 1) // BATCH_LENGTH_BUCKET
+                groups.setdefault((voice, bucket), []).append(
+                    ((req_index, seg_index), phonemes, packs[voice][len(phonemes) - 1], speed)
+                )
+        except Exception as e:
+            results[req_index] = e
+        g2p_seconds[req_index] = time.perf_counter() - start
+    
+    audio_by_segment = {}
+    start = time.perf_counter()
+    try:
+        for group in groups.values():
+            for offset in range(0, len(group), BATCH_MAX_SIZE):
+                chunk = group[offset:offset + BATCH_MAX_SIZE]
+                outputs = batched_forward(model, [(ps, ref, speed) for _, ps, ref, speed in chunk])
+                for (key, _, _, _), audio in zip(chunk, outputs):
+                    audio_by_segment[key] = audio
+    except Exception as e:
+        logger.warning(f"⚠️  Passe batchée impossible ({e}), repli sur la synthèse unitaire")
+        return [
+            result if isinstance(result, Exception) else _synthesize_or_error(pipeline, *request)
+            for result, request in zip(results, requests)
+        ]
+    inference_seconds = time.perf_counter() - start
+    
+    for req_index in range(len(requests)):
+        if results[req_index] is not None:
+            continue
+        keys = sorted(key for key in segments if key[0] == req_index)
+        if not keys:
+            results[req_index] = ValueError("Aucun phonème produit pour ce texte")
+            continue
+        start = time.perf_counter()
+        wav = WavBuilder()
+        segments_info = [
+            {
+                "index": i, "graphemes": segments[key][0], "phonemes": segments[key][1],
+                "samples": wav.append(audio_by_segment.pop(key))
+            }
+            for i, key in enumerate(keys)
+        ]
+        wav_bytes, audio_duration = wav.finish(), wav.duration
+        stages = {
+            "g2p": g2p_seconds[req_index],
+            "inference": inference_seconds,
+            "wav": time.perf_counter() - start
+        }
+        results[req_index] = (wav_bytes, audio_duration, segments_info, stages)
+    
+    return results
+
+def _synthesize_or_error(pipeline, text: str, voice: str, speed: float):
+    try:
+        return synthesize_wav(pipeline, text, voice, speed)
+    except Exception as e:
+        return e
+
+class MicroBatcher:
+    """
+    Ordonnanceur de micro-batching des requêtes courtes
+    
+    Les requêtes arrivant dans une fenêtre de quelques millisecondes sont
+    envoyées ensemble à l'exécuteur d'inférence (un seul travail, une
+    passe avant par groupe voix/longueur). Le lot part dès que la fenêtre
+    expire ou que la taille maximale est atteinte.
+    Utilisé uniquement depuis la boucle asyncio (pas de verrou nécessaire).
+    """
+    
+    def __init__(self, executor, window_ms: float, max_batch: int):
+        self.executor = executor
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+        self.metrics = {
+            "batches": 0,
+            "requests_batched": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0
+        }
+    
+    async def submit(self, text: str, voice: str, speed: float, priority: Optional[JobPriority] = None):
+        """
+        Ajout d'une requête au lot courant et attente de son résultat
+        
+        Le lot est ordonnancé avec la meilleure classe de ses membres et la
+        somme de leurs coûts estimés (JobPriority.combine).
+        
+        Returns:
+            tuple: Même résultat que synthesize_wav
+            
+        Raises:
+            InferenceQueueFull: Si la file de l'exécuteur est saturée
+        """
+        if self.executor.pending >= self.executor.max_queue:
+            raise InferenceQueueFull(f"{self.executor.pending} travaux d'inférence en attente")
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((text, voice, speed), priority, future))
+        
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window_seconds, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        self.metrics["batches"] += 1
+        self.metrics["requests_batched"] += len(batch)
+        self.metrics["last_batch_size"] = len(batch)
+        self.metrics["max_batch_size"] = max(self.metrics["max_batch_size"], len(batch))
+        
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: list):
+        try:
+            results = await self.executor.run(
+                synthesize_batch, [request for request, _, _ in batch], admitted=True,
+                priority=JobPriority.combine([priority for _, priority, _ in batch])
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        for (_, _, future), result in zip(batch, results):
+            if future.done():  # Client parti entre-temps
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def stats(self) -> dict:
+        """Taille des lots pour /stats"""
+        batches = self.metrics["batches"]
+        return {
+            **self.metrics,
+            "avg_batch_size": round(self.metrics["requests_batched"] / batches, 2) if batches else None,
+            "window_ms": self.window_seconds * 1000,
+            "max_batch": self.max_batch
+        }
+
+# ===============================
+# SYNTHÈSE LONGUE (JOBS)
+# ===============================
+
+def split_long_text(text: str, max_chars: int) -> list:
+    """
+    Découpage d'un document en morceaux aux fins de phrase
+    
+    Les phrases (SENTENCE_SPLIT_PATTERN) sont regroupées tant que le
+    morceau reste sous max_chars ; une phrase plus longue est coupée
+    aux espaces.
+    
+    Returns:
+        list: Morceaux de texte non vides, dans l'ordre
+    """
+    chunks = []
+    current = ""
+    for sentence in re.split(SENTENCE_SPLIT_PATTERN, text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    
+    if current:
+        chunks.append(current)
+    return chunks
+
+def synthesize_pcm(pipeline, text: str, voice: str, speed: float) -> bytes:
+    """Travail d'inférence d'un morceau de job : trames PCM 16 bits, sans en-tête"""
+    return b"".join(audio_to_pcm16(audio) for _, _, audio in iter_synthesis(pipeline, text, voice, speed))
+
+def stitch_pcm_files(pcm_paths: list, output_path: Path, audio_format: str) -> float:
+    """
+    Assemblage des morceaux d'un job en un seul fichier audio
+    
+    Les morceaux sont lus et écrits un par un dans un SoundFile ouvert :
+    la mémoire utilisée ne dépend que de la taille d'un morceau, pas de
+    la durée totale (un document premium dépasse l'heure d'audio).
+    
+    Returns:
+        float: Durée audio totale en secondes
+    """
+    settings = AUDIO_FORMATS[audio_format]
+    total_samples = 0
+    tmp_path = output_path.with_suffix(".tmp")
+    
+    with sf.SoundFile(
+        tmp_path, mode="w", samplerate=SAMPLE_RATE, channels=1,
+        format=settings["format"], subtype=settings["subtype"],
+        compression_level=settings.get("compression_level")
+    ) as output:
+        for pcm_path in pcm_paths:
+            samples = np.frombuffer(pcm_path.read_bytes(), dtype="<i2")
+            output.write(samples)
+            total_samples += len(samples)
+    
+    tmp_path.replace(output_path)
+    return total_samples / SAMPLE_RATE
+
+class LongFormJob:
+    """
+    Job de synthèse longue et son point de reprise sur disque
+    
+    Dossier du job : job.json (paramètres, morceaux, état), un fichier
+    chunk_NNNNN.pcm par morceau terminé (écrit atomiquement) et le
+    fichier final output.<format>. Un morceau présent sur disque n'est
+    jamais resynthétisé, y compris après un redémarrage. Une fois le
+    fichier final assemblé, les morceaux sont supprimés.
+    """
+    
+    def __init__(self, job_id: str, directory: Path, state: dict):
+        self.job_id = job_id
+        self.directory = directory
+        self.voice = state["voice"]
+        self.speed = state["speed"]
+        self.audio_format = state["audio_format"]
+        self.chunks = state["chunks"]
+        self.created_at = state["created_at"]
+        self.status = state.get("status", "queued")
+        self.error = state.get("error")
+        self.audio_duration = state.get("audio_duration")
+        if self.status == "completed":
+            self.done = set(range(len(self.chunks)))
+        else:
+            self.done = {i for i in range(len(self.chunks)) if self.chunk_path(i).exists()}
+        self._changed = asyncio.Event()
+    
+    @property
+    def output_path(self) -> Path:
+        return self.directory / f"output.{self.audio_format}"
+    
+    def chunk_path(self, index: int) -> Path:
+        return self.directory / f"chunk_{index:05d}.pcm"
+    
+    def save(self):
+        state = {
+            "voice": self.voice,
+            "speed": self.speed,
+            "audio_format": self.audio_format,
+            "chunks": self.chunks,
+            "created_at": self.created_at,
+            "status": self.status,
+            "error": self.error,
+            "audio_duration": self.audio_duration
+        }
+        tmp_path = self.directory / "job.json.tmp"
+        tmp_path.write_text(json.dumps(state))
+        tmp_path.replace(self.directory / "job.json")
+    
+    def notify(self):
+        """Réveil des abonnés (GET /tts/jobs/{id}/events)"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    async def wait_change(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    def to_status(self) -> JobStatus:
+        total = len(self.chunks)
+        return JobStatus(
+            job_id=self.job_id,
+            status=self.status,
+            chunks_total=total,
+            chunks_done=len(self.done),
+            progress=round(len(self.done) / total, 4) if total else 1.0,
+            audio_format=self.audio_format,
+            audio_url=f"/tts/jobs/{self.job_id}/audio" if self.status == "completed" else None,
+            audio_duration=self.audio_duration,
+            error=self.error,
+            created_at=self.created_at
+        )
+
+class LongFormJobManager:
+    """
+    Exécution des jobs de synthèse longue
+    
+    Les morceaux de tous les jobs passent par l'exécuteur d'inférence,
+    au plus LONGFORM_PARALLEL à la fois : avec le pool multi-processus,
+    ils sont répartis sur les workers sans monopoliser la file de /tts.
+    Au démarrage, les jobs inachevés sont repris depuis leur dernier
+    morceau terminé et les jobs expirés sont supprimés ; ensuite une tâche
+    de fond supprime les jobs terminés au-delà de LONGFORM_TTL_SECONDS.
+    """
+    
+    def __init__(self, jobs_dir: Path, executor, parallel: int):
+        self.jobs_dir = jobs_dir
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.executor = executor
+        self.parallel = parallel
+        self.active_chunks = 0
+        self._slots = asyncio.Semaphore(parallel)
+        self._jobs = {}
+        self._tasks = {}
+        self._expiry_task = None
+        self.expired = 0
+    
+    def get(self, job_id: str) -> Optional[LongFormJob]:
+        return self._jobs.get(job_id)
+    
+    def create(self, text: str, voice: str, speed: float, audio_format: str) -> LongFormJob:
+        """
+        Création et lancement d'un job
+        
+        Raises:
+            ValueError: Si le texte ne contient aucun morceau à synthétiser
+        """
+        chunks = split_long_text(text, LONGFORM_CHUNK_CHARS)
+        if not chunks:
+            raise ValueError("Aucun texte à synthétiser")
+        
+        job_id = uuid.uuid4().hex
+        directory = self.jobs_dir / job_id
+        directory.mkdir()
+        job = LongFormJob(job_id, directory, {
+            "voice": voice,
+            "speed": speed,
+            "audio_format": audio_format,
+            "chunks": chunks,
+            "created_at": time.time()
+        })
+        job.save()
+        self._start(job)
+        return job
+    
+    def resume_all(self):
+        """
+        Chargement des jobs existants : reprise des inachevés, purge des expirés
+        
+        Returns:
+            tuple: (jobs repris, jobs supprimés)
+        """
+        resumed = removed = 0
+        for directory in self.jobs_dir.iterdir():
+            try:
+                state = json.loads((directory / "job.json").read_text())
+            except (OSError, ValueError):
+                continue
+            
+            if time.time() - state["created_at"] > LONGFORM_TTL_SECONDS:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+                continue
+            
+            job = LongFormJob(directory.name, directory, state)
+            self._jobs[job.job_id] = job
+            if job.status in ("queued", "running"):
+                self._start(job)
+                resumed += 1
+        return resumed, removed
+    
+    def _start(self, job: LongFormJob):
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+    
+    async def _synthesize_chunk(self, job: LongFormJob, index: int):
+        async with self._slots:
+            self.active_chunks += 1
+            try:
+                # Travail de fond : classe free, aucun client n'attend la réponse
+                pcm = await self.executor.run(
+                    synthesize_pcm, job.chunks[index], job.voice, job.speed, admitted=True,
+                    priority=JobPriority("free", estimate_compute_seconds(len(job.chunks[index]), job.speed))
+                )
+            finally:
+                self.active_chunks -= 1
+        # Point de reprise : fichier complet ou absent
+        tmp_path = job.chunk_path(index).with_suffix(".tmp")
+        await asyncio.to_thread(tmp_path.write_bytes, pcm)
+        tmp_path.replace(job.chunk_path(index))
+        job.done.add(index)
+        job.notify()
+    
+    async def _run(self, job: LongFormJob):
+        job.status = "running"
+        job.save()
+        job.notify()
+        logger.info(f"📚 Job {job.job_id}: {len(job.chunks) - len(job.done)}/{len(job.chunks)} morceau(x) à synthétiser")
+        
+        chunk_tasks = [
+            asyncio.create_task(self._synthesize_chunk(job, i))
+            for i in range(len(job.chunks)) if i not in job.done
+        ]
+        try:
+            try:
+                await asyncio.gather(*chunk_tasks)
+            except Exception:
+                # Premier échec : les autres morceaux n'occupent plus l'inférence
+                for task in chunk_tasks:
+                    task.cancel()
+                await asyncio.gather(*chunk_tasks, return_exceptions=True)
+                raise
+            job.audio_duration = await asyncio.to_thread(
+                stitch_pcm_files, [job.chunk_path(i) for i in range(len(job.chunks))],
+                job.output_path, job.audio_format
+            )
+            job.status = "completed"
+            logger.info(f"✅ Job {job.job_id} terminé: {job.audio_duration:.1f}s d'audio")
+            # État sauvegardé avant de supprimer les points de reprise
+            job.save()
+            await asyncio.to_thread(self._remove_chunks, job)
+        except asyncio.CancelledError:
+            # Arrêt de l'API : le job reste "running" et sera repris au démarrage
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"❌ Job {job.job_id} échoué: {e}")
+            # Un job échoué n'est jamais repris : ses morceaux ne servent plus
+            await asyncio.to_thread(self._remove_chunks, job)
+        
+        job.save()
+        job.notify()
+    
+    @staticmethod
+    def _remove_chunks(job: LongFormJob):
+        """Suppression des morceaux d'un job, terminés ou en cours d'écriture"""
+        for index in range(len(job.chunks)):
+            job.chunk_path(index).unlink(missing_ok=True)
+            job.chunk_path(index).with_suffix(".tmp").unlink(missing_ok=True)
+    
+    async def expire(self) -> int:
+        """Suppression des jobs terminés (ou échoués) au-delà du TTL, retourne leur nombre"""
+        now = time.time()
+        expired = [
+            job for job in self._jobs.values()
+            if job.job_id not in self._tasks and now - job.created_at > LONGFORM_TTL_SECONDS
+        ]
+        for job in expired:
+            del self._jobs[job.job_id]
+            await asyncio.to_thread(shutil.rmtree, job.directory, True)
+        if expired:
+            self.expired += len(expired)
+            logger.info(f"🗑️  Jobs de synthèse longue: {len(expired)} job(s) expiré(s) supprimé(s)")
+        return len(expired)
+    
+    async def _expire_loop(self):
+        while True:
+            await asyncio.sleep(JANITOR_INTERVAL_SECONDS)
+            try:
+                await self.expire()
+            except Exception as e:
+                logger.warning(f"⚠️  Purge des jobs expirés impossible: {e}")
+    
+    def start_expiry(self):
+        """Lancement de la purge périodique des jobs expirés"""
+        self._expiry_task = asyncio.create_task(self._expire_loop())
+    
+    async def shutdown(self):
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def stats(self) -> dict:
+        statuses = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {"jobs": statuses, "parallel": self.parallel, "active_chunks": self.active_chunks,
+                "expired": self.expired}
+
+# ===============================
+# MÉTRIQUES PROMETHEUS
+# ===============================
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    """
+    Histogramme Prometheus à seaux fixes (étiquettes optionnelles)
+    
+    observe() coûte une recherche dichotomique et trois additions : les
+    seaux cumulés ne sont calculés qu'au moment du scrape. Utilisé depuis
+    la boucle asyncio uniquement (pas de verrou).
+    """
+    
+    def __init__(self, name: str, documentation: str, buckets: tuple, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = label_names
+        self._series = {}  # étiquettes -> [comptes par seau (dernier : +Inf), somme, total]
+    
+    def observe(self, value: float, labels: tuple = ()):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+    
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total_sum, total_count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {total_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total_sum}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {total_count}")
+        return lines
+
+class Counter:
+    """Compteur Prometheus à étiquettes (valeurs d'étiquettes en tuple)"""
+    
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values = {}
+    
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+class Gauge:
+    """Jauge Prometheus : valeur tenue à jour, ou lue au scrape via une fonction"""
+    
+    def __init__(self, name: str, documentation: str, read=None):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+        self._read = read
+    
+    def inc(self, amount: float = 1):
+        self.value += amount
+    
+    def dec(self, amount: float = 1):
+        self.value -= amount
+    
+    def render(self) -> list:
+        value = self._read() if self._read is not None else self.value
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
 
-class VoiceInfo(BaseModel):
+class MetricsMiddleware:
     """
-    Informations détaillées sur une voix
+    Middleware ASGI comptant les réponses par route et code HTTP
     
-    Métadonnées enrichies basées sur les tests utilisateur :
-    - Description subjective de la qualité
-    - Recommandation basée sur les résultats de test
-    - Informations techniques (langue, genre)
+    ASGI pur (pas de BaseHTTPMiddleware) : aucune tâche ni copie de corps
+    supplémentaire, le streaming n'est pas affecté. La route est le chemin
+    déclaré (/audio/{filename}) pour garder une cardinalité bornée.
     """
-    id: str
-    name: str
-    description: str
-    language: str
-    gender: str
-    recommended: bool = False
+    
+    def __init__(self, app):
+        self.app = app
+        self._route_paths = None
+    
+    def _handler(self, scope) -> str:
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(scope.get("endpoint"), "other")
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_total.inc((self._handler(scope), scope["method"], str(status_code)))
 
-class HealthResponse(BaseModel):
+class StageTimer:
     """
-    Réponse du contrôle de santé de l'API
+    Durées par étape d'une requête de synthèse
     
-    Fournit l'état détaillé du système pour le monitoring :
-    - État du modèle Kokoro
-    - Métriques de performance
-    - Temps de fonctionnement
+    Étapes mesurées côté API (cache, encode, store) ou rapportées par les
+    travaux d'inférence (g2p, inference, wav) ; l'attente dans la file
+    (queue) est la durée vue par l'API moins celle du travail lui-même.
+    Restituées en en-tête Server-Timing, en JSON et dans l'histogramme
+    kokoro_tts_stage_seconds.
     """
-    status: str
-    model_loaded: bool
-    model_load_time: Optional[float]
-    available_voices: int
-    uptime: float
     
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+    
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+    
+    def add_job(self, elapsed: float, job_stages: dict):
+        """Étapes rapportées par un travail d'inférence qui a pris elapsed secondes côté API"""
+        for name, seconds in job_stages.items():
+            self.add(name, seconds)
+        self.add("queue", max(elapsed - sum(job_stages.values()), 0.0))
+    
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+    
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing (durées en millisecondes)"""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total() * 1000:.1f}")
+        return ", ".join(entries)
+    
+    def to_dict(self, segments_info: Optional[list] = None) -> dict:
+        """Détail JSON : étapes de la requête et, si connues, durées par segment"""
+        timings = {
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            "total_ms": round(self.total() * 1000, 2)
+        }
+        if segments_info and all("timings" in info for info in segments_info):
+            timings["segments"] = [
+                {
+                    "index": info["index"],
+                    "g2p_ms": round(info["timings"]["g2p"] * 1000, 2),
+                    "inference_ms": round(info["timings"]["inference"] * 1000, 2)
+                }
+                for info in segments_info
+            ]
+        return timings
+    
+    def observe(self):
+        for name, seconds in self.stages.items():
+            stage_seconds.observe(seconds, (name,))
+
+def record_synthesis(voice: str, text_length: int, audio_duration: float, generation_time: float,
+                     tier: str = "free"):
+    """Alimentation des histogrammes de synthèse (chemin chaud : quelques additions)"""
+    tts_requests_total.inc((voice,))
+    generation_seconds.observe(generation_time)
+    tier_generation_seconds.observe(generation_time, (tier,))
+    tier_latencies[tier].add(generation_time)
+    audio_duration_seconds.observe(audio_duration)
+    text_length_chars.observe(text_length)
+    if audio_duration > 0:
+        real_time_factor.observe(generation_time / audio_duration)
+
 # ===============================
 # GESTIONNAIRE DE CYCLE DE VIE
 # ===============================
@@ -149,33 +3439,150 @@ async def lifespan(app: FastAPI):
     """
     
     # Startup
-    global kokoro_pipeline, model_load_time
+    global kokoro_pipeline, model_load_time, synthesis_cache, single_flight, fragment_cache, g2p_lexicon
+    global model_quantization, quantization_report, inference_engine
+    global inference_executor, micro_batcher, admission, audio_encoder, audio_store, audio_janitor, longform_jobs
     logger.info("🚀 Démarrage de l'API Kokoro TTS...")
     
     try:
         start_time = time.time()
         
+        # Threads inter-op : réglables une seule fois par processus, avant tout
+        # calcul (hérités par les workers forkés)
+        import torch
+        torch.set_num_interop_threads(INFERENCE_INTER_OP_THREADS)
+        
         # Import et chargement du modèle
         from kokoro import KPipeline
         logger.info("📥 Chargement du pipeline Kokoro (lang_code='a')...")
         
-        # Initialisation avec device auto (CPU/GPU selon disponibilité)
-        kokoro_pipeline = KPipeline(lang_code='a')
+        if MODEL_QUANTIZATION not in ("none", "int8"):
+            raise ValueError(f"Quantification inconnue: {MODEL_QUANTIZATION} (attendu: none, int8)")
+        if MODEL_QUANTIZATION != "none" and INFERENCE_ENGINE != "torch":
+            raise ValueError("La quantification int8 s'applique au moteur torch uniquement")
+        if MODEL_COMPILE and INFERENCE_ENGINE != "torch":
+            raise ValueError("Le chemin compilé (KOKORO_COMPILE) s'applique au moteur torch uniquement")
+        
+        # Initialisation avec device auto (CPU/GPU selon disponibilité) ; int8 : CPU uniquement.
+        # Moteur ONNX : pas de KModel, le pipeline ne sert qu'au G2P et aux voix
+        kokoro_pipeline = KPipeline(
+            lang_code='a',
+            model=INFERENCE_ENGINE == "torch",
+            device='cpu' if MODEL_QUANTIZATION == "int8" else None
+        )
+        
+        inference_engine = create_inference_engine(INFERENCE_ENGINE, kokoro_pipeline)
         
         model_load_time = time.time() - start_time
-        logger.info(f"✅ Modèle chargé en {model_load_time:.2f}s")
+        logger.info(f"✅ Modèle chargé en {model_load_time:.2f}s (moteur {inference_engine.name})")
+        
+        # Quantification int8 optionnelle, avant le fork des workers (modèle partagé)
+        if MODEL_QUANTIZATION == "int8":
+            logger.info("🗜️  Quantification int8 et contrôle qualité face au fp32...")
+            quantization_report = quantize_pipeline(kokoro_pipeline, QUANTIZATION_MAX_DISTANCE_DB)
+            if quantization_report["applied"]:
+                model_quantization = "int8"
+                logger.info(
+                    f"✅ Modèle int8 actif: distance spectrale {quantization_report['distance_db']:.2f} dB "
+                    f"(max {QUANTIZATION_MAX_DISTANCE_DB:g}), corpus en "
+                    f"{quantization_report['corpus_int8_seconds']:.2f}s contre "
+                    f"{quantization_report['corpus_fp32_seconds']:.2f}s en fp32"
+                )
+            else:
+                logger.warning(
+                    f"⚠️  Quantification int8 refusée: distance spectrale {quantization_report['distance_db']:.2f} dB "
+                    f"> {QUANTIZATION_MAX_DISTANCE_DB:g} dB, modèle fp32 rechargé"
+                )
+        
+        # Chemin compilé : traçage de chaque palier (après quantification, avant le fork)
+        if isinstance(inference_engine, CompiledTorchEngine):
+            logger.info(f"⚙️  Traçage de l'étage phonèmes ({len(COMPILE_BUCKETS)} paliers)...")
+            warmup = inference_engine.warm_up()
+            logger.info(
+                f"✅ Chemin compilé prêt en {sum(warmup.values()):.1f}s: "
+                + ", ".join(f"{bucket} tokens {seconds:.1f}s" for bucket, seconds in warmup.items())
+            )
+        
+        # Stockage des fichiers audio générés
+        audio_store = create_audio_store(AUDIO_STORE_BACKEND)
+        logger.info(f"📁 Stockage audio: {audio_store.backend} (dossier {AUDIO_STORE_DIR})")
+        
+        # Nettoyeur unique : reprise de l'échéancier et balayage du dossier
+        audio_janitor = AudioJanitor(audio_store, AUDIO_TTL_SECONDS, Path(AUDIO_STORE_DIR) / ".expiry.json")
+        removed, kept = audio_janitor.sweep(Path(AUDIO_STORE_DIR), AUDIO_DISK_MAX_MB * 1024 * 1024)
+        audio_janitor.start()
+        logger.info(f"🧹 Nettoyeur audio prêt: {removed} fichier(s) supprimé(s), {kept} replanifié(s)")
+        
+        # Cache de synthèse (mémoire + disque)
+        synthesis_cache = SynthesisCache(
+            Path(CACHE_DIR),
+            memory_budget_bytes=CACHE_MEMORY_MB * 1024 * 1024,
+            disk_budget_bytes=CACHE_DISK_MB * 1024 * 1024
+        )
+        single_flight = SingleFlight()
+        if FRAGMENT_CACHE_MB > 0:
+            fragment_cache = FragmentCache(FRAGMENT_CACHE_MB * 1024 * 1024)
         
-        # Créer les dossiers nécessaires
-        Path("temp_audio").mkdir(exist_ok=True)
-        logger.info("📁 Dossier temp_audio créé")
+        # Lexique G2P persistant (avant le fork des workers : compteurs partagés)
+        g2p_lexicon = G2PLexicon(
+            Path(G2P_LEXICON_PATH),
+            memo_budget_bytes=G2P_MEMO_MB * 1024 * 1024,
+            max_bytes=G2P_LEXICON_MAX_MB * 1024 * 1024,
+            ttl_seconds=G2P_LEXICON_TTL_SECONDS
+        )
         
         # Test rapide du modèle
         logger.info("🧪 Test rapide du modèle...")
-        test_gen = kokoro_pipeline("Hello, API is ready!", voice='af_heart')
+        test_gen = iter_synthesis(kokoro_pipeline, "Hello, API is ready!", 'af_heart', 1.0)
         for _, _, audio in test_gen:
             logger.info(f"✅ Test réussi - {len(audio)} samples générés")
             break
         
+        # Exécuteur d'inférence : seul propriétaire du pipeline à partir d'ici
+        if INFERENCE_WORKERS > 1:
+            inference_engine.release()
+            inference_executor = InferenceProcessPool(
+                kokoro_pipeline,
+                workers=INFERENCE_WORKERS,
+                max_queue=INFERENCE_QUEUE_SIZE
+            )
+            logger.info(
+                f"🧵 Pool d'inférence prêt: {INFERENCE_WORKERS} processus "
+                f"(PIDs {inference_executor.worker_pids})"
+            )
+            # Le processus de l'API garde une part bornée pour le streaming
+            torch.set_num_threads(inference_executor.api_threads)
+            log_cpu_topology(inference_executor.layout, inference_executor.api_threads)
+        else:
+            # Un seul worker (thread) : tous les CPU du processus, sans épinglage
+            layout = plan_cpu_topology(1, INFERENCE_INTRA_OP_THREADS, INFERENCE_INTER_OP_THREADS, pin=False)
+            apply_cpu_topology(layout[0])
+            inference_executor = InferenceExecutor(kokoro_pipeline, max_queue=INFERENCE_QUEUE_SIZE)
+            logger.info(f"🧵 Exécuteur d'inférence prêt (file max: {INFERENCE_QUEUE_SIZE})")
+            log_cpu_topology(layout)
+        
+        if BATCH_WINDOW_MS > 0 and inference_engine.supports_batching:
+            micro_batcher = MicroBatcher(inference_executor, window_ms=BATCH_WINDOW_MS, max_batch=BATCH_MAX_SIZE)
+            logger.info(f"📦 Micro-batching actif (fenêtre {BATCH_WINDOW_MS:g}ms, lots de {BATCH_MAX_SIZE} max)")
+        
+        if ADMISSION_SLO_SECONDS > 0:
+            admission = AdmissionController(
+                slo_seconds=ADMISSION_SLO_SECONDS,
+                workers=INFERENCE_WORKERS,
+                chars_per_second=ADMISSION_CHARS_PER_SECOND,
+                rtf=ADMISSION_INITIAL_RTF
+            )
+            logger.info(f"🚦 Contrôle d'admission actif (attente max estimée {ADMISSION_SLO_SECONDS:g}s)")
+        
+        # Étage d'encodage (Opus, MP3, FLAC) séparé de l'inférence
+        audio_encoder = AudioEncoder(workers=ENCODER_WORKERS)
+        
+        # Jobs de synthèse longue : reprise des jobs interrompus par un arrêt
+        longform_jobs = LongFormJobManager(Path(LONGFORM_DIR), inference_executor, parallel=LONGFORM_PARALLEL)
+        resumed, removed = longform_jobs.resume_all()
+        longform_jobs.start_expiry()
+        logger.info(f"📚 Jobs de synthèse longue: {resumed} repris, {removed} expiré(s) supprimé(s)")
+        
         logger.info("🎉 API Kokoro TTS prête !")
         
     except Exception as e:
@@ -187,7 +3594,14 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Arrêt de l'API Kokoro TTS...")
-    # Nettoyage si nécessaire
+    if longform_jobs is not None:
+        await longform_jobs.shutdown()
+    if audio_janitor is not None:
+        await audio_janitor.stop()
+    if inference_executor is not None:
+        inference_executor.shutdown()
+    if audio_encoder is not None:
+        audio_encoder.shutdown()
 
 # ===============================
 # CONFIGURATION FASTAPI
@@ -211,6 +3625,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comptage des réponses par route et code HTTP (/metrics)
+app.add_middleware(MetricsMiddleware)
+
 # ===============================
 # VARIABLES DE MONITORING
 # ===============================
@@ -218,6 +3635,75 @@ app.add_middleware(
 # Horodatage de démarrage pour calcul de l'uptime
 app_start_time = time.time()
 
+# Métriques du streaming audio (/tts/stream)
+# time-to-first-byte = délai entre la requête et l'envoi du premier segment audio
+stream_metrics = {
+    "streams_started": 0,
+    "streams_completed": 0,
+    "ttfb_count": 0,
+    "last_ttfb": None,
+    "total_ttfb": 0.0
+}
+
+# Métriques de la synthèse par lots (/tts/batch)
+batch_metrics = {
+    "batches": 0,
+    "items": 0,
+    "items_failed": 0
+}
+
+# Latences récentes par classe de service (p50 / p99 dans /stats)
+tier_latencies = {tier: LatencyWindow() for tier in PRIORITY_TIERS}
+
+# Métriques Prometheus exposées par /metrics
+generation_seconds = Histogram(
+    "kokoro_tts_generation_seconds", "Temps de génération d'une synthèse (cache compris)",
+    (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+real_time_factor = Histogram(
+    "kokoro_tts_real_time_factor", "Temps de génération / durée audio produite",
+    (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2)
+)
+audio_duration_seconds = Histogram(
+    "kokoro_tts_audio_duration_seconds", "Durée de l'audio produit",
+    (0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+)
+text_length_chars = Histogram(
+    "kokoro_tts_text_length_chars", "Longueur du texte synthétisé (caractères ou phonèmes)",
+    (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+stage_seconds = Histogram(
+    "kokoro_tts_stage_seconds", "Durée de chaque étape de /tts (g2p, inference, wav, encode, queue...)",
+    (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    label_names=("stage",)
+)
+tier_generation_seconds = Histogram(
+    "kokoro_tts_tier_generation_seconds", "Temps de génération par classe de service (premium, free)",
+    (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    label_names=("tier",)
+)
+coalesced_requests_total = Counter(
+    "kokoro_tts_coalesced_requests_total", "Requêtes servies par une synthèse identique déjà en cours"
+)
+tts_requests_total = Counter("kokoro_tts_requests_total", "Synthèses réussies par voix", ("voice",))
+http_requests_total = Counter(
+    "kokoro_http_requests_total", "Réponses HTTP par route, méthode et code", ("handler", "method", "status")
+)
+inflight_syntheses = Gauge("kokoro_inflight_syntheses", "Synthèses en cours")
+inference_queue_depth = Gauge(
+    "kokoro_inference_queue_depth", "Travaux d'inférence en attente ou en cours",
+    read=lambda: inference_executor.pending if inference_executor else 0
+)
+admission_queued_audio_seconds = Gauge(
+    "kokoro_admission_queued_audio_seconds", "Audio estimé des synthèses admises et non terminées",
+    read=lambda: round(admission.queued_audio_seconds, 2) if admission else 0
+)
+admission_expected_wait_seconds = Gauge(
+    "kokoro_admission_expected_wait_seconds", "Attente estimée d'une nouvelle synthèse (comparée au SLO)",
+    read=lambda: round(admission.expected_wait(), 2) if admission else 0
+)
+admission_rejected_total = Counter("kokoro_admission_rejected_total", "Synthèses refusées par le contrôle d'admission (429)")
+
 # ===============================
 # ENDPOINTS PRINCIPAUX
 # ===============================
@@ -243,13 +3729,26 @@ async def root():
             "Single model instance",
             "Pre-loaded pipeline", 
             "Optimized voice selection",
-            "Background cleanup"
+            "Background cleanup (single TTL janitor)",
+            "Chunked audio streaming",
+            "Content-addressed synthesis cache",
+            "Dedicated inference executor",
+            "Multi-process inference pool (copy-on-write weights)",
+            "Dynamic micro-batching",
+            "Sentence-level fragment cache",
+            "Persistent G2P lexicon",
+            "Compressed output formats (Opus, MP3, FLAC)"
         ],
         "endpoints": {
             "POST /tts": "Synthèse vocale optimisée",
-            "POST /tts/stream": "Streaming audio (bientôt disponible)",
+            "POST /tts/batch": "Synthèse par lots, résultats en NDJSON au fil de l'eau",
+            "POST /tts/phonemes": "Synthèse depuis des phonèmes pré-calculés (sans G2P)",
+            "POST /tts/stream": "Streaming audio WAV segment par segment",
+            "POST /tts/jobs": "Synthèse longue asynchrone (jusqu'à 100000 caractères)",
+            "GET /tts/jobs/{job_id}": "Progression d'un job (GET .../events : flux SSE, GET .../audio : résultat)",
             "GET /voices": "Voix disponibles avec recommandations",
-            "GET /health": "État détaillé de l'API"
+            "GET /health": "État détaillé de l'API",
+            "GET /metrics": "Métriques au format Prometheus"
         }
     }
 
@@ -268,91 +3767,442 @@ async def health_check():
         HealthResponse: État détaillé du système
         
     Raises:
-        HTTPException 503: Si le modèle n'est pas disponible
+        HTTPException 503: Si le modèle n'est pas disponible
+    """
+    
+    if kokoro_pipeline is None:
+        raise HTTPException(
+            status_code=503, 
+            detail="Modèle Kokoro non disponible. Redémarrez l'API."
+        )
+    
+    uptime = time.time() - app_start_time
+    
+    return HealthResponse(
+        status="healthy",
+        model_loaded=kokoro_pipeline is not None,
+        model_load_time=model_load_time,
+        available_voices=len(VALID_VOICES),
+        uptime=uptime
+    )
+
+@app.get("/voices", response_model=List[VoiceInfo])
+async def get_voices():
+    """
+    Liste des voix disponibles avec métadonnées enrichies
+    
+    Retourne la liste complète des voix avec leurs caractéristiques :
+    - Informations techniques (langue, genre)
+    - Descriptions subjectives basées sur les tests
+    - Recommandations d'utilisation
+    - Métadonnées pour l'interface utilisateur
+    
+    Les voix listées ont été testées et validées manuellement.
+    
+    Returns:
+        List[VoiceInfo]: Liste des voix avec métadonnées complètes
+    """
+    
+    voices = [
+        VoiceInfo(
+            id="af_heart",
+            name="Heart",
+            description="Voix féminine chaleureuse et expressive",
+            language="en-US",
+            gender="female",
+            recommended=True  # Basé sur vos tests
+        ),
+        VoiceInfo(
+            id="af_bella",
+            name="Bella", 
+            description="Voix féminine claire et articulée",
+            language="en-US",
+            gender="female"
+        ),
+        VoiceInfo(
+            id="af_sarah",
+            name="Sarah",
+            description="Voix féminine douce et naturelle", 
+            language="en-US",
+            gender="female"
+        )
+    ]
+    
+    return voices
+
+async def synthesize_uncached(text: str, voice: str, speed: float, cache_key: str, timer: StageTimer,
+                              batcher, priority: JobPriority):
+    """
+    Synthèse par le modèle d'une requête absente du cache, puis mise en cache du WAV
+    
+    Exécutée une seule fois par groupe de requêtes identiques (SingleFlight) :
+    les étapes sont comptées dans le timer de la première requête.
+    
+    Returns:
+        tuple: (wav_bytes, durée audio, infos par segment, taux de fragments en cache, métadonnées)
+    """
+    # Synthèse vocale dans l'exécuteur dédié (boucle asyncio libre) ;
+    # les textes courts passent par le micro-batching s'il est actif,
+    # sinon les phrases déjà synthétisées sont reprises du cache de fragments
+    fragment_hit_ratio = None
+    job_start = time.perf_counter()
+    batcher = batcher if batcher is not None else micro_batcher
+    if batcher is not None and len(text) <= BATCH_MAX_CHARS:
+        wav_bytes, audio_duration, segments_info, job_stages = await batcher.submit(text, voice, speed, priority)
+        timer.add_job(time.perf_counter() - job_start, job_stages)
+    elif fragment_cache is not None:
+        wav_bytes, audio_duration, segments_info, fragment_hit_ratio = await synthesize_with_fragments(
+            text, voice, speed, timer=timer, priority=priority
+        )
+    else:
+        wav_bytes, audio_duration, segments_info, job_stages = await inference_executor.run(
+            synthesize_wav, text, voice, speed, priority=priority
+        )
+        timer.add_job(time.perf_counter() - job_start, job_stages)
+    
+    if admission is not None:
+        admission.observe(len(text), speed, audio_duration, segments_info)
+    
+    # Le WAV est toujours conservé : les autres formats s'en déduisent
+    # par simple encodage, sans repasser par le modèle
+    metadata = {
+        "audio_duration": audio_duration,
+        "segments_count": len(segments_info),
+        "phonemes": [info["phonemes"] for info in segments_info]
+    }
+    with timer.stage("cache"):
+        await synthesis_cache.put(cache_key, wav_bytes, metadata)
+    
+    return wav_bytes, audio_duration, segments_info, fragment_hit_ratio, metadata
+
+async def synthesize_tts(request: TTSRequest, timer: StageTimer, batcher=None, admitted: bool = False,
+                         tier: str = "free") -> TTSResponse:
+    """
+    Synthèse d'une requête TTSRequest, partagée par /tts et /tts/batch
+    
+    Args:
+        request (TTSRequest): Paramètres de synthèse validés
+        timer (StageTimer): Reçoit la durée de chaque étape
+        batcher (MicroBatcher | None): Ordonnanceur des textes courts
+            (par défaut le micro-batching global, s'il est actif)
+        admitted (bool): Requête déjà acceptée par le contrôle d'admission
+            (éléments d'un lot) : son travail est compté mais jamais refusé
+        tier (str): Classe de service (premium, free) pour l'ordonnancement
+        
+    Returns:
+        TTSResponse: Réponse avec URL audio et métadonnées
+        
+    Raises:
+        HTTPException 503: Modèle non disponible ou file d'inférence saturée
+        HTTPException 429: Attente estimée au-delà du SLO (en-tête Retry-After)
+        HTTPException 400: Voix ou format invalide
+        HTTPException 500: Erreur de génération
+    """
+    
+    if kokoro_pipeline is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Modèle Kokoro non disponible"
+        )
+    
+    # Validation de la voix
+    if request.voice not in VALID_VOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Voix '{request.voice}' non disponible. Voix disponibles: {VALID_VOICES}"
+        )
+    
+    # Validation du format de sortie
+    audio_format = (request.format or "wav").lower()
+    if audio_format not in AUDIO_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format '{request.format}' non supporté. Formats disponibles: {list(AUDIO_FORMATS)}"
+        )
+    
+    ticket = None
+    inflight_syntheses.inc()
+    try:
+        logger.info(f"🎤 Synthèse demandée: '{request.text[:50]}...' avec {request.voice} ({audio_format})")
+        start_time = time.time()
+        
+        # Génération de l'ID unique
+        audio_id = str(uuid.uuid4())
+        audio_filename = f"kokoro_{audio_id}.{audio_format}"
+        
+        # Cache de synthèse : une requête identique réutilise l'audio existant,
+        # dans le format demandé ou à défaut en WAV (seul l'encodage est refait)
+        cache_key = SynthesisCache.make_key(request.text, request.voice, request.speed)
+        with timer.stage("cache"):
+            cached_entry = await synthesis_cache.get(cache_key, audio_format)
+            cached_wav = await synthesis_cache.get(cache_key) if cached_entry is None and audio_format != "wav" else None
+        
+        if cached_wav is not None:
+            wav_bytes, metadata = cached_wav
+            with timer.stage("encode"):
+                audio_bytes = await audio_encoder.encode(wav_bytes, audio_format, metadata["audio_duration"])
+            with timer.stage("cache"):
+                await synthesis_cache.put(cache_key, audio_bytes, metadata, audio_format)
+            cached_entry = audio_bytes, metadata
+        
+        if cached_entry is not None:
+            audio_bytes, metadata = cached_entry
+            with timer.stage("store"):
+                await asyncio.to_thread(audio_store.put, audio_filename, audio_bytes)
+            generation_time = time.time() - start_time
+            
+            logger.info(f"⚡ Synthèse servie depuis le cache en {generation_time * 1000:.1f}ms")
+            audio_janitor.schedule(audio_filename)
+            record_synthesis(request.voice, len(request.text), metadata["audio_duration"], generation_time, tier)
+            timer.observe()
+            
+            return TTSResponse(
+                success=True,
+                message=f"Audio servi depuis le cache ({metadata['segments_count']} segment(s))",
+                audio_url=f"/audio/{audio_filename}",
+                audio_duration=metadata["audio_duration"],
+                generation_time=generation_time,
+                text_length=len(request.text),
+                voice_used=request.voice,
+                segments_count=metadata["segments_count"],
+                audio_format=audio_format,
+                cached=True,
+                phonemes=metadata.get("phonemes") if request.return_phonemes else None,
+                timings=timer.to_dict() if request.return_timings else None
+            )
+        
+        # Single-flight : une synthèse identique déjà en cours est attendue
+        # plutôt que relancée (ni inférence ni admission supplémentaires)
+        flight = single_flight.join(cache_key)
+        coalesced = flight is not None
+        if coalesced:
+            logger.info("🔗 Synthèse identique en cours, résultat partagé")
+        else:
+            # Contrôle d'admission : seules les requêtes qui doivent passer par
+            # le modèle comptent (le cache ci-dessus reste servi sous charge)
+            if admission is not None:
+                ticket = admission.admit(len(request.text), request.speed, check=not admitted)
+            priority = JobPriority(tier, estimate_compute_seconds(len(request.text), request.speed))
+            flight = single_flight.start(cache_key, synthesize_uncached(
+                request.text, request.voice, request.speed, cache_key, timer, batcher, priority
+            ))
+            if ticket is not None:
+                # Le travail admis dure autant que la synthèse partagée, même si
+                # le client qui l'a lancée se déconnecte avant la fin
+                flight.add_done_callback(lambda _, ticket=ticket: admission.release(ticket))
+                ticket = None
+        
+        wait_start = time.perf_counter()
+        wav_bytes, audio_duration, segments_info, fragment_hit_ratio, metadata = await single_flight.wait(flight)
+        if coalesced:
+            timer.add("coalesced", time.perf_counter() - wait_start)
+        phonemes = metadata["phonemes"]
+        
+        # Encodage dans son propre étage : l'exécuteur d'inférence est déjà
+        # libre pour la requête suivante
+        audio_bytes = wav_bytes
+        if audio_format != "wav":
+            with timer.stage("encode"):
+                audio_bytes = await audio_encoder.encode(wav_bytes, audio_format, audio_duration)
+            with timer.stage("cache"):
+                await synthesis_cache.put(cache_key, audio_bytes, metadata, audio_format)
+        with timer.stage("store"):
+            await asyncio.to_thread(audio_store.put, audio_filename, audio_bytes)
+        
+        # Calcul des métriques
+        generation_time = time.time() - start_time
+        
+        logger.info(f"✅ Synthèse réussie: {generation_time:.2f}s pour {audio_duration:.2f}s d'audio")
+        record_synthesis(request.voice, len(request.text), audio_duration, generation_time, tier)
+        timer.observe()
+        
+        # Programmation de la suppression automatique (après KOKORO_AUDIO_TTL)
+        audio_janitor.schedule(audio_filename)
+        
+        return TTSResponse(
+            success=True,
+            message=(
+                f"Audio partagé avec une synthèse identique en cours ({len(segments_info)} segment(s))"
+                if coalesced else f"Audio généré avec succès ({len(segments_info)} segment(s))"
+            ),
+            audio_url=f"/audio/{audio_filename}",
+            audio_duration=audio_duration,
+            generation_time=generation_time,
+            text_length=len(request.text),
+            voice_used=request.voice,
+            segments_count=len(segments_info),
+            audio_format=audio_format,
+            coalesced=coalesced,
+            fragment_hit_ratio=fragment_hit_ratio,
+            phonemes=phonemes if request.return_phonemes else None,
+            timings=timer.to_dict(segments_info) if request.return_timings else None
+        )
+        
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+    except InferenceQueueFull as e:
+        logger.warning(f"⏳ Synthèse refusée: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="File d'inférence saturée, réessayez dans quelques instants"
+        )
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la synthèse: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur de génération audio: {str(e)}"
+        )
+    finally:
+        if ticket is not None:
+            admission.release(ticket)
+        inflight_syntheses.dec()
+
+@app.post("/tts", response_model=TTSResponse)
+async def text_to_speech(request: TTSRequest, response: Response, http_request: Request):
+    """
+    Endpoint principal de synthèse vocale - Version optimisée
+    
+    Transforme le texte en audio avec les paramètres spécifiés :
+    - Utilise l'instance unique du modèle via l'exécuteur d'inférence dédié
+    - Gère automatiquement la concaténation multi-segments
+    - Cache de synthèse : une requête déjà traitée est servie sans le modèle
+    - Single-flight : des requêtes identiques simultanées partagent une seule synthèse
+    - Cache de fragments : seules les phrases jamais synthétisées passent par le modèle
+    - Formats compressés (Opus, MP3, FLAC) encodés hors du chemin d'inférence
+    - Sauvegarde temporaire avec nettoyage automatique
+    - Validation stricte des paramètres d'entrée
+    - Métriques détaillées de performance : durée de chaque étape (cache,
+      file, G2P, inférence, WAV, encodage, stockage) en en-tête Server-Timing
+    - Ordonnancement par classe de service (X-Kokoro-Tier, cf. request_tier)
+    
+    Args:
+        request (TTSRequest): Paramètres de synthèse validés
+        response (Response): Réponse HTTP (en-tête Server-Timing)
+        http_request (Request): Requête HTTP (classe de service)
+        
+    Returns:
+        TTSResponse: Réponse avec URL audio et métadonnées
+        
+    Raises:
+        HTTPException 503: Modèle non disponible ou file d'inférence saturée
+        HTTPException 429: Attente estimée au-delà du SLO (en-tête Retry-After)
+        HTTPException 400: Voix ou format invalide
+        HTTPException 500: Erreur de génération
+    """
+    
+    timer = StageTimer()
+    result = await synthesize_tts(request, timer, tier=request_tier(http_request))
+    response.headers["Server-Timing"] = timer.server_timing()
+    return result
+
+@app.post("/tts/batch")
+async def text_to_speech_batch(request: TTSBatchRequest, http_request: Request):
+    """
+    Synthèse par lots : plusieurs textes en une seule requête HTTP
+    
+    Pour les services qui produisent des centaines de messages courts :
+    - Chaque élément suit le même chemin que /tts (caches, formats, stockage)
+    - Les textes courts sont regroupés en passes batchées sur le backend
+      d'inférence (micro-batching global s'il est actif, sinon propre au lot)
+    - TTS_BATCH_CONCURRENCY éléments au plus en cours à la fois ; le lot
+      est admis en bloc à son arrivée (429 si le serveur est déjà au-delà du
+      SLO), ses éléments sont ensuite comptés dans la charge sans être refusés
+    - Résultats renvoyés en NDJSON dans l'ordre de complétion, une ligne par
+      élément : {"index", "status": 200, "result": TTSResponse} ou
+      {"index", "status", "error"} ; une erreur n'interrompt pas le lot
+    - Dernière ligne : {"done": true, "items", "failed"}
+    
+    Args:
+        request (TTSBatchRequest): Éléments au format TTSRequest
+        http_request (Request): Requête HTTP (classe de service du lot)
+        
+    Returns:
+        StreamingResponse: Flux application/x-ndjson
+        
+    Raises:
+        HTTPException 503: Modèle non disponible
+        HTTPException 429: Attente estimée déjà au-delà du SLO (en-tête Retry-After)
     """
     
     if kokoro_pipeline is None:
         raise HTTPException(
-            status_code=503, 
-            detail="Modèle Kokoro non disponible. Redémarrez l'API."
+            status_code=503,
+            detail="Modèle Kokoro non disponible"
         )
     
-    uptime = time.time() - app_start_time
-    
-    return HealthResponse(
-        status="healthy",
-        model_loaded=kokoro_pipeline is not None,
-        model_load_time=model_load_time,
-        available_voices=3,  # af_heart, af_bella, af_sarah
-        uptime=uptime
-    )
-
-@app.get("/voices", response_model=List[VoiceInfo])
-async def get_voices():
-    """
-    Liste des voix disponibles avec métadonnées enrichies
+    if admission is not None:
+        try:
+            admission.check()
+        except AdmissionRejected as e:
+            raise admission_rejected(e)
     
-    Retourne la liste complète des voix avec leurs caractéristiques :
-    - Informations techniques (langue, genre)
-    - Descriptions subjectives basées sur les tests
-    - Recommandations d'utilisation
-    - Métadonnées pour l'interface utilisateur
+    # Sans micro-batching global, un ordonnanceur propre au lot (fenêtre nulle) :
+    # les éléments soumis dans la même itération de la boucle partent ensemble
+    batcher = micro_batcher or MicroBatcher(inference_executor, window_ms=0, max_batch=BATCH_MAX_SIZE)
+    semaphore = asyncio.Semaphore(TTS_BATCH_CONCURRENCY)
+    tier = request_tier(http_request)
     
-    Les voix listées ont été testées et validées manuellement.
+    async def run_item(index: int, item: dict) -> dict:
+        try:
+            tts_request = TTSRequest.model_validate(item)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            return {"index": index, "status": 422, "error": errors}
+        
+        async with semaphore:
+            try:
+                result = await synthesize_tts(tts_request, StageTimer(), batcher, admitted=True, tier=tier)
+            except HTTPException as e:
+                line = {"index": index, "status": e.status_code, "error": e.detail}
+                if e.headers and "Retry-After" in e.headers:
+                    line["retry_after"] = int(e.headers["Retry-After"])
+                return line
+        return {"index": index, "status": 200, "result": result.model_dump()}
     
-    Returns:
-        List[VoiceInfo]: Liste des voix avec métadonnées complètes
-    """
+    batch_metrics["batches"] += 1
+    batch_metrics["items"] += len(request.items)
+    logger.info(f"📚 Synthèse par lots: {len(request.items)} élément(s)")
     
-    voices = [
-        VoiceInfo(
-            id="af_heart",
-            name="Heart",
-            description="Voix féminine chaleureuse et expressive",
-            language="en-US",
-            gender="female",
-            recommended=True  # Basé sur vos tests
-        ),
-        VoiceInfo(
-            id="af_bella",
-            name="Bella", 
-            description="Voix féminine claire et articulée",
-            language="en-US",
-            gender="female"
-        ),
-        VoiceInfo(
-            id="af_sarah",
-            name="Sarah",
-            description="Voix féminine douce et naturelle", 
-            language="en-US",
-            gender="female"
-        )
-    ]
+    async def generate_results():
+        tasks = [asyncio.create_task(run_item(i, item)) for i, item in enumerate(request.items)]
+        failed = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                line = await next_result
+                if line["status"] != 200:
+                    failed += 1
+                    batch_metrics["items_failed"] += 1
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+            yield json.dumps({"done": True, "items": len(tasks), "failed": failed}) + "\n"
+        finally:
+            # Client déconnecté : les éléments restants sont abandonnés
+            for task in tasks:
+                task.cancel()
     
-    return voices
+    return StreamingResponse(generate_results(), media_type="application/x-ndjson")
 
-@app.post("/tts", response_model=TTSResponse)
-async def text_to_speech(request: TTSRequest, background_tasks: BackgroundTasks):
+@app.post("/tts/phonemes", response_model=TTSResponse)
+async def phonemes_to_speech(request: PhonemeTTSRequest, http_request: Request):
     """
-    Endpoint principal de synthèse vocale - Version optimisée
+    Synthèse vocale à partir de phonèmes pré-calculés
     
-    Transforme le texte en audio avec les paramètres spécifiés :
-    - Utilise l'instance unique du modèle (performance optimale)
-    - Gère automatiquement la concaténation multi-segments
-    - Sauvegarde temporaire avec nettoyage automatique
-    - Validation stricte des paramètres d'entrée
-    - Métriques détaillées de performance
+    Les phonèmes sont envoyés directement au modèle acoustique : pas de
+    découpage ni de G2P. Les segments déjà synthétisés sont repris du
+    cache de fragments, dont les clés sont justement les phonèmes.
     
     Args:
-        request (TTSRequest): Paramètres de synthèse validés
-        background_tasks (BackgroundTasks): Gestionnaire de tâches asynchrones
+        request (PhonemeTTSRequest): Segments de phonèmes et paramètres
+        http_request (Request): Requête HTTP (classe de service)
         
     Returns:
         TTSResponse: Réponse avec URL audio et métadonnées
         
     Raises:
-        HTTPException 503: Modèle non disponible
-        HTTPException 400: Voix invalide
+        HTTPException 503: Modèle non disponible ou file d'inférence saturée
+        HTTPException 429: Attente estimée au-delà du SLO (en-tête Retry-After)
+        HTTPException 400: Voix ou segments de phonèmes invalides
         HTTPException 500: Erreur de génération
     """
     
@@ -362,120 +4212,444 @@ async def text_to_speech(request: TTSRequest, background_tasks: BackgroundTasks)
             detail="Modèle Kokoro non disponible"
         )
     
-    # Validation de la voix
-    valid_voices = ["af_heart", "af_bella", "af_sarah"]
-    if request.voice not in valid_voices:
+    if request.voice not in VALID_VOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Voix '{request.voice}' non disponible. Voix disponibles: {VALID_VOICES}"
+        )
+    
+    if not 1 <= len(request.phonemes) <= MAX_PHONEME_SEGMENTS:
         raise HTTPException(
             status_code=400,
-            detail=f"Voix '{request.voice}' non disponible. Voix disponibles: {valid_voices}"
+            detail=f"Entre 1 et {MAX_PHONEME_SEGMENTS} segments de phonèmes attendus"
         )
     
+    for i, phonemes in enumerate(request.phonemes):
+        if not phonemes.strip() or len(phonemes) > MAX_PHONEMES_PER_SEGMENT:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Segment {i} invalide: 1 à {MAX_PHONEMES_PER_SEGMENT} phonèmes attendus"
+            )
+    
+    ticket = None
+    inflight_syntheses.inc()
     try:
-        logger.info(f"🎤 Synthèse demandée: '{request.text[:50]}...' avec {request.voice}")
+        logger.info(f"🔤 Synthèse depuis phonèmes: {len(request.phonemes)} segment(s) avec {request.voice}")
         start_time = time.time()
         
-        # Génération de l'ID unique
-        audio_id = str(uuid.uuid4())
-        audio_filename = f"kokoro_{audio_id}.wav"
-        audio_path = Path("temp_audio") / audio_filename
-        
-        # Synthèse vocale avec les paramètres optimisés
-        generator = kokoro_pipeline(
-            request.text,
-            voice=request.voice,
-            speed=request.speed
-        )
-        
-        # Collecte de tous les segments
-        all_audio_segments = []
-        segments_info = []
-        
-        for i, (graphemes, phonemes, audio) in enumerate(generator):
-            all_audio_segments.append(audio)
-            segments_info.append({
-                "index": i,
-                "graphemes": graphemes,
-                "phonemes": phonemes,
-                "samples": len(audio)
-            })
-            logger.debug(f"   Segment {i}: {len(audio)} samples")
-        
-        # Concaténation des segments si nécessaire
-        if len(all_audio_segments) == 1:
-            final_audio = all_audio_segments[0]
-        else:
-            import numpy as np
-            final_audio = np.concatenate(all_audio_segments)
+        audio_filename = f"kokoro_{uuid.uuid4()}.wav"
+        phoneme_count = sum(len(phonemes) for phonemes in request.phonemes)
+        if admission is not None:
+            ticket = admission.admit(phoneme_count, request.speed)
         
-        # Sauvegarde du fichier
-        sf.write(str(audio_path), final_audio, samplerate=24000)
+        tier = request_tier(http_request)
+        wav_bytes, audio_duration, segments_info, fragment_hit_ratio = await synthesize_segments(
+            [("", phonemes) for phonemes in request.phonemes], request.voice, request.speed,
+            priority=JobPriority(tier, estimate_compute_seconds(phoneme_count, request.speed))
+        )
+        await asyncio.to_thread(audio_store.put, audio_filename, wav_bytes)
         
-        # Calcul des métriques
         generation_time = time.time() - start_time
-        audio_duration = len(final_audio) / 24000
-        
         logger.info(f"✅ Synthèse réussie: {generation_time:.2f}s pour {audio_duration:.2f}s d'audio")
+        record_synthesis(request.voice, phoneme_count, audio_duration, generation_time, tier)
         
-        # Programmation de la suppression automatique (après 1h)
-        background_tasks.add_task(cleanup_audio_file, audio_path, delay_seconds=3600)
+        audio_janitor.schedule(audio_filename)
         
         return TTSResponse(
             success=True,
-            message=f"Audio généré avec succès ({len(all_audio_segments)} segment(s))",
+            message=f"Audio généré avec succès ({len(segments_info)} segment(s))",
             audio_url=f"/audio/{audio_filename}",
             audio_duration=audio_duration,
             generation_time=generation_time,
-            text_length=len(request.text),
+            text_length=phoneme_count,
             voice_used=request.voice,
-            segments_count=len(all_audio_segments)
+            segments_count=len(segments_info),
+            fragment_hit_ratio=fragment_hit_ratio
+        )
+        
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+    except InferenceQueueFull as e:
+        logger.warning(f"⏳ Synthèse refusée: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="File d'inférence saturée, réessayez dans quelques instants"
+        )
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la synthèse: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur de génération audio: {str(e)}"
         )
+    finally:
+        if ticket is not None:
+            admission.release(ticket)
+        inflight_syntheses.dec()
+
+@app.post("/tts/stream")
+async def text_to_speech_stream(request: TTSRequest, http_request: Request):
+    """
+    Synthèse vocale en streaming - Envoi segment par segment
+    
+    Contrairement à /tts qui attend la fin de la génération, chaque segment
+    produit par KPipeline est envoyé dès sa sortie du modèle :
+    - En-tête WAV "streaming" (taille de données inconnue) envoyé avec le premier segment
+    - Trames PCM 16 bits mono 24 kHz pour chaque segment suivant
+    - Le temps avant le premier octet (TTFB) ne dépend plus que du premier segment
+    
+    Chaque segment est calculé dans l'exécuteur d'inférence du processus
+    de l'API (un générateur ne peut pas traverser les processus du pool) :
+    la boucle asyncio n'est pas bloquée pendant la synthèse.
+    
+    Args:
+        request (TTSRequest): Paramètres de synthèse validés
+        http_request (Request): Requête HTTP (classe de service)
+        
+    Returns:
+        StreamingResponse: Flux audio/wav chunké
         
+    Raises:
+        HTTPException 503: Modèle non disponible ou file d'inférence saturée
+        HTTPException 429: Attente estimée au-delà du SLO (en-tête Retry-After)
+        HTTPException 400: Voix invalide
+    """
+    
+    if kokoro_pipeline is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Modèle Kokoro non disponible"
+        )
+    
+    if request.voice not in VALID_VOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Voix '{request.voice}' non disponible. Voix disponibles: {VALID_VOICES}"
+        )
+    
+    # Le streaming envoie du PCM brut au fil de l'eau : WAV uniquement
+    if (request.format or "wav").lower() != "wav":
+        raise HTTPException(
+            status_code=400,
+            detail="Le streaming ne produit que du WAV, utilisez POST /tts pour les formats compressés"
+        )
+    
+    logger.info(f"📡 Streaming demandé: '{request.text[:50]}...' avec {request.voice}")
+    start_time = time.time()
+    
+    # Le générateur est paresseux : rien n'est calculé avant le premier next()
+    stream_executor = inference_executor.local
+    # Segments suivants à coût nul : un flux commencé n'est pas mis en attente
+    # derrière des synthèses complètes
+    tier = request_tier(http_request)
+    priority = JobPriority(tier, estimate_compute_seconds(len(request.text), request.speed))
+    generator = iter_synthesis(stream_executor.pipeline, request.text, request.voice, request.speed)
+    
+    # Premier segment calculé avant de répondre : une file saturée donne un vrai 503/429
+    ticket = None
+    
+    def release_ticket():
+        """Libération unique du ticket (fin du flux, client parti, ou erreur)"""
+        nonlocal ticket
+        if ticket is not None:
+            admission.release(ticket)
+            ticket = None
+    
+    try:
+        if admission is not None:
+            ticket = admission.admit(len(request.text), request.speed)
+        first_segment = await stream_executor.run(next_segment, generator, priority=priority)
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+    except InferenceQueueFull as e:
+        release_ticket()
+        logger.warning(f"⏳ Streaming refusé: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="File d'inférence saturée, réessayez dans quelques instants"
+        )
     except Exception as e:
+        release_ticket()
         logger.error(f"❌ Erreur lors de la synthèse: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Erreur de génération audio: {str(e)}"
         )
+    
+    async def audio_stream():
+        """Générateur WAV : en-tête + PCM au fil des segments"""
+        stream_metrics["streams_started"] += 1
+        inflight_syntheses.inc()
+        total_samples = 0
+        segments = 0
+        segment = first_segment
+        
+        try:
+            while segment is not None:
+                graphemes, phonemes, audio = segment
+                chunk = audio_to_pcm16(audio)
+                
+                if segments == 0:
+                    # Premier segment : l'en-tête part avec les premières trames
+                    chunk = wav_header() + chunk
+                    ttfb = time.time() - start_time
+                    stream_metrics["ttfb_count"] += 1
+                    stream_metrics["last_ttfb"] = ttfb
+                    stream_metrics["total_ttfb"] += ttfb
+                    logger.info(f"⚡ Premier segment envoyé (TTFB: {ttfb:.3f}s)")
+                
+                segments += 1
+                total_samples += len(audio)
+                yield chunk
+                
+                segment = await stream_executor.run(
+                    next_segment, generator, admitted=True, priority=JobPriority(tier)
+                )
+            
+            stream_metrics["streams_completed"] += 1
+            record_synthesis(request.voice, len(request.text), total_samples / SAMPLE_RATE, time.time() - start_time, tier)
+            logger.info(
+                f"✅ Streaming terminé: {segments} segment(s), "
+                f"{total_samples / SAMPLE_RATE:.2f}s d'audio en {time.time() - start_time:.2f}s"
+            )
+            
+        except Exception as e:
+            # Les en-têtes HTTP sont déjà partis : on ne peut que couper le flux
+            logger.error(f"❌ Erreur pendant le streaming: {e}")
+            raise
+        finally:
+            release_ticket()
+            inflight_syntheses.dec()
+    
+    # Le ticket est aussi libéré si le flux ne démarre jamais (client déjà parti)
+    return ReleasingStreamingResponse(
+        audio_stream(),
+        on_close=release_ticket,
+        media_type="audio/wav",
+        headers={
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no"  # Désactive le buffering des proxys (nginx)
+        }
+    )
+
+@app.post("/tts/jobs", response_model=JobStatus, status_code=202)
+async def create_longform_job(request: LongFormRequest):
+    """
+    Création d'un job de synthèse longue
+    
+    Le document est découpé en morceaux aux fins de phrase, synthétisés
+    en parallèle par les workers d'inférence puis assemblés en un seul
+    fichier. La réponse est immédiate : suivre la progression avec
+    GET /tts/jobs/{job_id} (ou .../events) puis télécharger .../audio.
+    
+    Args:
+        request (LongFormRequest): Document et paramètres de synthèse
+        
+    Returns:
+        JobStatus: État initial du job (202 Accepted)
+        
+    Raises:
+        HTTPException 503: Modèle non disponible
+        HTTPException 400: Voix, format ou texte invalide
+    """
+    
+    if kokoro_pipeline is None or longform_jobs is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Modèle Kokoro non disponible"
+        )
+    
+    if request.voice not in VALID_VOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Voix '{request.voice}' non disponible. Voix disponibles: {VALID_VOICES}"
+        )
+    
+    audio_format = (request.format or "wav").lower()
+    if audio_format not in AUDIO_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format '{request.format}' non supporté. Formats disponibles: {list(AUDIO_FORMATS)}"
+        )
+    
+    try:
+        job = longform_jobs.create(request.text, request.voice, request.speed, audio_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"📚 Job {job.job_id} créé: {len(request.text)} caractères, {len(job.chunks)} morceau(x)")
+    return job.to_status()
+
+@app.get("/tts/jobs/{job_id}", response_model=JobStatus)
+async def get_longform_job(job_id: str):
+    """
+    Progression d'un job de synthèse longue (polling)
+    
+    Raises:
+        HTTPException 404: Job inconnu ou expiré
+    """
+    
+    job = longform_jobs.get(job_id) if longform_jobs else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job non trouvé ou expiré")
+    return job.to_status()
+
+@app.get("/tts/jobs/{job_id}/events")
+async def stream_longform_job_events(job_id: str):
+    """
+    Abonnement à la progression d'un job (Server-Sent Events)
+    
+    Un événement JSON (même contenu que GET /tts/jobs/{job_id}) est
+    envoyé à chaque morceau terminé ; le flux se ferme quand le job est
+    terminé ou en échec. Un commentaire keep-alive part toutes les 15s.
+    
+    Raises:
+        HTTPException 404: Job inconnu ou expiré
+    """
+    
+    job = longform_jobs.get(job_id) if longform_jobs else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job non trouvé ou expiré")
+    
+    async def events():
+        last_sent = None
+        while True:
+            status = job.to_status()
+            payload = status.model_dump_json()
+            if payload != last_sent:
+                yield f"data: {payload}\n\n"
+                last_sent = payload
+            else:
+                yield ": keep-alive\n\n"
+            if status.status in ("completed", "failed"):
+                return
+            await job.wait_change(timeout=15)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/tts/jobs/{job_id}/audio")
+async def get_longform_job_audio(job_id: str):
+    """
+    Téléchargement du fichier audio assemblé d'un job terminé
+    
+    Raises:
+        HTTPException 404: Job inconnu ou expiré
+        HTTPException 409: Job pas encore terminé (ou en échec)
+    """
+    
+    job = longform_jobs.get(job_id) if longform_jobs else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job non trouvé ou expiré")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Job non terminé (état: {job.status})")
+    
+    return FileResponse(
+        path=str(job.output_path),
+        media_type=AUDIO_FORMATS[job.audio_format]["media_type"],
+        filename=f"kokoro_{job.job_id}.{job.audio_format}",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
 
 @app.get("/audio/{filename}")
-async def get_audio_file(filename: str):
+async def get_audio_file(filename: str, request: Request):
     """
     Endpoint de téléchargement des fichiers audio générés
     
     Sert les fichiers audio avec optimisations :
-    - Cache HTTP pour réduire la bande passante
-    - Support du streaming (Accept-Ranges)
+    - Envoi direct depuis le stockage mémoire (sans copie ni accès disque)
+    - ETag fort (hash du contenu) et 304 sur If-None-Match
+    - Requêtes Range à une ou plusieurs plages (206, multipart/byteranges),
+      lues via mmap pour les fichiers sur disque
     - Vérification de sécurité des noms de fichiers
     - Gestion d'erreurs pour fichiers expirés
     
     Args:
         filename (str): Nom du fichier audio à télécharger
+        request (Request): Requête HTTP (en-têtes Range, If-None-Match, If-Range)
         
     Returns:
-        FileResponse: Fichier audio avec headers optimisés
+        Response | FileResponse: Fichier audio (200), plage(s) (206) ou 304
         
     Raises:
         HTTPException 404: Fichier non trouvé ou expiré
+        HTTPException 416: Aucune plage demandée n'est satisfiable
     """
     
-    audio_path = Path("temp_audio") / filename
+    stored = audio_store.get(filename)
     
-    if not audio_path.exists():
+    if stored is None:
         raise HTTPException(
             status_code=404,
             detail="Fichier audio non trouvé ou expiré"
         )
     
+    # Hachage éventuel d'un fichier disque hors de la boucle asyncio
+    if isinstance(stored, Path):
+        etag = await asyncio.to_thread(audio_store.etag, filename)
+        size = stored.stat().st_size
+    else:
+        etag = audio_store.etag(filename)
+        size = len(stored)
+    
+    # Type MIME déduit de l'extension (format choisi à la synthèse)
+    media_type = AUDIO_FORMATS.get(Path(filename).suffix.lstrip("."), AUDIO_FORMATS["wav"])["media_type"]
+    
     # Headers optimisés pour le streaming audio
-    return FileResponse(
-        path=str(audio_path),
-        media_type="audio/wav",
-        filename=filename,
-        headers={
-            "Cache-Control": "public, max-age=3600",  # Cache 1h
-            "Accept-Ranges": "bytes"  # Support du streaming
-        }
-    )
+    headers = {
+        "Cache-Control": "public, max-age=3600",  # Cache 1h
+        "Accept-Ranges": "bytes",  # Support du streaming
+        "ETag": etag
+    }
+    
+    # Requête conditionnelle : le client a déjà ce contenu
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    # Range ignoré si If-Range ne correspond plus au contenu (comparaison forte)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        ranges = parse_byte_ranges(range_header, size)
+        
+        if ranges == []:
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{size}", "ETag": etag}
+            )
+        
+        if ranges:
+            if isinstance(stored, Path):
+                parts = await asyncio.to_thread(read_byte_ranges, stored, ranges)
+            else:
+                parts = [stored[start:end + 1] for start, end in ranges]
+            
+            if len(ranges) == 1:
+                start, end = ranges[0]
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                return Response(content=parts[0], status_code=206, media_type=media_type, headers=headers)
+            
+            boundary = uuid.uuid4().hex
+            body = multipart_byteranges(parts, ranges, size, media_type, boundary)
+            return Response(
+                content=body,
+                status_code=206,
+                media_type=f"multipart/byteranges; boundary={boundary}",
+                headers=headers
+            )
+    
+    # Fichier complet ; débordé sur disque : envoi par FileResponse
+    if isinstance(stored, Path):
+        return FileResponse(
+            path=str(stored),
+            media_type=media_type,
+            filename=filename,
+            headers=headers
+        )
+    
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return Response(content=stored, media_type=media_type, headers=headers)
 
 @app.delete("/audio/{filename}")
 async def delete_audio_file(filename: str):
@@ -495,10 +4669,7 @@ async def delete_audio_file(filename: str):
         HTTPException 404: Fichier non trouvé
     """
     
-    audio_path = Path("temp_audio") / filename
-    
-    if audio_path.exists():
-        audio_path.unlink()
+    if audio_store.delete(filename):
         logger.info(f"🗑️  Fichier supprimé: {filename}")
         return {"message": f"Fichier {filename} supprimé avec succès"}
     else:
@@ -512,7 +4683,7 @@ async def get_stats():
     Endpoint de monitoring avancé pour l'administration :
     - Uptime de l'application
     - Performance du modèle (temps de chargement)
-    - Gestion des fichiers temporaires (nombre, taille)
+    - Gestion des fichiers temporaires (nombre, taille : compteurs tenus à jour, O(1))
     - État général du système
     
     Utile pour la supervision, l'optimisation et le débogage.
@@ -522,46 +4693,258 @@ async def get_stats():
     """
     
     uptime = time.time() - app_start_time
-    temp_dir = Path("temp_audio")
+    store_stats = audio_store.stats() if audio_store else {"files_count": 0, "size_bytes": 0}
     
-    audio_files = list(temp_dir.glob("*.wav"))
-    total_size_mb = sum(f.stat().st_size for f in audio_files) / (1024 * 1024)
+    ttfb_count = stream_metrics["ttfb_count"]
     
     return {
         "uptime_seconds": uptime,
         "model_load_time": model_load_time,
-        "temp_files_count": len(audio_files),
-        "temp_files_size_mb": round(total_size_mb, 2),
-        "model_loaded": kokoro_pipeline is not None
+        "temp_files_count": store_stats["files_count"],
+        "temp_files_size_mb": round(store_stats["size_bytes"] / (1024 * 1024), 2),
+        "audio_store": dict(store_stats, backend=audio_store.backend) if audio_store else None,
+        "audio_janitor": audio_janitor.stats() if audio_janitor else None,
+        "model_loaded": kokoro_pipeline is not None,
+        "model_variant": model_variant(),
+        "inference_engine": inference_engine.stats() if inference_engine else None,
+        "quantization": quantization_report,
+        "synthesis_cache": synthesis_cache.stats() if synthesis_cache else None,
+        "single_flight": single_flight.stats() if single_flight else None,
+        "fragment_cache": fragment_cache.stats() if fragment_cache else None,
+        "g2p_lexicon": g2p_lexicon.stats() if g2p_lexicon else None,
+        "inference_queue": inference_executor.stats() if inference_executor else None,
+        "micro_batching": micro_batcher.stats() if micro_batcher else None,
+        "admission": admission.stats() if admission else None,
+        "latency_by_tier": {tier: window.stats() for tier, window in tier_latencies.items()},
+        "longform_jobs": longform_jobs.stats() if longform_jobs else None,
+        "tts_batch": batch_metrics,
+        "encoding": audio_encoder.stats() if audio_encoder else None,
+        "streaming": {
+            "streams_started": stream_metrics["streams_started"],
+            "streams_completed": stream_metrics["streams_completed"],
+            "last_ttfb_seconds": stream_metrics["last_ttfb"],
+            "avg_ttfb_seconds": (
+                stream_metrics["total_ttfb"] / ttfb_count if ttfb_count else None
+            )
+        }
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Exposition des métriques au format texte Prometheus
+    
+    Destinée au scraping (autoscaler, tableaux de bord d'astreinte) :
+    - Histogrammes : latence de génération (globale et par classe de service),
+      facteur temps réel, durée audio, longueur du texte
+    - Compteurs : synthèses par voix, requêtes coalescées, réponses par route et code HTTP
+    - Jauges : profondeur de la file d'inférence, synthèses en cours, travail
+      admis en secondes d'audio et attente estimée (délestage par le répartiteur)
+    - Compteur des refus du contrôle d'admission (429)
+    
+    Returns:
+        Response: Métriques au format d'exposition Prometheus 0.0.4
+    """
+    
+    lines = []
+    for metric in (
+        generation_seconds, real_time_factor, audio_duration_seconds, text_length_chars, stage_seconds,
+        tier_generation_seconds,
+        tts_requests_total, coalesced_requests_total, http_requests_total, inflight_syntheses, inference_queue_depth,
+        admission_queued_audio_seconds, admission_expected_wait_seconds, admission_rejected_total
+    ):
+        lines.extend(metric.render())
+    
+    lines.extend([
+        "# HELP kokoro_model_loaded Modèle Kokoro chargé (1) ou non (0)",
+        "# TYPE kokoro_model_loaded gauge",
+        f"kokoro_model_loaded {int(kokoro_pipeline is not None)}",
+        "# HELP kokoro_uptime_seconds Temps écoulé depuis le démarrage",
+        "# TYPE kokoro_uptime_seconds gauge",
+        f"kokoro_uptime_seconds {time.time() - app_start_time:.1f}"
+    ])
+    
+    return Response(content="\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
 # ===============================
 # FONCTIONS UTILITAIRES
 # ===============================
 
-async def cleanup_audio_file(file_path: Path, delay_seconds: int = 3600):
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Évaluation de If-None-Match (comparaison faible, RFC 9110 §13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def is_ascii_digits(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+def parse_byte_ranges(range_header: str, size: int):
+    """
+    Analyse d'un en-tête Range en plages d'octets (RFC 9110 §14.1.2)
+    
+    Args:
+        range_header (str): Valeur de l'en-tête, ex. "bytes=0-99,-500"
+        size (int): Taille du fichier
+        
+    Returns:
+        list | None: Plages (début, fin incluse) satisfiables ; [] si aucune
+        ne l'est (416) ; None si l'en-tête est invalide ou demande trop de
+        plages (le fichier complet est alors servi)
+    """
+    unit, _, specs = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+    
+    specs = specs.split(",")
+    if len(specs) > MAX_BYTE_RANGES:
+        return None
+    
+    ranges = []
+    for spec in specs:
+        first, dash, last = spec.strip().partition("-")
+        # Chiffres ASCII uniquement : isdigit() accepte aussi "²" ou "¹"
+        # (en-têtes décodés en latin-1), que int() refuse
+        if not dash or not (is_ascii_digits(first) or is_ascii_digits(last)):
+            return None
+        if (first and not is_ascii_digits(first)) or (last and not is_ascii_digits(last)):
+            return None
+        
+        if not first:
+            # Suffixe : les N derniers octets
+            length = int(last)
+            if length == 0 or size == 0:
+                continue
+            ranges.append((max(size - length, 0), size - 1))
+            continue
+        
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, end))
+    
+    return ranges
+
+def read_byte_ranges(path: Path, ranges: list) -> list:
+    """Lecture de plages d'un fichier via mmap (seules les pages demandées sont lues)"""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return [mapped[start:end + 1] for start, end in ranges]
+
+def multipart_byteranges(parts: list, ranges: list, size: int, media_type: str, boundary: str) -> bytes:
+    """Corps multipart/byteranges d'une réponse 206 à plusieurs plages"""
+    chunks = []
+    for data, (start, end) in zip(parts, ranges):
+        chunks.append(
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n".encode()
+        )
+        chunks.append(data)
+    chunks.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(chunks)
+
+def wav_header(data_size: Optional[int] = None, sample_rate: int = SAMPLE_RATE,
+               channels: int = 1, bits_per_sample: int = 16) -> bytes:
     """
-    Nettoyage automatique des fichiers temporaires
+    En-tête WAV (RIFF) PCM
     
-    Supprime automatiquement les fichiers audio après un délai défini.
-    Exécuté en tâche de fond pour éviter l'accumulation de fichiers.
+    Sans taille de données (flux de longueur inconnue), les champs de
+    taille RIFF et data sont fixés à 0xFFFFFFFF, valeur interprétée comme
+    "jusqu'à la fin du flux" par les navigateurs, ffmpeg et la plupart
+    des lecteurs audio.
     
     Args:
-        file_path (Path): Chemin du fichier à supprimer
-        delay_seconds (int): Délai avant suppression (défaut : 1h)
+        data_size (int | None): Taille des trames PCM en octets (None = streaming)
+        sample_rate (int): Fréquence d'échantillonnage (défaut : 24 kHz)
+        channels (int): Nombre de canaux (Kokoro produit du mono)
+        bits_per_sample (int): Profondeur PCM
         
-    Note:
-        Fonction asynchrone pour ne pas bloquer l'API principale.
-        Gère les erreurs de suppression (fichier déjà supprimé, permissions).
+    Returns:
+        bytes: En-tête WAV de 44 octets
     """
-    await asyncio.sleep(delay_seconds)
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    riff_size = 0xFFFFFFFF if data_size is None else 36 + data_size
+    data_size = 0xFFFFFFFF if data_size is None else data_size
     
-    if file_path.exists():
-        try:
-            file_path.unlink()
-            logger.info(f"🗑️  Auto-suppression: {file_path.name}")
-        except Exception as e:
-            logger.warning(f"⚠️  Impossible de supprimer {file_path.name}: {e}")
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate,
+                                byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+def pcm_to_wav(pcm_segments: list) -> bytes:
+    """Assemblage de trames PCM 16 bits en un fichier WAV complet (sans ré-encodage)"""
+    data_size = sum(len(pcm) for pcm in pcm_segments)
+    return b"".join([wav_header(data_size), *pcm_segments])
+
+def audio_to_int16(audio) -> np.ndarray:
+    """
+    Conversion d'un segment Kokoro (float32 [-1, 1]) en échantillons 16 bits little-endian
+    
+    Une seule copie float32 (mise à l'échelle), arrondie et écrêtée en
+    place avec la convention de libsndfile (échelle 0x8000, arrondi par
+    défaut) : mêmes échantillons que sf.write en PCM_16.
+    
+    Args:
+        audio: Segment audio (tensor torch ou tableau numpy)
+        
+    Returns:
+        np.ndarray: Échantillons int16 contigus
+    """
+    scaled = np.asarray(audio, dtype=np.float32) * 32768
+    np.floor(scaled, out=scaled)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    return scaled.astype("<i2")
+
+def audio_to_pcm16(audio) -> bytes:
+    """
+    Conversion d'un segment Kokoro en trames PCM 16 bits (voir audio_to_int16)
+    
+    Returns:
+        bytes: Trames PCM prêtes à être envoyées
+    """
+    return audio_to_int16(audio).tobytes()
+
+class WavBuilder:
+    """
+    Fichier WAV PCM 16 bits construit segment par segment
+    
+    Chaque segment est converti et écrit dès sa sortie du modèle dans un
+    tampon unique à croissance amortie ; l'en-tête (tailles) est complété
+    à la fin. Remplace liste de segments + np.concatenate + sf.write : la
+    mémoire de pointe est le WAV final plus un segment, au lieu de l'audio
+    complet en float32 deux fois.
+    """
+    
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        self._buffer.write(wav_header(0))
+        self.samples = 0
+    
+    def append(self, audio) -> int:
+        """Ajout d'un segment, retourne son nombre d'échantillons"""
+        pcm = audio_to_int16(audio)
+        self._buffer.write(pcm)  # Protocole buffer : pas de copie via tobytes()
+        self.samples += len(pcm)
+        return len(pcm)
+    
+    @property
+    def duration(self) -> float:
+        return self.samples / SAMPLE_RATE
+    
+    def finish(self) -> bytes:
+        """En-tête définitif et contenu du fichier WAV"""
+        self._buffer.seek(0)
+        self._buffer.write(wav_header(self.samples * 2))
+        return self._buffer.getvalue()
 
 # ===============================
 # POINT D'ENTRÉE DE L'APPLICATION
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de performance pour l'API Kokoro optimisée
+
+Mesure directement les composants de l'API (sans passer par HTTP) pour
+valider les optimisations sur la machine cible.
+
+Usage:
+    python benchmark_kokoro.py workers --max-workers 16 --requests 64
+    python benchmark_kokoro.py memory --chars 2000
+    python benchmark_kokoro.py topology --max-workers 8 --requests 32
+    python benchmark_kokoro.py quantization --repeat 3
+    python benchmark_kokoro.py engines --workers 4 --requests 32
+    python benchmark_kokoro.py compile --repeat 5
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+import api_kokoro_optimized as api
+
+# Textes courts représentatifs (notifications, phrases de l'interface)
+BENCH_TEXTS = [
+    "Your order has shipped and will arrive tomorrow.",
+    "Welcome back! You have three new messages.",
+    "The meeting starts in five minutes.",
+    "Thank you for your purchase. Have a great day!",
+    "Your password was changed successfully.",
+    "Reminder: your subscription renews next week.",
+]
+
+def load_pipeline(device=None):
+    """Chargement du pipeline Kokoro et du moteur PyTorch dans le module de l'API (hérités par les workers)"""
+    from kokoro import KPipeline
+
+    print("📥 Chargement du pipeline Kokoro (lang_code='a')...")
+    start = time.time()
+    api.kokoro_pipeline = KPipeline(lang_code='a', device=device)
+    api.inference_engine = api.TorchEngine(api.kokoro_pipeline)
+    print(f"✅ Modèle chargé en {time.time() - start:.2f}s\n")
+    return api.kokoro_pipeline
+
+def process_pss_mb(pid: int) -> float:
+    """
+    Mémoire proportionnelle (PSS) d'un processus en MB
+
+    Contrairement au RSS, les pages partagées en copy-on-write sont
+    réparties entre les processus : la somme des PSS est la vraie
+    empreinte mémoire du pool. Linux uniquement.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+async def run_load(executor, num_requests: int):
+    """Envoi de num_requests synthèses concurrentes, retourne (durée, secondes d'audio)"""
+    jobs = [
+        executor.run(api.synthesize_wav, BENCH_TEXTS[i % len(BENCH_TEXTS)], "af_heart", 1.0, admitted=True)
+        for i in range(num_requests)
+    ]
+    start = time.time()
+    results = await asyncio.gather(*jobs)
+    elapsed = time.time() - start
+    return elapsed, sum(duration for _, duration, _, _ in results)
+
+def bench_workers(args):
+    """Débit du pool d'inférence multi-processus selon le nombre de workers"""
+    print("🔄 Benchmark: pool d'inférence multi-processus")
+    print(f"   CPU disponibles: {os.cpu_count()} | requêtes par palier: {args.requests}\n")
+
+    load_pipeline()
+
+    counts = [n for n in (1, 2, 4, 8, 16, 32) if n <= args.max_workers]
+    results = []
+
+    for workers in counts:
+        pool = api.InferenceProcessPool(api.kokoro_pipeline, workers=workers, max_queue=args.requests)
+        try:
+            # Préchauffage : une synthèse par worker
+            asyncio.run(run_load(pool, workers))
+            elapsed, audio_seconds = asyncio.run(run_load(pool, args.requests))
+            pss = process_pss_mb(os.getpid()) + sum(process_pss_mb(pid) for pid in pool.worker_pids)
+        finally:
+            pool.shutdown()
+
+        throughput = args.requests / elapsed
+        results.append((workers, throughput))
+        print(f"   {workers:>2} worker(s): {throughput:6.2f} req/s | "
+              f"{audio_seconds / elapsed:6.1f}s d'audio/s | "
+              f"{pool.layout[0]['intra_op_threads']} thread(s)/worker | mémoire totale (PSS): {pss:.0f} MB")
+
+    baseline = results[0][1]
+    print("\n📊 Accélération par rapport à 1 worker:")
+    for workers, throughput in results:
+        print(f"   {workers:>2} worker(s): x{throughput / baseline:.2f}")
+
+    return True
+
+async def run_timed_load(executor, num_requests: int):
+    """Comme run_load, avec en plus la latence de chaque requête"""
+    async def timed(text):
+        start = time.perf_counter()
+        await executor.run(api.synthesize_wav, text, "af_heart", 1.0, admitted=True)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(BENCH_TEXTS[i % len(BENCH_TEXTS)]) for i in range(num_requests)))
+    return time.perf_counter() - start, sorted(latencies)
+
+def percentile(sorted_values, p: float) -> float:
+    """Percentile au rang le plus proche d'une liste triée"""
+    return sorted_values[max(0, int(np.ceil(p / 100 * len(sorted_values))) - 1)]
+
+def bench_topology(args):
+    """
+    Balayage workers x threads intra-op x épinglage
+
+    Les threads inter-op ne sont pas balayés : PyTorch ne les accepte
+    qu'une fois par processus (KOKORO_INTER_OP_THREADS, hérité au fork).
+    Recommandation : meilleur débit parmi les configurations dont la p95
+    reste dans 1.5x la meilleure p95 mesurée.
+    """
+    cpus = api.available_cpus()
+    nodes = api.numa_nodes(cpus)
+    print("🔄 Benchmark: topologie CPU des workers d'inférence")
+    print(f"   CPU disponibles: {len(cpus)} | nœuds NUMA: {len(nodes)} | requêtes par configuration: {args.requests}\n")
+
+    load_pipeline()
+
+    worker_counts = [n for n in (1, 2, 4, 8, 16, 32) if n <= min(args.max_workers, len(cpus))]
+    results = []
+
+    for workers in worker_counts:
+        slice_size = len(cpus) // workers
+        thread_counts = sorted({0, 1, max(1, slice_size // 2)} - {slice_size})
+        for intra_op in thread_counts:
+            for pin in (True, False):
+                layout = api.plan_cpu_topology(workers, intra_op, api.INFERENCE_INTER_OP_THREADS, pin, cpus)
+                pool = api.InferenceProcessPool(api.kokoro_pipeline, workers=workers,
+                                                max_queue=args.requests, layout=layout)
+                try:
+                    asyncio.run(run_load(pool, workers))
+                    elapsed, latencies = asyncio.run(run_timed_load(pool, args.requests))
+                finally:
+                    pool.shutdown()
+
+                result = {
+                    "workers": workers,
+                    "intra_op": layout[0]["intra_op_threads"],
+                    "configured_intra_op": intra_op,
+                    "pin": pin,
+                    "throughput": args.requests / elapsed,
+                    "p50": percentile(latencies, 50),
+                    "p95": percentile(latencies, 95),
+                }
+                results.append(result)
+                print(f"   {workers:>2} worker(s) x {result['intra_op']:>2} thread(s) "
+                      f"{'épinglé    ' if pin else 'non épinglé'}: {result['throughput']:6.2f} req/s | "
+                      f"p50 {result['p50'] * 1000:7.0f} ms | p95 {result['p95'] * 1000:7.0f} ms")
+
+    best_p95 = min(result["p95"] for result in results)
+    eligible = [result for result in results if result["p95"] <= 1.5 * best_p95]
+    best = max(eligible, key=lambda result: result["throughput"])
+    print(f"\n📊 Recommandation (meilleur débit avec p95 <= 1.5 x {best_p95 * 1000:.0f} ms):")
+    print(f"   {best['workers']} worker(s) x {best['intra_op']} thread(s) intra-op, "
+          f"{'épinglés' if best['pin'] else 'non épinglés'}: {best['throughput']:.2f} req/s, "
+          f"p95 {best['p95'] * 1000:.0f} ms")
+    print(f"\n   KOKORO_INFERENCE_WORKERS={best['workers']} "
+          f"KOKORO_INTRA_OP_THREADS={best['configured_intra_op']} "
+          f"KOKORO_PIN_CPUS={int(best['pin'])}")
+    return True
+
+def model_size_mb(model) -> float:
+    """Taille sérialisée des poids du modèle (int8 compris) en MB"""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2**20
+
+def bench_quantization(args):
+    """Accélération et qualité du modèle int8 face au fp32 sur le corpus de contrôle"""
+    import torch
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    print("🔄 Benchmark: quantification dynamique int8 (Linear, LSTM)")
+    print(f"   Threads PyTorch: {torch.get_num_threads()} | corpus: {len(api.QUALITY_CORPUS)} textes | "
+          f"répétitions: {args.repeat}\n")
+
+    pipeline = load_pipeline(device="cpu")
+    corpus = api.QUALITY_CORPUS
+    results = {}
+    for mode in ("fp32", "int8"):
+        if mode == "int8":
+            api.quantize_model_int8(pipeline.model)
+        # Préchauffage, puis meilleur temps sur le corpus complet
+        api.synthesize_corpus(pipeline, corpus[:1])
+        durations = []
+        for _ in range(args.repeat):
+            outputs, seconds = api.synthesize_corpus(pipeline, corpus)
+            durations.append(seconds)
+        audio_seconds = sum(len(audio) for audio in outputs) / api.SAMPLE_RATE
+        results[mode] = {"outputs": outputs, "seconds": min(durations), "size_mb": model_size_mb(pipeline.model)}
+        print(f"   {mode}: {min(durations):6.2f}s pour {audio_seconds:.1f}s d'audio | "
+              f"RTF {min(durations) / audio_seconds:.3f} | poids: {results[mode]['size_mb']:.0f} MB")
+
+    print("\n📏 Distance spectrale int8 / fp32 par texte:")
+    distances = []
+    for text, reference, candidate in zip(corpus, results["fp32"]["outputs"], results["int8"]["outputs"]):
+        distances.append(api.spectral_distance(reference, candidate))
+        print(f"   {distances[-1]:5.2f} dB | durée x{len(candidate) / len(reference):.3f} | {text[:50]}")
+
+    mean_distance = sum(distances) / len(distances)
+    passed = mean_distance <= api.QUANTIZATION_MAX_DISTANCE_DB
+    print(f"\n📊 Accélération int8: x{results['fp32']['seconds'] / results['int8']['seconds']:.2f} | "
+          f"poids x{results['int8']['size_mb'] / results['fp32']['size_mb']:.2f} | "
+          f"distance moyenne {mean_distance:.2f} dB (max {api.QUANTIZATION_MAX_DISTANCE_DB:g}) "
+          f"{'✅' if passed else '❌'}")
+    return passed
+
+def bench_engines(args):
+    """
+    PyTorch eager face à ONNX Runtime : latence par segment puis débit sous charge
+
+    Le front-end texte est commun aux deux moteurs : les phonèmes sont
+    calculés une fois et seule l'inférence est chronométrée pour la
+    latence. Le débit passe par le pool d'inférence de l'API (G2P compris),
+    le moteur étant hérité au fork des workers.
+    """
+    import torch
+
+    print("🔄 Benchmark: moteurs d'inférence (PyTorch eager vs ONNX Runtime, CPU)")
+    pipeline = load_pipeline(device="cpu")
+    engines = [
+        api.TorchEngine(pipeline),
+        api.OnnxEngine.load(pipeline, Path(args.onnx_dir), api.MODEL_VERSION)
+    ]
+    segments = [phonemes for text in BENCH_TEXTS for _, phonemes in api.phonemize_segments(pipeline, text)]
+    print(f"   Threads: {torch.get_num_threads()} | segments: {len(segments)} x {args.repeat} | "
+          f"workers: {args.workers} | requêtes concurrentes: {args.requests}\n")
+
+    results = {}
+    for engine in engines:
+        # Latence : un segment à la fois, dans ce processus
+        engine.synthesize(segments[0], "af_heart", 1.0)
+        latencies, audio_seconds = [], 0.0
+        for _ in range(args.repeat):
+            for phonemes in segments:
+                start = time.perf_counter()
+                audio = engine.synthesize(phonemes, "af_heart", 1.0)
+                latencies.append(time.perf_counter() - start)
+                audio_seconds += len(audio) / api.SAMPLE_RATE
+        latencies.sort()
+        engine.release()
+
+        # Débit : requêtes concurrentes sur le pool de workers
+        api.inference_engine = engine
+        pool = api.InferenceProcessPool(pipeline, workers=args.workers, max_queue=args.requests)
+        try:
+            asyncio.run(run_load(pool, args.workers))
+            elapsed, request_latencies = asyncio.run(run_timed_load(pool, args.requests))
+        finally:
+            pool.shutdown()
+
+        results[engine.name] = {
+            "p50": percentile(latencies, 50),
+            "throughput": args.requests / elapsed
+        }
+        print(f"   {engine.name:<6} segment p50 {percentile(latencies, 50) * 1000:7.1f} ms | "
+              f"p95 {percentile(latencies, 95) * 1000:7.1f} ms | RTF {sum(latencies) / audio_seconds:.3f} | "
+              f"{results[engine.name]['throughput']:6.2f} req/s (p95 {percentile(request_latencies, 95) * 1000:.0f} ms)")
+
+    api.inference_engine = engines[0]
+    print(f"\n📊 ONNX Runtime / PyTorch: latence x{results['torch']['p50'] / results['onnx']['p50']:.2f} | "
+          f"débit x{results['onnx']['throughput'] / results['torch']['throughput']:.2f}")
+    return True
+
+def bench_compile(args):
+    """
+    Latence par segment : eager face au chemin compilé (étage phonèmes tracé par palier)
+
+    Les segments couvrent plusieurs paliers (phrases courtes, paragraphe
+    long). Chaque moteur est mesuré sur les mêmes phonèmes, la médiane des
+    répétitions est retenue ; le nombre d'échantillons produits doit être
+    identique (mêmes durées prédites).
+    """
+    import torch
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    buckets = tuple(sorted(int(n) for n in args.buckets.split(",")))
+    print("🔄 Benchmark: chemin compilé (TorchScript, paliers de longueur)")
+    pipeline = load_pipeline(device="cpu")
+
+    eager = api.TorchEngine(pipeline)
+    compiled = api.CompiledTorchEngine(pipeline, buckets)
+    start = time.perf_counter()
+    warmup = compiled.warm_up()
+    print(f"   Warm-up: {time.perf_counter() - start:.1f}s | "
+          + ", ".join(f"{bucket} tokens {seconds:.1f}s" for bucket, seconds in warmup.items()))
+
+    texts = BENCH_TEXTS + [" ".join(BENCH_TEXTS)]
+    segments = [phonemes for text in texts for _, phonemes in api.phonemize_segments(pipeline, text)]
+    print(f"   Threads: {torch.get_num_threads()} | segments: {len(segments)} x {args.repeat}\n")
+
+    by_bucket = {}
+    mismatches = 0
+    for phonemes in segments:
+        tokens = 2 + sum(1 for p in phonemes if p in pipeline.model.vocab)
+        bucket = next((b for b in buckets if b >= tokens), None)
+        timings = {}
+        for name, engine in (("eager", eager), ("compiled", compiled)):
+            engine.synthesize(phonemes, "af_heart", 1.0)
+            durations = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                audio = engine.synthesize(phonemes, "af_heart", 1.0)
+                durations.append(time.perf_counter() - start)
+            timings[name] = (float(np.median(durations)), len(audio))
+        mismatches += timings["eager"][1] != timings["compiled"][1]
+        by_bucket.setdefault(bucket, []).append((timings["eager"][0], timings["compiled"][0]))
+
+    print(f"   {'palier':>7} {'segments':>9} {'eager':>10} {'compilé':>10} {'gain':>7}")
+    for bucket, rows in sorted(by_bucket.items(), key=lambda item: item[0] or 10**9):
+        eager_ms = 1000 * float(np.median([row[0] for row in rows]))
+        compiled_ms = 1000 * float(np.median([row[1] for row in rows]))
+        label = str(bucket) if bucket else "eager"
+        print(f"   {label:>7} {len(rows):>9} {eager_ms:>8.1f}ms {compiled_ms:>8.1f}ms {eager_ms / compiled_ms:>6.2f}x")
+
+    total_eager = sum(row[0] for rows in by_bucket.values() for row in rows)
+    total_compiled = sum(row[1] for rows in by_bucket.values() for row in rows)
+    print(f"\n📊 Total: x{total_eager / total_compiled:.2f} | durées identiques: "
+          f"{'✅' if not mismatches else f'❌ ({mismatches} segment(s))'}")
+    return mismatches == 0
+
+def legacy_wav(segments) -> bytes:
+    """Assemblage de référence : liste de segments + np.concatenate + sf.write"""
+    audio_segments = list(segments)
+    final_audio = np.concatenate(audio_segments)
+    wav_buffer = io.BytesIO()
+    sf.write(wav_buffer, final_audio, samplerate=api.SAMPLE_RATE, format="WAV")
+    return wav_buffer.getvalue()
+
+def incremental_wav(segments) -> bytes:
+    """Assemblage de l'API : écriture segment par segment dans un WavBuilder"""
+    wav = api.WavBuilder()
+    for audio in segments:
+        wav.append(audio)
+    return wav.finish()
+
+def bench_memory(args):
+    """Mémoire de pointe de l'assemblage WAV sur un texte long"""
+    print("🔄 Benchmark: assemblage WAV (liste + concatenate vs écriture incrémentale)")
+
+    pipeline = load_pipeline()
+    text = " ".join(BENCH_TEXTS)
+    text = (text + " ") * (args.chars // len(text) + 1)
+    text = text[:args.chars].rsplit(" ", 1)[0]
+
+    start = time.time()
+    recorded = [np.array(audio, dtype=np.float32) for _, _, audio in api.iter_synthesis(pipeline, text, "af_heart", 1.0)]
+    audio_seconds = sum(len(audio) for audio in recorded) / api.SAMPLE_RATE
+    print(f"   Texte: {len(text)} caractères | {len(recorded)} segments | "
+          f"{audio_seconds:.1f}s d'audio | synthèse: {time.time() - start:.2f}s\n")
+
+    def replay():
+        # Copie à la volée : chaque stratégie conserve (ou libère) les segments à sa façon
+        for audio in recorded:
+            yield audio.copy()
+
+    outputs = {}
+    for name, build in (("liste + concatenate", legacy_wav), ("incrémental", incremental_wav)):
+        peaks, durations = [], []
+        for _ in range(args.repeat):
+            tracemalloc.start()
+            start = time.perf_counter()
+            outputs[name] = build(replay())
+            durations.append(time.perf_counter() - start)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        print(f"   {name:<20} pic mémoire: {min(peaks) / 2**20:7.1f} MB | "
+              f"temps: {min(durations) * 1000:7.1f} ms | WAV: {len(outputs[name]) / 2**20:.1f} MB")
+
+    legacy, incremental = outputs.values()
+    print(f"\n📊 Sorties identiques: {'✅' if legacy == incremental else '❌'}")
+    return legacy == incremental
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmarks de l'API Kokoro optimisée")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    workers_parser = subparsers.add_parser("workers", help="Débit selon le nombre de processus d'inférence")
+    workers_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    workers_parser.add_argument("--requests", type=int, default=64)
+    workers_parser.set_defaults(func=bench_workers)
+
+    memory_parser = subparsers.add_parser("memory", help="Mémoire de pointe de l'assemblage WAV")
+    memory_parser.add_argument("--chars", type=int, default=2000)
+    memory_parser.add_argument("--repeat", type=int, default=3)
+    memory_parser.set_defaults(func=bench_memory)
+
+    topology_parser = subparsers.add_parser("topology", help="Workers x threads intra-op x épinglage CPU")
+    topology_parser.add_argument("--max-workers", type=int, default=len(api.available_cpus()))
+    topology_parser.add_argument("--requests", type=int, default=32)
+    topology_parser.set_defaults(func=bench_topology)
+
+    quantization_parser = subparsers.add_parser("quantization", help="Accélération et qualité du modèle int8")
+    quantization_parser.add_argument("--repeat", type=int, default=3)
+    quantization_parser.add_argument("--threads", type=int, default=0, help="Threads PyTorch (0 = défaut)")
+    quantization_parser.set_defaults(func=bench_quantization)
+
+    engines_parser = subparsers.add_parser("engines", help="PyTorch eager vs ONNX Runtime (latence, débit)")
+    engines_parser.add_argument("--workers", type=int, default=1)
+    engines_parser.add_argument("--requests", type=int, default=32)
+    engines_parser.add_argument("--repeat", type=int, default=3)
+    engines_parser.add_argument("--onnx-dir", default=api.ONNX_MODEL_DIR)
+    engines_parser.set_defaults(func=bench_engines)
+
+    compile_parser = subparsers.add_parser("compile", help="Latence par segment, eager vs chemin compilé")
+    compile_parser.add_argument("--repeat", type=int, default=5)
+    compile_parser.add_argument("--threads", type=int, default=0, help="Threads PyTorch (0 = défaut)")
+    compile_parser.add_argument("--buckets", default=",".join(map(str, api.COMPILE_BUCKETS)))
+    compile_parser.set_defaults(func=bench_compile)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -143,6 +143,141 @@ class OptimizedKokoroAPITester:
         
         return all(results)
     
+    def test_tts_streaming(self):
+        """Test du streaming audio segment par segment"""
+        print(f"\n4b. Test du streaming audio...")
+        
+        payload = {
+            "text": "First paragraph of the streaming test.\n\nSecond paragraph, generated while the first one is already playing.",
+            "voice": "af_heart"
+        }
+        
+        try:
+            start_time = time.time()
+            response = self.session.post(
+                f"{self.base_url}/tts/stream",
+                json=payload,
+                stream=True
+            )
+            response.raise_for_status()
+            
+            ttfb = None
+            audio_bytes = b""
+            for chunk in response.iter_content(chunk_size=None):
+                if ttfb is None:
+                    ttfb = time.time() - start_time
+                audio_bytes += chunk
+            total_time = time.time() - start_time
+            
+            print(f"   ✓ Premier octet audio: {ttfb:.2f}s")
+            print(f"   ✓ Flux complet: {total_time:.2f}s ({len(audio_bytes)} bytes)")
+            
+            if audio_bytes[:4] != b"RIFF" or audio_bytes[8:12] != b"WAVE":
+                print(f"   ✗ En-tête WAV invalide")
+                return False
+            
+            return True
+            
+        except Exception as e:
+            print(f"   ✗ Erreur: {e}")
+            return False
+    
+    def test_audio_ranges(self):
+        """Test des requêtes Range et conditionnelles sur /audio"""
+        print(f"\n4c. Test Range / ETag sur les fichiers audio...")
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/tts",
+                json={"text": "Range and ETag test.", "voice": "af_heart"}
+            )
+            response.raise_for_status()
+            audio_url = f"{self.base_url}{response.json()['audio_url']}"
+            
+            full = self.session.get(audio_url)
+            etag = full.headers.get("ETag")
+            print(f"   ✓ ETag: {etag}")
+            
+            not_modified = self.session.get(audio_url, headers={"If-None-Match": etag})
+            print(f"   ✓ If-None-Match: {not_modified.status_code}")
+            
+            partial = self.session.get(audio_url, headers={"Range": "bytes=0-43"})
+            print(f"   ✓ Range simple: {partial.status_code} ({partial.headers.get('Content-Range')})")
+            
+            multi = self.session.get(audio_url, headers={"Range": "bytes=0-3,-4"})
+            print(f"   ✓ Range multiple: {multi.status_code} ({multi.headers.get('Content-Type')})")
+            
+            return (
+                not_modified.status_code == 304
+                and partial.status_code == 206
+                and partial.content == full.content[:44]
+                and multi.status_code == 206
+                and multi.headers.get("Content-Type", "").startswith("multipart/byteranges")
+            )
+            
+        except Exception as e:
+            print(f"   ✗ Erreur: {e}")
+            return False
+    
+    def test_longform_job(self):
+        """Test d'un job de synthèse longue (création, polling, téléchargement)"""
+        print(f"\n4d. Test job de synthèse longue...")
+        
+        text = " ".join(f"This is sentence number {i} of a long document." for i in range(60))
+        
+        try:
+            response = self.session.post(f"{self.base_url}/tts/jobs", json={"text": text, "voice": "af_heart"})
+            response.raise_for_status()
+            job = response.json()
+            print(f"   ✓ Job créé: {job['job_id']} ({job['chunks_total']} morceaux)")
+            
+            start_time = time.time()
+            while job["status"] in ("queued", "running") and time.time() - start_time < 300:
+                time.sleep(1)
+                job = self.session.get(f"{self.base_url}/tts/jobs/{job['job_id']}").json()
+                print(f"   … {job['chunks_done']}/{job['chunks_total']} morceaux")
+            
+            if job["status"] != "completed":
+                print(f"   ✗ Job non terminé: {job['status']} {job.get('error') or ''}")
+                return False
+            
+            audio = self.session.get(f"{self.base_url}{job['audio_url']}")
+            print(f"   ✓ Audio final: {job['audio_duration']:.1f}s ({len(audio.content)} bytes)")
+            return audio.status_code == 200 and audio.content[:4] == b"RIFF"
+            
+        except Exception as e:
+            print(f"   ✗ Erreur: {e}")
+            return False
+    
+    def test_tts_batch(self):
+        """Test de la synthèse par lots (NDJSON, erreurs par élément)"""
+        print(f"\n4e. Test synthèse par lots...")
+        
+        items = [{"text": f"Notification number {i}.", "voice": "af_heart"} for i in range(10)]
+        items.append({"text": "Voix inconnue", "voice": "invalid_voice"})
+        
+        try:
+            start_time = time.time()
+            response = self.session.post(f"{self.base_url}/tts/batch", json={"items": items}, stream=True)
+            response.raise_for_status()
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+            elapsed = time.time() - start_time
+            
+            results = {line["index"]: line for line in lines if "index" in line}
+            summary = lines[-1]
+            print(f"   ✓ {len(results)} élément(s) en {elapsed:.2f}s, {summary.get('failed')} en erreur")
+            
+            return (
+                summary.get("done") is True
+                and len(results) == len(items)
+                and all(results[i]["status"] == 200 for i in range(10))
+                and results[10]["status"] == 400
+            )
+            
+        except Exception as e:
+            print(f"   ✗ Erreur: {e}")
+            return False
+    
     def test_performance_comparison(self):
         """Test de performance comparé"""
         print(f"\n5. Test de performance - Multiple requêtes...")
@@ -270,6 +405,10 @@ class OptimizedKokoroAPITester:
             self.test_health_detailed, 
             self.test_voices_detailed,
             self.test_tts_optimized,
+            self.test_tts_streaming,
+            self.test_audio_ranges,
+            self.test_longform_job,
+            self.test_tts_batch,
             self.test_performance_comparison,
             self.test_error_handling,
             self.test_stats_endpoint
@@ -6,6 +6,7 @@ Basé sur les exemples officiels du dépôt GitHub
 
 import os
 import time
+import numpy as np
 import soundfile as sf
 from pathlib import Path
 
@@ -193,6 +194,42 @@ def test_multilingual():
     
     return True
 
+def test_engine_parity():
+    """Parité des moteurs d'inférence : ONNX Runtime face à PyTorch"""
+    print("\n🔄 Test 6: Parité ONNX Runtime / PyTorch")
+    
+    try:
+        from kokoro import KPipeline
+        import api_kokoro_optimized as api
+        
+        pipeline = KPipeline(lang_code='a', device='cpu')
+        torch_engine = api.TorchEngine(pipeline)
+        onnx_engine = api.OnnxEngine.load(pipeline, Path("models"), api.MODEL_VERSION)
+        
+        # Même front-end texte pour les deux moteurs : seuls les phonèmes -> audio diffèrent.
+        # Le décodeur tire une excitation aléatoire : deux passes PyTorch ne sont pas
+        # identiques non plus, la distance PyTorch/PyTorch sert de plancher.
+        passed = True
+        for text in api.QUALITY_CORPUS:
+            for _, phonemes in api.phonemize_segments(pipeline, text):
+                reference = np.asarray(torch_engine.synthesize(phonemes, 'af_heart', 1.0))
+                replay = np.asarray(torch_engine.synthesize(phonemes, 'af_heart', 1.0))
+                candidate = onnx_engine.synthesize(phonemes, 'af_heart', 1.0)
+                
+                floor = api.spectral_distance(reference, replay)
+                distance = api.spectral_distance(reference, candidate)
+                ok = len(candidate) == len(reference) and distance <= floor + 1.0
+                passed = passed and ok
+                print(f"      {'✅' if ok else '❌'} {len(reference)} / {len(candidate)} samples | "
+                      f"distance {distance:.2f} dB (plancher {floor:.2f} dB) | {text[:40]}")
+        
+        sf.write('test_onnx_parity.wav', candidate, 24000)
+        return passed
+        
+    except Exception as e:
+        print(f"   ❌ Erreur: {e}")
+        return False
+
 def main():
     """Lance tous les tests manuels"""
     print("=" * 60)
@@ -213,6 +250,7 @@ def main():
         test_performance,
         test_long_text,
         test_multilingual,
+        test_engine_parity,
     ]
     
     results = []
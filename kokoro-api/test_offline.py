@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Tests hors ligne de l'API Kokoro TTS
+
+Vérifie la logique pure de l'API (ordonnancement, admission, plages d'octets,
+mesures d'étapes) sans charger le modèle ni démarrer le serveur.
+Exécutable directement (python test_offline.py) ou via pytest.
+"""
+
+import time
+import types
+import asyncio
+import tempfile
+from pathlib import Path
+import numpy as np
+import torch
+
+import api_kokoro_optimized as api
+
+def test_batch_stage_timings():
+    """Les durées d'étapes d'un lot ne dépassent pas le temps réel écoulé"""
+    print("🔄 Test: durées d'étapes de synthesize_batch")
+
+    def fake_phonemize(pipeline, text):
+        return [(sentence, "h" * (5 + len(sentence) % 7)) for sentence in text.split(". ")]
+
+    def fake_forward(model, batch, pad_to=None, stage=None):
+        time.sleep(0.01)
+        return [np.zeros(2400, dtype=np.float32) for _ in batch]
+
+    pipeline = types.SimpleNamespace(
+        model=types.SimpleNamespace(device="cpu"),
+        load_voice=lambda voice: torch.zeros(510, 1, 256)
+    )
+    saved = (api.inference_engine, api.phonemize_segments, api.batched_forward, api.BATCH_MAX_SIZE)
+    api.inference_engine = types.SimpleNamespace(supports_batching=True)
+    api.phonemize_segments, api.batched_forward, api.BATCH_MAX_SIZE = fake_phonemize, fake_forward, 2
+    try:
+        requests = [("One. Two. Three", "af_heart", 1.0), ("Four. Five", "af_heart", 1.0)] * 3
+        start = time.perf_counter()
+        results = api.synthesize_batch(pipeline, requests)
+        elapsed = time.perf_counter() - start
+    finally:
+        api.inference_engine, api.phonemize_segments, api.batched_forward, api.BATCH_MAX_SIZE = saved
+
+    for result in results:
+        assert not isinstance(result, Exception), result
+        stages = result[3]
+        assert all(0 <= seconds for seconds in stages.values()), stages
+        assert sum(stages.values()) <= elapsed, (stages, elapsed)
+    print(f"   ✅ {len(results)} requêtes, étapes ≤ {elapsed * 1000:.0f}ms")
+    return True
+
+def test_request_tier_token():
+    """Le jeton de priorité est comparé sans erreur, même non ASCII"""
+    print("🔄 Test: classe de service et jeton X-Kokoro-Token")
+    from starlette.requests import Request
+
+    def tier(token: bytes) -> str:
+        headers = [(b"x-kokoro-tier", b"premium"), (b"x-kokoro-token", token)]
+        return api.request_tier(Request({"type": "http", "headers": headers}))
+
+    saved = api.PRIORITY_TOKEN
+    api.PRIORITY_TOKEN = "s3cret-é"
+    try:
+        assert tier("s3cret-é".encode()) == "premium"
+        assert tier(b"s3cret-\xe9") == "free"
+        assert tier(b"\xff\xfe") == "free"
+        assert tier(b"") == "free"
+    finally:
+        api.PRIORITY_TOKEN = saved
+    print("   ✅ jeton valide accepté, jetons invalides ou non ASCII -> free")
+    return True
+
+def test_synthesis_cache():
+    """Clé de cache (paragraphes distincts) et aller-retour par le niveau disque"""
+    print("🔄 Test: clés et niveaux du cache de synthèse")
+    key = api.SynthesisCache.make_key
+    assert key("Hello  there\n General\tKenobi ", "af_heart", 1.0) == key("Hello there\nGeneral Kenobi", "af_heart", 1.0)
+    assert key("Hello there\n\nGeneral Kenobi", "af_heart", 1.0) == key("Hello there\nGeneral Kenobi", "af_heart", 1.0)
+    assert key("Hello there\nGeneral Kenobi", "af_heart", 1.0) != key("Hello there General Kenobi", "af_heart", 1.0)
+
+    async def roundtrip(cache_dir: Path):
+        cache = api.SynthesisCache(cache_dir, memory_budget_bytes=1 << 20, disk_budget_bytes=1 << 20)
+        await cache.put("k", b"RIFF" * 100, {"audio_duration": 1.0})
+        assert await cache.get("k", "mp3") is None
+        # Nouvelle instance : mémoire vide, l'entrée vient du disque
+        reloaded = api.SynthesisCache(cache_dir, memory_budget_bytes=1 << 20, disk_budget_bytes=1 << 20)
+        assert await reloaded.get("k") == (b"RIFF" * 100, {"audio_duration": 1.0})
+        assert await reloaded.get("k") is not None
+        return reloaded.stats()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = asyncio.run(roundtrip(Path(tmp)))
+    assert (stats["hits_disk"], stats["hits_memory"], stats["misses"]) == (1, 1, 0), stats
+    print("   ✅ paragraphes conservés dans la clé, disque -> mémoire")
+    return True
+
+def test_longform_cleanup():
+    """Jobs longs : morceaux supprimés après assemblage, job expiré purgé"""
+    print("🔄 Test: nettoyage des jobs de synthèse longue")
+
+    class FakeExecutor:
+        async def run(self, job, text, voice, speed, admitted=False, priority=None):
+            return np.zeros(2400, dtype="<i2").tobytes()
+
+    async def scenario(jobs_dir: Path):
+        manager = api.LongFormJobManager(jobs_dir, FakeExecutor(), parallel=2)
+        job = manager.create("First sentence. " * 200, "af_heart", 1.0, "wav")
+        await manager._tasks[job.job_id]
+        assert job.status == "completed", job.error
+        assert job.output_path.exists() and not list(job.directory.glob("chunk_*"))
+
+        # Redémarrage : le job terminé reste complet sans ses morceaux
+        restarted = api.LongFormJobManager(jobs_dir, FakeExecutor(), parallel=2)
+        assert restarted.resume_all() == (0, 0)
+        assert restarted.get(job.job_id).to_status().progress == 1.0
+
+        assert await restarted.expire() == 0
+        restarted.get(job.job_id).created_at -= api.LONGFORM_TTL_SECONDS + 1
+        assert await restarted.expire() == 1
+        assert restarted.get(job.job_id) is None and not job.directory.exists()
+
+    class FailingExecutor:
+        """Le deuxième morceau échoue, les autres sont lents"""
+        def __init__(self):
+            self.calls = self.finished = 0
+
+        async def run(self, job, text, voice, speed, admitted=False, priority=None):
+            self.calls += 1
+            if self.calls == 2:
+                raise RuntimeError("boom")
+            await asyncio.sleep(0.05)
+            self.finished += 1
+            return np.zeros(2400, dtype="<i2").tobytes()
+
+    async def failing(jobs_dir: Path):
+        executor = FailingExecutor()
+        manager = api.LongFormJobManager(jobs_dir, executor, parallel=2)
+        job = manager.create("First sentence. " * 400, "af_heart", 1.0, "wav")
+        await manager._tasks[job.job_id]
+        assert job.status == "failed" and job.error == "boom"
+        # Morceaux restants annulés (pas synthétisés), aucun morceau laissé sur disque
+        assert executor.finished <= 1 and executor.calls < len(job.chunks), (executor.calls, len(job.chunks))
+        assert not list(job.directory.glob("chunk_*")) and manager.active_chunks == 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(Path(tmp)))
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(failing(Path(tmp)))
+    print("   ✅ morceaux supprimés, job expiré purgé, échec annulant les autres morceaux")
+    return True
+
+def test_admission_controller():
+    """Contrôle d'admission : file vide toujours admise, Retry-After, tickets"""
+    print("🔄 Test: contrôle d'admission")
+    admission = api.AdmissionController(slo_seconds=10, workers=2, chars_per_second=15, rtf=0.5)
+
+    # 300 caractères = 20 s d'audio ; attente prévue 20 × 0.5 / 2 = 5 s
+    first = admission.admit(300, 1.0)
+    assert first == 20 and admission.expected_wait() == 5
+
+    # +30 s d'audio : attente 12.5 s > SLO 10 s, Retry-After = ceil(2.5)
+    try:
+        admission.admit(450, 1.0)
+        raise AssertionError("requête admise au-delà du SLO")
+    except api.AdmissionRejected as e:
+        assert (e.retry_after, e.expected_wait) == (3, 12.5), (e.retry_after, e.expected_wait)
+
+    # Élément d'un lot déjà accepté : compté, jamais refusé
+    second = admission.admit(450, 1.0, check=False)
+    assert admission.queued_requests == 2 and admission.queued_audio_seconds == 50
+    admission.release(first)
+    admission.release(second)
+    assert (admission.queued_requests, admission.queued_audio_seconds) == (0, 0.0)
+
+    # File vide : un texte seul est admis même au-delà du SLO
+    admission.release(admission.admit(100000, 1.0))
+    assert (admission.admitted, admission.rejected) == (3, 1)
+    print("   ✅ SLO, Retry-After et libération des tickets")
+    return True
+
+def test_scheduler_priorities():
+    """Ordonnanceur : premium d'abord, plus court d'abord, promotion contre la famine, annulation"""
+    print("🔄 Test: ordonnancement par classe de service")
+
+    async def serve(scheduler, jobs: list, pause: float = 0.0) -> list:
+        """Un travail occupe le worker, puis les travaux en attente sont servis un par un"""
+        order, gate = [], asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot():
+                await gate.wait()
+
+        async def job(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        tasks = []
+        for name, tier, cost in jobs:
+            tasks.append(asyncio.create_task(job(name, api.JobPriority(tier, cost))))
+            await asyncio.sleep(pause if name.startswith("free") else 0)
+        gate.set()
+        await asyncio.gather(holder, *tasks)
+        return order
+
+    # Sans attente notable : classe puis coût estimé croissant
+    scheduler = api.SynthesisScheduler(1, aging=0.0, promote_after=60.0)
+    order = asyncio.run(serve(scheduler, [
+        ("free-long", "free", 5.0), ("premium-long", "premium", 3.0),
+        ("free-short", "free", 1.0), ("premium-short", "premium", 1.0)
+    ]))
+    assert order == ["premium-short", "premium-long", "free-short", "free-long"], order
+    assert scheduler.busy == 0 and scheduler.promoted == 0
+
+    # Famine : un travail free qui attend depuis promote_after passe devant les premium arrivés après
+    scheduler = api.SynthesisScheduler(1, aging=0.0, promote_after=0.05)
+    order = asyncio.run(serve(scheduler, [
+        ("free-starved", "free", 1.0), ("premium-1", "premium", 1.0), ("premium-2", "premium", 1.0)
+    ], pause=0.1))
+    assert order[0] == "free-starved" and scheduler.promoted == 1, order
+
+    # Annulation en attente : le travail quitte la file, le worker reste comptabilisé
+    async def cancel_waiting():
+        scheduler = api.SynthesisScheduler(1, aging=0.0, promote_after=60.0)
+        gate = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot():
+                await gate.wait()
+
+        async def job():
+            async with scheduler.slot(api.JobPriority("premium", 1.0)):
+                pass
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(job())
+        await asyncio.sleep(0)
+        assert scheduler.stats()["waiting"]["premium"] == 1
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.stats()["waiting"]["premium"] == 0
+        gate.set()
+        await holder
+        return scheduler.busy
+
+    assert asyncio.run(cancel_waiting()) == 0
+    print("   ✅ priorités, promotion et annulation")
+    return True
+
+def test_parse_byte_ranges():
+    """En-tête Range : plages simples, suffixes, multiples, 416 et en-têtes ignorés"""
+    print("🔄 Test: analyse des plages d'octets")
+    parse = api.parse_byte_ranges
+    assert parse("bytes=0-99", 1000) == [(0, 99)]
+    assert parse("bytes=900-", 1000) == [(900, 999)]
+    assert parse("bytes=950-2000", 1000) == [(950, 999)]
+    assert parse("bytes=0-1, -1", 1000) == [(0, 1), (999, 999)]
+
+    # Suffixes : les N derniers octets, tout le fichier si N dépasse sa taille
+    assert parse("bytes=-500", 1000) == [(500, 999)]
+    assert parse("bytes=-5000", 1000) == [(0, 999)]
+
+    # Aucune plage satisfiable : 416
+    assert parse("bytes=1000-", 1000) == []
+    assert parse("bytes=-0", 1000) == []
+    assert parse("bytes=0-", 0) == []
+
+    # En-tête invalide ou trop de plages : fichier complet
+    assert parse("bytes=5-1", 1000) is None
+    assert parse("items=0-1", 1000) is None
+    assert parse("bytes=abc", 1000) is None
+    assert parse("bytes=-", 1000) is None
+    # Chiffres non ASCII (octets latin-1 \xb2, \xb9) : en-tête ignoré, jamais d'erreur
+    assert parse("bytes=\xb2-5", 1000) is None
+    assert parse("bytes=0-\xb2", 1000) is None
+    assert parse("bytes=-\xb9", 1000) is None
+    assert parse("bytes=0-1,\xb9-", 1000) is None
+    assert parse("bytes=" + ",".join(["0-0"] * (api.MAX_BYTE_RANGES + 1)), 1000) is None
+    print("   ✅ plages, suffixes, 416 et en-têtes invalides")
+    return True
+
+def test_g2p_lexicon_budget():
+    """Lexique G2P : plafond en octets (moins récemment utilisé évincé) et expiration"""
+    print("🔄 Test: plafond et expiration du lexique G2P")
+    import sqlite3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "lexicon.sqlite3"
+        lexicon = api.G2PLexicon(db_path, memo_budget_bytes=1 << 20, max_bytes=4000, ttl_seconds=3600)
+        for i in range(100):
+            lexicon.store(f"Paragraph number {i}.", [(f"Paragraph number {i}.", "pˈæɹəɡɹæf" * 5)])
+        # Lu depuis le disque (autre processus, mémoire vide) : récemment utilisé, conservé
+        time.sleep(0.01)
+        other = api.G2PLexicon(db_path, memo_budget_bytes=1 << 20, max_bytes=1 << 20, ttl_seconds=3600)
+        assert other.lookup("Paragraph number 0.") is not None
+        assert lexicon.prune() > 0
+
+        # Nouvelle instance : mémoire vide, seul le disque répond
+        reloaded = api.G2PLexicon(db_path, memo_budget_bytes=1 << 20, max_bytes=4000, ttl_seconds=3600)
+        with sqlite3.connect(db_path) as db:
+            total = db.execute("SELECT SUM(size) FROM lexicon").fetchone()[0]
+        assert total <= 4000, total
+        assert reloaded.lookup("Paragraph number 0.") is not None
+        assert reloaded.lookup("Paragraph number 99.") is not None
+        assert reloaded.lookup("Paragraph number 1.") is None
+
+        # Entrée inutilisée depuis plus que le TTL : ni servie ni conservée
+        with sqlite3.connect(db_path) as db:
+            db.execute("UPDATE lexicon SET last_used = 0")
+        expired = api.G2PLexicon(db_path, memo_budget_bytes=1 << 20, max_bytes=4000, ttl_seconds=3600)
+        assert expired.lookup("Paragraph number 99.") is None
+        with sqlite3.connect(db_path) as db:
+            assert db.execute("SELECT COUNT(*) FROM lexicon").fetchone()[0] == 0
+    print("   ✅ plafond respecté, entrées récentes conservées, entrées expirées purgées")
+    return True
+
+def test_stream_ticket_release():
+    """Streaming : le ticket d'admission est libéré même si le corps n'est jamais lu"""
+    print("🔄 Test: libération du ticket d'un flux abandonné")
+    from starlette.requests import Request
+
+    class FakeExecutor:
+        pipeline = None
+
+        async def run(self, job, generator, admitted=False, priority=None):
+            return next(generator, None)
+
+        @property
+        def local(self):
+            return self
+
+    segments = lambda *args: iter([("Hi.", "hˈI.", np.zeros(2400, dtype=np.float32))])
+    saved = (api.kokoro_pipeline, api.inference_executor, api.admission, api.iter_synthesis)
+    api.kokoro_pipeline, api.inference_executor, api.iter_synthesis = object(), FakeExecutor(), segments
+    api.admission = api.AdmissionController(slo_seconds=10, workers=1, chars_per_second=15, rtf=0.5)
+
+    async def open_stream():
+        http_request = Request({"type": "http", "headers": []})
+        response = await api.text_to_speech_stream(api.TTSRequest(text="Hello there."), http_request)
+        assert api.admission.queued_requests == 1
+        return response
+
+    async def client_gone(response):
+        """Client parti : l'envoi des en-têtes échoue, le générateur ne démarre jamais"""
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise OSError("client déconnecté")
+
+        try:
+            await response({"type": "http"}, receive, send)
+        except OSError:
+            pass
+
+    async def client_reads(response):
+        """Client qui lit tout le flux : double libération sans effet"""
+        messages = []
+
+        async def receive():
+            await asyncio.sleep(10)
+
+        async def send(message):
+            messages.append(message)
+
+        await response({"type": "http"}, receive, send)
+        assert b"RIFF" in messages[1]["body"]
+
+    try:
+        for consume in (client_gone, client_reads):
+            asyncio.run(consume(asyncio.run(open_stream())))
+            assert (api.admission.queued_requests, api.admission.queued_audio_seconds) == (0, 0.0), consume
+    finally:
+        api.kokoro_pipeline, api.inference_executor, api.admission, api.iter_synthesis = saved
+    print("   ✅ ticket libéré une seule fois, flux lu ou abandonné")
+    return True
+
+def main():
+    """Lance tous les tests hors ligne"""
+    tests = [
+        test_batch_stage_timings,
+        test_request_tier_token,
+        test_synthesis_cache,
+        test_longform_cleanup,
+        test_admission_controller,
+        test_scheduler_priorities,
+        test_parse_byte_ranges,
+        test_g2p_lexicon_budget,
+        test_stream_ticket_release,
+    ]
+
+    results = []
+    for test_func in tests:
+        try:
+            results.append(test_func())
+        except AssertionError as e:
+            print(f"   ❌ {test_func.__name__}: {e}")
+            results.append(False)
+
+    passed = sum(results)
+    print(f"\n✅ Tests réussis: {passed}/{len(results)}")
+    return passed == len(results)
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)